@@ -0,0 +1,100 @@
+"""Cold-start benchmark for the freshservice package and fstools.py
+
+Each scenario runs in a fresh interpreter several times; the median wall time is compared with
+its budget and the modules that must stay unloaded are checked. Exits with status 1 on a
+regression, so it can run in CI:
+
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --runs 20 --budget-scale 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos pesados que no deben cargarse en el arranque ni en -ld/-ll/-su/-sd/-sl
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'tqdm', 'pyarrow', 'aiohttp')
+
+# name: (código, presupuesto en ms, módulos prohibidos)
+SCENARIOS = {
+    'import freshservice': (
+        "import freshservice",
+        100, HEAVY_MODULES + ('requests',)
+    ),
+    'FreshServiceManager()': (
+        "from freshservice import FreshServiceManager; FreshServiceManager()",
+        200, HEAVY_MODULES + ('requests',)
+    ),
+    'AssetManager (list/search commands)': (
+        "from freshservice import FreshServiceManager; FreshServiceManager().asset_manager",
+        500, HEAVY_MODULES
+    ),
+    'fstools.py --help': (
+        "import sys, runpy; sys.argv = ['fstools.py', '--help']\n"
+        "try:\n    runpy.run_path('fstools.py', run_name='__main__')\nexcept SystemExit:\n    pass",
+        300, HEAVY_MODULES
+    ),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec(compile({code!r}, '<scenario>', 'exec'))
+elapsed = (time.perf_counter() - start) * 1000
+sys.stdout = sys.__stdout__
+print('\\n' + json.dumps({{'ms': elapsed, 'loaded': [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+def run_scenario(code, forbidden, runs):
+    """Run code in `runs` fresh interpreters; return (median ms, process ms, forbidden modules loaded)"""
+    timings, process_timings, loaded = [], [], set()
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(code=code, forbidden=forbidden)],
+            cwd=ROOT_DIR, env=env, capture_output=True, text=True
+        )
+        process_timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(report['ms'])
+        loaded.update(report['loaded'])
+    return statistics.median(timings), statistics.median(process_timings), sorted(loaded)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start time of freshservice and fstools.py')
+    parser.add_argument('--runs', type=int, default=7, help='Fresh interpreters per scenario (default: 7)')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='Multiply every budget, e.g. 2 on slow CI machines (default: 1)')
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'scenario':<38} {'import ms':>10} {'process ms':>11} {'budget':>8}")
+    for name, (code, budget, forbidden) in SCENARIOS.items():
+        try:
+            median, process_median, loaded = run_scenario(code, forbidden, max(args.runs, 1))
+        except RuntimeError as e:
+            print(f"{name:<38} ERROR: {e}")
+            failed = True
+            continue
+        budget *= args.budget_scale
+        status = 'ok'
+        if median > budget:
+            status = 'SLOW'
+            failed = True
+        if loaded:
+            status = f"LOADED {', '.join(loaded)}"
+            failed = True
+        print(f"{name:<38} {median:>10.1f} {process_median:>11.1f} {budget:>8.0f}  {status}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,28 @@
 from pathlib import Path
+import importlib
 import logging
-import logging.handlers
 import os
+import threading
 
 # Definir rutas importantes
 ROOT_DIR = Path(__file__).parent.parent
 CACHE_DIR = ROOT_DIR / '.cache'
 LOGS_DIR = ROOT_DIR / 'logs'
 
-# Configurar rutas en __init__
-os.makedirs(CACHE_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
+_logging_lock = threading.Lock()
+_logging_ready = False
 
-# Configurar logging global
+# Configurar logging global (una sola vez, al crear el primer FreshServiceManager o desde fstools.py)
 def setup_logging():
+    global _logging_ready
+    with _logging_lock:
+        if _logging_ready:
+            return
+        _logging_ready = True
+
+    import logging.handlers
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
     log_file = LOGS_DIR / f'freshservice.log'
     
     # Formato detallado para incluir timestamps y niveles
@@ -56,14 +65,26 @@ def setup_logging():
     root_logger.debug(f"Log file: {log_file}")
     root_logger.debug(f"Cache directory: {CACHE_DIR}")
 
-setup_logging()
-
-from .managers.location_manager import LocationManager
-from .managers.user_manager import UserManager
-from .managers.department_manager import DepartmentManager
-from .freshservice_manager import FreshServiceManager
 from .config import *
 
+# Importación diferida (PEP 562): 'import freshservice' no carga requests, pandas ni openpyxl
+_LAZY_EXPORTS = {
+    'LocationManager': '.managers.location_manager',
+    'UserManager': '.managers.user_manager',
+    'DepartmentManager': '.managers.department_manager',
+    'FreshServiceManager': '.freshservice_manager'
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
+
 __all__ = [
     'LocationManager',
     'UserManager',
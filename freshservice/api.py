@@ -1,12 +1,15 @@
 from functools import lru_cache
 import json
 import requests
-import time
+from requests.adapters import HTTPAdapter
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style, init
 import os
 from dotenv import load_dotenv
 from .cache_manager import CacheManager
-from .config import CACHE_CONFIG
+from .config import CACHE_CONFIG, HTTP_CONFIG, RATE_LIMIT_CONFIG
+from .rate_limiter import get_rate_limiter
 import logging
 
 class FreshServiceAPI:
@@ -17,16 +20,56 @@ class FreshServiceAPI:
         self.api_key = os.getenv('FRESHSERVICE_API_KEY')
         self.base_url = f'https://{self.subdomain}.freshservice.com/api/v2/'
         self.request_counter = 0
+        self._counter_lock = threading.Lock()
+        self.rate_limiter = get_rate_limiter()
         self.cache = CacheManager()
+        self._refresh_executor = None
+        self._refresh_lock = threading.Lock()
+        self._refreshing = set()
         self.logger = logging.getLogger(__name__)
+        self.timeout = (HTTP_CONFIG['connect_timeout'], HTTP_CONFIG['read_timeout'])
+        self.session = self._create_session()
+
+    def _create_session(self):
+        """Create pooled keep-alive HTTP session shared by all managers"""
+        session = requests.Session()
+        session.auth = (self.api_key, '')
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_CONFIG['pool_connections'],
+            pool_maxsize=HTTP_CONFIG['pool_maxsize'],
+            pool_block=HTTP_CONFIG['pool_block']
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not HTTP_CONFIG['keep_alive']:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def get_connection_stats(self):
+        """Get connection pool statistics (requests sent vs connections opened)"""
+        stats = {'requests': 0, 'connections': 0, 'reused': 0}
+        for adapter in set(self.session.adapters.values()):
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                stats['requests'] += pool.num_requests
+                stats['connections'] += pool.num_connections
+        stats['reused'] = max(stats['requests'] - stats['connections'], 0)
+        return stats
+
+    def close(self):
+        """Wait for background cache refreshes and close pooled connections"""
+        if self._refresh_executor is not None:
+            self._refresh_executor.shutdown(wait=True)
+            self._refresh_executor = None
+        self.session.close()
 
     def handle_rate_limit(self, response):
-        """Handle API rate limiting"""
+        """Handle API rate limiting (pauses every thread until Retry-After)"""
         if response.status_code == 429:
-            wait_time = int(response.headers.get('Retry-After', 60))
+            wait_time = self.rate_limiter.penalize(response.headers)
             print(f"{Fore.YELLOW}Rate limit reached. Waiting {wait_time} seconds...{Style.RESET_ALL}")
-            time.sleep(wait_time)
-            self.request_counter = 0
             return True
         return False
 
@@ -44,10 +87,12 @@ class FreshServiceAPI:
                 logging.debug(f"Endpoint {endpoint} excluded from cache")
                 return self.make_request(endpoint)
             
-            # Intentar obtener de la caché
-            cached_data = self.cache.get(endpoint, cache_type=cache_type)
+            # Intentar obtener de la caché (un dato obsoleto se sirve y se refresca en segundo plano)
+            cached_data, stale = self.cache.lookup(endpoint, cache_type=cache_type)
             if cached_data is not None:
-                logging.info(f"Cache hit for {endpoint}")
+                logging.info(f"Cache hit for {endpoint}{' (stale)' if stale else ''}")
+                if stale:
+                    self._refresh_in_background(endpoint, cache_type)
                 return cached_data
             
             # Si no está en caché, hacer la petición
@@ -65,25 +110,75 @@ class FreshServiceAPI:
             logging.error(f"Error in cached request for {endpoint}: {e}")
             return self.make_request(endpoint)
 
+    def _refresh_in_background(self, endpoint, cache_type):
+        """Refetch a stale cache entry without blocking the caller"""
+        self.run_in_background(endpoint, self._refresh_entry, endpoint, cache_type)
+
+    def _refresh_entry(self, endpoint, cache_type):
+        data = self.make_request(endpoint)
+        if data is not None:
+            self.cache.set(endpoint, data, cache_type=cache_type)
+
+    def run_in_background(self, key, function, *args):
+        """Run function(*args) in the refresh pool unless a task with the same key is still running"""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=CACHE_CONFIG['refresh_workers'],
+                                                            thread_name_prefix='cache-refresh')
+        self._refresh_executor.submit(self._run_task, key, function, *args)
+        return True
+
+    def _run_task(self, key, function, *args):
+        try:
+            function(*args)
+        except Exception as e:
+            self.logger.error(f"Background task {key} failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
     def make_request(self, endpoint, method='GET', params=None, data=None):
         """Make API request with simplified logging"""
         endpoint = endpoint.lstrip('/')
         url = f'{self.base_url}{endpoint}'
         
         logger = logging.getLogger(__name__)
+
+        # 404 recientes: no se vuelve a pedir el mismo recurso inexistente
+        negative_key = self.cache.negative_key(endpoint) if method == 'GET' and params is None else None
+        if self.cache.is_missing(negative_key):
+            logger.info(f"Skipping {url}: recorded as not found")
+            return None
+
         logger.info(f"API Request: {method} {url}")
         
         try:
-            response = requests.request(
-                method,
-                url,
-                auth=(self.api_key, ''),
-                params=params,
-                json=data,
-                timeout=30
-            )
+            retries = 0
+            while True:
+                self.rate_limiter.acquire()
+                response = self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    json=data,
+                    timeout=self.timeout
+                )
+                with self._counter_lock:
+                    self.request_counter += 1
+                self.rate_limiter.update_from_headers(response.headers)
+
+                if retries < RATE_LIMIT_CONFIG['max_retries'] and self.handle_rate_limit(response):
+                    retries += 1
+                    logger.info(f"Rate limited on {url}, retry {retries}/{RATE_LIMIT_CONFIG['max_retries']}")
+                    continue
+                break
             
             logger.info(f"Response status: {response.status_code}")
+            if response.status_code == 404:
+                self.cache.set_missing(negative_key)
             if response.status_code != 200:
                 logger.error(f"Error response: {response.text}")
                 return None
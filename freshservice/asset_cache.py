@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from .config import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CACHE_TYPE = 'assets'
+WATERMARK_KEY = 'assets/watermark'
+PAYLOAD_KINDS = ('asset', 'type_fields', 'components')
+
+class AssetCache:
+    """Cache asset and component payloads, revalidated against the assets updated since the last run"""
+
+    def __init__(self, api):
+        self.api = api
+        self.config = CACHE_CONFIG.get('assets', {})
+        self.enabled = CACHE_CONFIG['enabled'] and self.config.get('enabled', False)
+        self.lock = threading.Lock()
+        self.validated_at = None
+        self.stats = {'hits': 0, 'misses': 0, 'changed': 0, 'check_calls': 0}
+
+    def revalidate(self):
+        """Drop the cached payloads of assets updated since the last check"""
+        if not self.enabled:
+            return False
+        with self.lock:
+            # Procesos largos (web) vuelven a comprobar cada revalidate_minutes
+            if self.validated_at is not None and \
+                    time.monotonic() - self.validated_at < self.config.get('revalidate_minutes', 5) * 60:
+                return True
+
+            now = utc_watermark(self.config.get('clock_skew_seconds', 0))
+            watermark = self.api.cache.get(WATERMARK_KEY, cache_type=CACHE_TYPE)
+            changed = None
+            if watermark:
+                changed, calls = fetch_changed_since(self.api, watermark['since'], self.config.get('max_check_pages', 40))
+                self.stats['check_calls'] += calls
+
+            if changed is None:
+                # Sin marca previa (o listado no fiable) no se puede confiar en nada de lo guardado
+                logger.info("Asset cache cannot be revalidated, dropping cached asset payloads")
+                self.api.cache.clear_cache(CACHE_TYPE)
+            else:
+                for display_id in changed:
+                    for kind in PAYLOAD_KINDS:
+                        self.api.cache.delete(self._key(display_id, kind), cache_type=CACHE_TYPE)
+                    # Un ID que antes daba 404 puede existir ahora
+                    self.api.cache.clear_missing(f'assets/{display_id}')
+                self.stats['changed'] += len(changed)
+                logger.info(f"Asset cache revalidated: {len(changed)} assets changed since {watermark['since']}")
+
+            self.api.cache.set(WATERMARK_KEY, {'since': now}, cache_type=CACHE_TYPE)
+            self.validated_at = time.monotonic()
+            return True
+
+    def fetch(self, asset_id, kind, endpoint, fetch):
+        """Get a payload from the cache or through fetch(endpoint), caching the result"""
+        if self.validated_at is None:
+            return fetch(endpoint)
+        data = self._get(asset_id, kind)
+        if data is None:
+            data = fetch(endpoint)
+            self._set(asset_id, kind, data)
+        return data
+
+    async def fetch_async(self, asset_id, kind, endpoint, fetch):
+        """Get a payload from the cache or through the coroutine fetch(endpoint), caching the result"""
+        if self.validated_at is None:
+            return await fetch(endpoint)
+        data = self._get(asset_id, kind)
+        if data is None:
+            data = await fetch(endpoint)
+            self._set(asset_id, kind, data)
+        return data
+
+    def fetch_components(self, asset, endpoint, fetch):
+        """Get an asset's components payload, cached until the asset's updated_at changes"""
+        data = self._get_components(asset)
+        if data is None:
+            data = fetch(endpoint)
+            data = self._set_components(asset, data)
+        return data
+
+    async def fetch_components_async(self, asset, endpoint, fetch):
+        """Async version of fetch_components with the coroutine fetch(endpoint)"""
+        data = self._get_components(asset)
+        if data is None:
+            data = await fetch(endpoint)
+            data = self._set_components(asset, data)
+        return data
+
+    def _get_components(self, asset):
+        if not self.enabled:
+            return None
+        data = self.api.cache.get(self._key(asset['display_id'], 'components'), cache_type=CACHE_TYPE)
+        # Válido si corresponde a la misma versión del activo (o si la caché ya se revalidó en esta ejecución)
+        if data is not None and (data.get('updated_at') == asset.get('updated_at') if 'updated_at' in data
+                                 else self.validated_at is not None):
+            self._count('hits')
+            return data
+        self._count('misses')
+        return None
+
+    def _set_components(self, asset, data):
+        if not self.enabled or not isinstance(data, dict):
+            return data
+        data = dict(data, updated_at=asset.get('updated_at'))
+        self.api.cache.set(self._key(asset['display_id'], 'components'), data, cache_type=CACHE_TYPE)
+        return data
+
+    def _get(self, asset_id, kind):
+        # Un payload con type_fields también sirve cuando solo se pide el activo
+        kinds = (kind, 'type_fields') if kind == 'asset' else (kind,)
+        for current in kinds:
+            data = self.api.cache.get(self._key(asset_id, current), cache_type=CACHE_TYPE)
+            if data is not None:
+                self._count('hits')
+                return data
+        self._count('misses')
+        return None
+
+    def _set(self, asset_id, kind, data):
+        if data is not None:
+            self.api.cache.set(self._key(asset_id, kind), data, cache_type=CACHE_TYPE)
+
+    def _count(self, counter):
+        with self.lock:
+            self.stats[counter] += 1
+
+    @staticmethod
+    def _key(asset_id, kind):
+        return f'assets/{asset_id}/{kind}'
+
+def fetch_changed_since(api, since, max_pages):
+    """Get (display IDs updated at or after since, requests made); IDs are None if the listing can't tell"""
+    # El filtro solo admite fechas: se pide desde el día anterior y se afina con updated_at
+    since_date = (datetime.strptime(since, '%Y-%m-%dT%H:%M:%SZ') - timedelta(days=1)).strftime('%Y-%m-%d')
+    changed = set()
+    for page in range(1, max_pages + 1):
+        data = api.make_request(f'assets?filter="updated_at:>\'{since_date}\'"&page={page}')
+        if data is None:
+            return None, page
+        assets = data.get('assets') or []
+        if not assets:
+            return changed, page
+        for asset in assets:
+            updated_at = asset.get('updated_at')
+            if not updated_at or 'display_id' not in asset:
+                return None, page
+            if updated_at[:19] >= since[:19]:
+                changed.add(asset['display_id'])
+    logger.warning(f"More than {max_pages} pages of assets changed since {since}")
+    return None, max_pages
+
+def utc_watermark(clock_skew_seconds=0):
+    """Get the current UTC time minus a clock skew margin, in the API timestamp format"""
+    now = datetime.now(timezone.utc) - timedelta(seconds=clock_skew_seconds)
+    return now.strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -0,0 +1,190 @@
+import bisect
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from .asset_cache import fetch_changed_since, utc_watermark
+from .cache_warmer import CacheWarmer
+from .config import ASSET_INDEX_CONFIG, CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+INDEX_FIELDS = ('user_id', 'department_id', 'location_id', 'asset_type_id', 'asset_state')
+
+class AssetIndex:
+    """In-memory inverted index from asset fields to sorted display_id lists"""
+
+    def __init__(self, api, ttl_minutes=None):
+        self.api = api
+        self.ttl = (ttl_minutes or ASSET_INDEX_CONFIG['ttl_minutes']) * 60
+        self.lock = threading.RLock()
+        self.load_lock = threading.Lock()
+        self.records = {}                                     # display_id -> asset
+        self.postings = {field: {} for field in INDEX_FIELDS}  # campo -> valor -> display_ids ordenados
+        self.display_ids = []
+        self.loaded_at = None
+        self.watermark = None
+
+    @property
+    def is_loaded(self):
+        return self.loaded_at is not None
+
+    def load(self, assets, watermark=None):
+        """Replace the index with the given asset records"""
+        records = {asset['display_id']: asset for asset in assets if 'display_id' in asset}
+        postings = {field: {} for field in INDEX_FIELDS}
+        for display_id in sorted(records):
+            for field in INDEX_FIELDS:
+                value = records[display_id].get(field)
+                if value is not None:
+                    postings[field].setdefault(value, []).append(display_id)
+
+        with self.lock:
+            self.records = records
+            self.postings = postings
+            self.display_ids = sorted(records)
+            self.loaded_at = time.monotonic()
+            self.watermark = watermark
+        logger.info(f"Asset index loaded {len(records)} assets")
+
+    def update(self, assets, removed=()):
+        """Apply changed assets and removed display IDs to the loaded index"""
+        with self.lock:
+            for display_id in removed:
+                self._unlink(display_id)
+            for asset in assets:
+                display_id = asset['display_id']
+                self._unlink(display_id)
+                self.records[display_id] = asset
+                self.display_ids = _inserted(self.display_ids, display_id)
+                for field in INDEX_FIELDS:
+                    value = asset.get(field)
+                    if value is not None:
+                        self.postings[field][value] = _inserted(self.postings[field].get(value, []), display_id)
+
+    def _unlink(self, display_id):
+        # Listas nuevas en lugar de modificar en sitio: las búsquedas en curso siguen con su copia
+        old = self.records.pop(display_id, None)
+        if old is None:
+            return
+        self.display_ids = _removed(self.display_ids, display_id)
+        for field in INDEX_FIELDS:
+            value = old.get(field)
+            if value in self.postings[field]:
+                self.postings[field][value] = _removed(self.postings[field][value], display_id)
+
+    def refresh(self):
+        """Reload the index from the mirror, or update it from the API (incrementally once loaded)
+
+        Raises ListingError if a full load from the API fails (the current index is kept).
+        """
+        watermark = utc_watermark(CACHE_CONFIG['assets']['clock_skew_seconds'])
+        mirror = getattr(self.api, 'mirror', None)
+        if mirror is not None:
+            self.load(mirror.iter_assets(), watermark)
+            return
+
+        if self.watermark is not None:
+            changed, _ = fetch_changed_since(self.api, self.watermark, ASSET_INDEX_CONFIG['max_incremental_pages'])
+            if changed is not None:
+                self._apply_changed(sorted(changed), watermark)
+                return
+
+        assets = CacheWarmer(self.api).fetch_listing('assets')
+        self.load(assets, watermark)
+
+    def _apply_changed(self, display_ids, watermark):
+        """Refetch changed assets in parallel and apply them; only 404s (negative cache) are removed"""
+        for display_id in display_ids:
+            # Un 404 anterior no vale: el activo ha cambiado desde entonces
+            self.api.cache.clear_missing(f'assets/{display_id}')
+        with ThreadPoolExecutor(max_workers=ASSET_INDEX_CONFIG['workers'],
+                                thread_name_prefix='index-asset') as executor:
+            responses = list(executor.map(
+                lambda display_id: self.api.make_request(f'assets/{display_id}'), display_ids
+            ))
+        assets, removed, failed = [], [], 0
+        for display_id, response in zip(display_ids, responses):
+            if response and response.get('asset'):
+                assets.append(response['asset'])
+            elif response is None and self.api.cache.is_missing(f'assets/{display_id}'):
+                removed.append(display_id)
+            else:
+                failed += 1
+        self.update(assets, removed=removed)
+        with self.lock:
+            self.loaded_at = time.monotonic()
+            # Con fallos la marca no avanza: la próxima actualización vuelve a pedir esos activos
+            if not failed:
+                self.watermark = watermark
+        logger.info(f"Asset index updated with {len(display_ids)} changed assets ({failed} failed)")
+
+    def ensure_loaded(self):
+        """Load the index if it is missing; past the TTL it is served as is and updated in the background"""
+        if self._is_fresh():
+            return
+        if self.is_loaded:
+            self.api.run_in_background('asset_index', self.refresh)
+            return
+        with self.load_lock:
+            if not self._is_fresh():
+                self.refresh()
+
+    def _is_fresh(self):
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl
+
+    def find(self, **criteria):
+        """Lazily yield the display IDs matching every field=value criterion, in ascending order
+
+        A list, tuple or set value matches any of its values (e.g. location_id=[subtree IDs]).
+        """
+        self.ensure_loaded()
+        with self.lock:
+            lists = [self._postings(field, value) for field, value in criteria.items()]
+            if not lists:
+                lists = [self.display_ids]
+        # Se recorre la lista más corta y se comprueba en las demás por búsqueda binaria
+        lists.sort(key=len)
+        smallest, others = lists[0], lists[1:]
+        return (display_id for display_id in smallest if all(_contains(other, display_id) for other in others))
+
+    def _postings(self, field, value):
+        if isinstance(value, (list, tuple, set)):
+            # Un activo tiene un único valor por campo: las listas no se solapan y basta con fusionarlas
+            return list(heapq.merge(*(self.postings[field].get(item, []) for item in value)))
+        return self.postings[field].get(value, [])
+
+    def count(self, **criteria):
+        """Count the assets matching the criteria"""
+        return sum(1 for _ in self.find(**criteria))
+
+    def get_assets(self, **criteria):
+        """Get the asset records matching the criteria, sorted by display_id"""
+        return [self.records[display_id] for display_id in self.find(**criteria) if display_id in self.records]
+
+    def page(self, page=1, per_page=None, **criteria):
+        """Get one page of matching asset records without materializing the rest"""
+        per_page = per_page or ASSET_INDEX_CONFIG['page_size']
+        start = (max(page, 1) - 1) * per_page
+        return [self.records[display_id] for display_id in islice(self.find(**criteria), start, start + per_page)
+                if display_id in self.records]
+
+def _contains(sorted_ids, display_id):
+    position = bisect.bisect_left(sorted_ids, display_id)
+    return position < len(sorted_ids) and sorted_ids[position] == display_id
+
+def _inserted(sorted_ids, display_id):
+    if _contains(sorted_ids, display_id):
+        return sorted_ids
+    new_ids = list(sorted_ids)
+    bisect.insort(new_ids, display_id)
+    return new_ids
+
+def _removed(sorted_ids, display_id):
+    if not _contains(sorted_ids, display_id):
+        return sorted_ids
+    new_ids = list(sorted_ids)
+    new_ids.pop(bisect.bisect_left(new_ids, display_id))
+    return new_ids
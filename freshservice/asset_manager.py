@@ -4,13 +4,21 @@ from .component_manager import ComponentManager
 from .managers.location_manager import LocationManager
 from .managers.user_manager import UserManager
 from .managers.department_manager import DepartmentManager
-from .excel_manager import ExcelManager
-import pandas as pd
-from tqdm import tqdm
+from .asset_cache import AssetCache
+from .asset_index import AssetIndex
+from .cache_warmer import ListingError
+from .fetch_planner import FetchPlanner
+from .id_reader import read_ids
+from .interval_set import IntervalSet, parse_ids
+from .lazy import lazy_property
+from .name_index import NameIndex
+from .reference_index import ReferenceIndex
+from .config import ASSET_INDEX_CONFIG, BULK_CONFIG, TYPE_FIELDS
 import os
 from colorama import Fore, Style, init
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -18,88 +26,148 @@ class AssetManager(FreshServiceAPI):
     def __init__(self):
         super().__init__()
         init(autoreset=True)  # Inicializar colorama
+        self.reference_index = ReferenceIndex(self)
+        self.asset_index = AssetIndex(self)
+        self.name_index = NameIndex(self)
         self.component_manager = ComponentManager(self)
         self.location_manager = LocationManager(self)
         self.user_manager = UserManager(self)
         self.department_manager = DepartmentManager(self)
-        self.excel_manager = ExcelManager()
+        self.asset_cache = AssetCache(self)
+        self.fetch_planner = FetchPlanner(self.asset_cache)
+        self.bulk_stats = {'pages': 0, 'assets': 0}
+        self.mirror = None  # InventoryMirror cuando se consulta la copia local en lugar de la API
+
+    @lazy_property
+    def excel_manager(self):
+        from .excel_manager import ExcelManager
+        return ExcelManager()
 
     def get_asset(self, asset_id):
         """Get asset data by ID"""
         response = self.make_request(f'assets/{asset_id}')
         return response.get('asset') if response else None
 
+    def get_assets_bulk(self, asset_ids, workers=1):
+        """Page the assets listing (with type_fields, by ascending display_id) and keep the requested IDs
+
+        A failed page is retried once; if it fails again the listing stops and the IDs not found are
+        left for point lookups. IDs are only reported missing when the listing was read to its end.
+        """
+        if not isinstance(asset_ids, IntervalSet):
+            asset_ids = IntervalSet.from_ids(asset_ids)
+        prefetched = {}
+        remaining = len(asset_ids)
+        page_size = BULK_CONFIG['page_size']
+        workers = max(workers, 1)
+        next_page = 1
+        retry = []        # páginas fallidas pendientes del segundo intento
+        end_page = None   # primera página que ya no hace falta pedir
+        failed = False
+
+        def fetch_page(page):
+            return self.make_request(f'assets?include=type_fields&order_by=display_id&order_type=asc'
+                                     f'&per_page={page_size}&page={page}')
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bulk-page') as executor:
+            while remaining and not failed:
+                # Si paginar ya cuesta más que pedir los IDs restantes, se piden uno a uno
+                pages_fetched = next_page - 1
+                if pages_fetched and pages_fetched >= remaining:
+                    logger.info(f"Bulk listing stopped after {pages_fetched} pages, "
+                                f"{remaining} IDs left for point lookups")
+                    break
+
+                new_pages = [] if end_page is not None else list(range(next_page, next_page + workers - len(retry)))
+                pages = retry + new_pages
+                if not pages:
+                    break
+                retried, retry = set(retry), []
+                next_page += len(new_pages)
+                for page, response in zip(pages, executor.map(fetch_page, pages)):
+                    self.bulk_stats['pages'] += 1
+                    if response is None:
+                        if page in retried:
+                            logger.warning(f"Bulk listing page {page} failed twice, "
+                                           f"{remaining} IDs left for point lookups")
+                            failed = True
+                        else:
+                            retry.append(page)
+                        continue
+                    assets = response.get('assets') or []
+                    # Listado ordenado: una página incompleta o que pasa del último ID pedido es la última útil
+                    if len(assets) < page_size or assets[-1].get('display_id', 0) >= asset_ids.last:
+                        end_page = page + 1 if end_page is None else min(end_page, page + 1)
+                    for asset in assets:
+                        display_id = asset.get('display_id')
+                        if display_id in asset_ids and display_id not in prefetched:
+                            remaining -= 1
+                            prefetched[display_id] = {'asset': {'asset': asset}}
+                if end_page is not None:
+                    retry = [page for page in retry if page < end_page]
+
+        if end_page is not None and not retry and not failed:
+            # El listado completo (hasta el último ID pedido) no los contiene: no existen
+            for display_id in asset_ids:
+                if display_id not in prefetched:
+                    prefetched[display_id] = {'asset': None}
+
+        self.bulk_stats['assets'] += len(prefetched)
+        logger.info(f"Bulk listing prefetched {len(prefetched)} of {len(asset_ids)} requested assets")
+        return prefetched
+
     def get_departments(self):
-        """Get all departments using correct API URL and handling"""
+        """Get all departments from the reference index"""
         try:
-            data = self.make_request('departments')
-            if data and 'departments' in data:
-                return {dept['id']: dept['name'] for dept in data['departments']}
-            return {}
+            return self.reference_index.get_names('departments')
         except Exception as e:
             print(f"{Fore.RED}Error getting departments: {e}")
             return {}
 
     def get_locations(self):
-        """Get all locations with proper API URL"""
-        url = f'https://{self.subdomain}.freshservice.com/api/v2/locations/'
-        data = self.fetch_paginated_data('locations')
-        return {loc['id']: loc['name'] for loc in data} if data else {}
+        """Get all locations from the reference index"""
+        return self.reference_index.get_names('locations')
 
     def get_all_locations(self):
         """Get all locations with complete data"""
-        locations = self.fetch_paginated_data('locations')
+        locations = self.reference_index.get_all('locations')
         return sorted(locations, key=lambda x: x.get('name', '')) if locations else []
 
     def process_asset_ids(self, ids_input, exclude_input=None):
-        """Process asset IDs from input"""
-        ids = []
-        if os.path.isfile(ids_input):
-            if ids_input.endswith('.xlsx') or ids_input.endswith('.xls'):
-                # Leer Excel y tomar primera columna
-                try:
-                    df = pd.read_excel(ids_input)
-                    if not df.empty:
-                        # Convertir primera columna a números y eliminar duplicados
-                        numbers = pd.to_numeric(df.iloc[:, 0], errors='coerce')
-                        ids = sorted(set([int(x) for x in numbers.dropna()]))
-                except Exception as e:
-                    print(f"{Fore.RED}Error reading Excel file: {e}")
-                    return []
-            else:
-                # Mantener lógica existente para archivos txt
-                with open(ids_input, 'r') as file:
-                    ids = file.read().strip().split(',')
-        else:
-            ids = ids_input.split(',')
-
-        expanded_ids = []
-        for id_part in ids:
-            id_part = str(id_part).strip()
-            if '-' in id_part:
-                try:
-                    start, end = map(int, id_part.split('-'))
-                    expanded_ids.extend(range(start, end + 1))
-                except ValueError:
-                    print(f"{Fore.RED}Error: Invalid range '{id_part}'. Skipping.")
-            elif str(id_part).replace('.0', '').isdigit():  # Manejar números con .0 desde Excel
-                expanded_ids.append(int(float(id_part)))
-            elif id_part.isdigit():
-                expanded_ids.append(int(id_part))
-            else:
-                print(f"{Fore.RED}Error: Invalid ID '{id_part}'. Skipping.")
-
-        # Eliminar duplicados y ordenar
-        expanded_ids = sorted(set(expanded_ids))
+        """Process asset IDs from input into an IntervalSet (ranges are never expanded)"""
+        asset_ids = self._read_asset_ids(ids_input)
+        if asset_ids is None:
+            return IntervalSet()
 
         if exclude_input:
-            exclude_ids = self.process_asset_ids(exclude_input)
-            expanded_ids = [id_ for id_ in expanded_ids if id_ not in exclude_ids]
+            exclude_ids = self._read_asset_ids(exclude_input)
+            if exclude_ids:
+                asset_ids = asset_ids - exclude_ids
 
-        return expanded_ids
+        return asset_ids
+
+    def _read_asset_ids(self, ids_input):
+        """Parse IDs from text or stream them from a .txt/.csv/.tsv/.xlsx file (None if the file cannot be read)"""
+        if os.path.isfile(ids_input):
+            try:
+                result = read_ids(ids_input)
+            except Exception as e:
+                print(f"{Fore.RED}Error reading IDs file: {e}")
+                return None
+            asset_ids, invalid, invalid_count = result.ids, result.invalid, result.invalid_count
+        else:
+            asset_ids, invalid = parse_ids(ids_input)
+            invalid_count = len(invalid)
+
+        for part in invalid:
+            print(f"{Fore.RED}Error: Invalid ID or range '{part}'. Skipping.")
+        if invalid_count > len(invalid):
+            print(f"{Fore.RED}... and {invalid_count - len(invalid)} more invalid values skipped.")
+        return asset_ids
 
     def process_assets(self, asset_ids, options):
         """Process multiple assets with options"""
+        from tqdm import tqdm
         total = len(asset_ids)
         start_time = time.time()
 
@@ -151,80 +219,47 @@ class AssetManager(FreshServiceAPI):
 
         return all_data
 
-    def process_asset(self, asset_id, options):
+    def process_asset(self, asset_id, options, prefetched=None):
         """Public method to process a single asset"""
-        return self._process_single_asset(asset_id, options)
+        return self._process_single_asset(asset_id, options, prefetched)
 
-    def _process_single_asset(self, asset_id, options):
+    def _process_single_asset(self, asset_id, options, prefetched=None):
         """Process single asset with all possible options"""
         try:
-            # Obtener datos básicos del asset
-            asset_data = self.get_asset(asset_id)
+            # Obtener cada endpoint necesario una sola vez
+            payloads = self.fetch_planner.fetch(asset_id, options, self.make_request, prefetched)
+            asset_data = payloads['asset'].get('asset') if payloads['asset'] else None
             if not asset_data:
                 logger.warning(f"Asset {asset_id} not found")
                 return None
 
-            # Crear diccionario base con display_id y name
-            result = {
-                'display_id': asset_data.get('display_id'),
-                'name': asset_data.get('name', 'Unknown')
-            }
+            lookups = {}
 
             # Procesar componentes si se solicitan
             if options.get('components'):
                 logger.debug("Processing components")
-                components = self.component_manager.get_components(
+                lookups['components'] = self.component_manager.process_components(
+                    payloads['components'],
                     asset_id,
                     join=not options.get('disable_join', False),
                     combine_cpu_ram=options.get('combine_cpu_ram', False),
                     specified_components=options['components']
                 )
-                if components and len(components) > 0:
-                    result.update(components[0])
-                    logger.debug(f"Updated result with components: {result}")
 
             # Procesar opciones adicionales
             if options.get('include_departments'):
-                dept_name = self._get_department_name(asset_data)
-                result['department'] = dept_name
-                logger.debug(f"Added department: {dept_name}")
-
+                lookups['department'] = self._get_department_name(asset_data)
             if options.get('include_user'):
-                user_info = self._get_user_info(asset_data)
-                if user_info:
-                    result['user'] = user_info
-                    logger.debug(f"Added user info: {user_info}")
-
+                lookups['user'] = self._get_user_info(asset_data)
             if options.get('include_location'):
-                location = self._get_location_name(asset_data)
-                result['location'] = location
-                logger.debug(f"Added location: {location}")
-
-            if options.get('include_system_os'):
-                os_info = self._get_system_os(asset_id)
-                result['system_os'] = os_info
-                logger.debug(f"Added OS info: {os_info}")
-
-            if options.get('include_machine_ip'):
-                ip = self._get_machine_ip(asset_id)
-                result['machine_ip'] = ip
-                logger.debug(f"Added IP: {ip}")
-
-            if options.get('include_machine_mac'):
-                mac = self._get_machine_mac(asset_id)
-                result['machine_mac'] = mac
-                logger.debug(f"Added MAC: {mac}")
-
-            if options.get('include_serial_number'):
-                serial = self._get_serial_number(asset_id)
-                result['serial_number'] = serial
-                logger.debug(f"Added serial number: {serial}")
-
+                lookups['location'] = self._get_location_name(asset_data)
+            for field in TYPE_FIELDS:
+                if options.get(f'include_{field}'):
+                    lookups[field] = self._extract_type_field(payloads['asset'], field)
             if options.get('include_description'):
-                desc = self._get_asset_description(asset_id)
-                result['description'] = desc
-                logger.debug(f"Added description")
+                lookups['description'] = asset_data.get('description', 'Unknown')
 
+            result = self._build_asset_result(asset_data, options, lookups)
             logger.info(f"Completed processing asset {asset_id}")
             logger.debug(f"Final result: {result}")
             return result
@@ -233,6 +268,61 @@ class AssetManager(FreshServiceAPI):
             logger.error(f"Error processing asset {asset_id}: {str(e)}")
             return None
 
+    @staticmethod
+    def _build_asset_result(asset_data, options, lookups):
+        """Build the result dict of an asset from its resolved lookups"""
+        # Crear diccionario base con display_id y name
+        result = {
+            'display_id': asset_data.get('display_id'),
+            'name': asset_data.get('name', 'Unknown')
+        }
+
+        if options.get('components'):
+            components = lookups.get('components')
+            if components and len(components) > 0:
+                result.update(components[0])
+                logger.debug(f"Updated result with components: {result}")
+
+        if options.get('include_departments'):
+            result['department'] = lookups['department']
+            logger.debug(f"Added department: {lookups['department']}")
+
+        if options.get('include_user') and lookups.get('user'):
+            result['user'] = lookups['user']
+            logger.debug(f"Added user info: {lookups['user']}")
+
+        if options.get('include_location'):
+            result['location'] = lookups['location']
+            logger.debug(f"Added location: {lookups['location']}")
+
+        for field in TYPE_FIELDS:
+            if options.get(f'include_{field}'):
+                result[field] = lookups[field]
+                logger.debug(f"Added {field}: {lookups[field]}")
+
+        if options.get('include_description'):
+            result['description'] = lookups['description']
+            logger.debug("Added description")
+
+        return result
+
+    def result_columns(self, options):
+        """Get every key _build_asset_result can produce for these options, in output order"""
+        columns = ['display_id', 'name']
+        if options.get('components'):
+            columns += self.component_manager.output_columns(options['components'],
+                                                             options.get('combine_cpu_ram', False))
+        if options.get('include_departments'):
+            columns.append('department')
+        if options.get('include_user'):
+            columns.append('user')
+        if options.get('include_location'):
+            columns.append('location')
+        columns += [field for field in TYPE_FIELDS if options.get(f'include_{field}')]
+        if options.get('include_description'):
+            columns.append('description')
+        return columns
+
     def _create_asset_info_dict(self, asset_id, asset_info, system_info):
         """Create dictionary with asset information"""
         info = {'asset_id': asset_id}
@@ -279,34 +369,31 @@ class AssetManager(FreshServiceAPI):
 
     def _get_system_os(self, asset_id):
         """Get system OS information"""
-        response = self.make_request(f'assets/{asset_id}?include=type_fields')
-        if response and 'asset' in response:
-            type_fields = response['asset'].get('type_fields', {})
-            return type_fields.get('os_23001176139', 'Unknown')
-        return 'Unknown'
+        return self._get_type_field(asset_id, 'system_os')
 
     def _get_machine_ip(self, asset_id):
         """Get machine IP information"""
-        response = self.make_request(f'assets/{asset_id}?include=type_fields')
-        if response and 'asset' in response:
-            type_fields = response['asset'].get('type_fields', {})
-            return type_fields.get('computer_ip_address_23001176139', 'Unknown')
-        return 'Unknown'
+        return self._get_type_field(asset_id, 'machine_ip')
 
     def _get_machine_mac(self, asset_id):
         """Get machine MAC information"""
-        response = self.make_request(f'assets/{asset_id}?include=type_fields')
-        if response and 'asset' in response:
-            type_fields = response['asset'].get('type_fields', {})
-            return type_fields.get('mac_address_23001176139', 'Unknown')
-        return 'Unknown'
+        return self._get_type_field(asset_id, 'machine_mac')
 
     def _get_serial_number(self, asset_id):
         """Get machine serial number"""
+        return self._get_type_field(asset_id, 'serial_number')
+
+    def _get_type_field(self, asset_id, field):
+        """Get a type field value for an asset"""
         response = self.make_request(f'assets/{asset_id}?include=type_fields')
+        return self._extract_type_field(response, field)
+
+    @staticmethod
+    def _extract_type_field(response, field):
+        """Extract a type field value from an asset response"""
         if response and 'asset' in response:
             type_fields = response['asset'].get('type_fields', {})
-            return type_fields.get('serial_number_23001176134', 'Unknown')
+            return type_fields.get(TYPE_FIELDS[field], 'Unknown')
         return 'Unknown'
 
     def export_data(self, data, output_file=None, verbose=True):
@@ -315,6 +402,7 @@ class AssetManager(FreshServiceAPI):
             print("No data obtained.")
             return
 
+        import pandas as pd
         df = pd.DataFrame(data)
         
         # Reorder columns
@@ -335,11 +423,11 @@ class AssetManager(FreshServiceAPI):
     def map_department_name_to_id(self, department_name):
         """Map department name to ID with improved error handling"""
         try:
-            query = f'departments/?query="name:\'{department_name}\'"'
-            data = self.make_request(query)
-            if data and 'departments' in data and len(data['departments']) > 0:
-                return data['departments'][0]['id']
-            print(f"{Fore.YELLOW}Warning: No department found with name '{department_name}'")
+            dept_id = self.resolve_name('departments', department_name)
+            if dept_id is not None:
+                return dept_id
+            print(f"{Fore.YELLOW}Warning: No department found with name '{department_name}'"
+                  f"{self._did_you_mean('departments', department_name)}")
             return None
         except Exception as e:
             print(f"{Fore.RED}Error mapping department name: {e}")
@@ -347,19 +435,36 @@ class AssetManager(FreshServiceAPI):
 
     def map_location_name_to_id(self, location_name):
         """Map location name to ID"""
-        data = self.make_request(f'locations/?query="name:\'{location_name}\'"')
-        if data and 'locations' in data and len(data['locations']) > 0:
-            return data['locations'][0]['id']
-        print(f"{Fore.YELLOW}Warning: No location found with name '{location_name}'.")
+        loc_id = self.resolve_name('locations', location_name)
+        if loc_id is not None:
+            return loc_id
+        print(f"{Fore.YELLOW}Warning: No location found with name '{location_name}'."
+              f"{self._did_you_mean('locations', location_name)}")
         return None
 
+    def resolve_name(self, name_type, name):
+        """Get the ID for a name: exact match first, then an unambiguous fuzzy match from the name index"""
+        if name_type != 'requesters':
+            ref_id = self.reference_index.get_id(name_type, name)
+            if ref_id is not None:
+                return ref_id
+        ref_id = self.name_index.resolve(name_type, name)
+        if ref_id is not None:
+            match_name = self.name_index.entries[name_type][ref_id][0]
+            if match_name.casefold() != str(name).strip().casefold():
+                print(f"{Fore.CYAN}Using '{match_name}' for '{name}'{Style.RESET_ALL}")
+        return ref_id
+
+    def _did_you_mean(self, name_type, name):
+        suggestions = [match_name for match_name, _, _ in self.name_index.search(name_type, name, limit=3)]
+        return f" Did you mean: {', '.join(suggestions)}?" if suggestions else ''
+
     def _get_department_name(self, asset_data):
         """Get department name with proper handling"""
         if not asset_data or 'department_id' not in asset_data:
             return 'Unknown'
         
-        departments = self.get_departments()
-        return departments.get(asset_data['department_id'], 'Unknown')
+        return self.reference_index.get_name('departments', asset_data['department_id'])
 
     def get_location_name(self, location_id):
         """Get location name with improved error handling"""
@@ -367,18 +472,9 @@ class AssetManager(FreshServiceAPI):
             return 'Unknown'
             
         try:
-            # Try direct API call first
-            response = self.get_cached_request(f'locations/{location_id}')
-            if response and 'location' in response:
-                return response['location'].get('name', 'Unknown')
-
-            # Fallback to cached locations list
-            locations = self.get_locations()
-            location_name = locations.get(location_id, 'Unknown')
-            
+            location_name = self.reference_index.get_name('locations', location_id)
             if location_name == 'Unknown':
                 print(f"{Fore.YELLOW}Warning: Location ID {location_id} not found")
-            
             return location_name
         except Exception as e:
             print(f"{Fore.YELLOW}Warning: Could not get location name: {e}")
@@ -403,16 +499,21 @@ class AssetManager(FreshServiceAPI):
         if not type_id:
             return 'Unknown'
             
-        response = self.get_cached_request(f'asset_types/{type_id}')
-        if response and 'asset_type' in response:
-            return response['asset_type']['name']
-        return 'Unknown'
+        return self.reference_index.get_name('asset_types', type_id)
 
     def _get_user_info(self, asset_data):
         """Get detailed user information"""
         if not asset_data or 'user_id' not in asset_data:
             return None
+        if self.mirror is not None:
+            user = self.mirror.get_requester(asset_data['user_id'])
+            return self._build_user_info({'requester': user} if user else None)
         response = self.get_cached_request(f'requesters/{asset_data["user_id"]}')
+        return self._build_user_info(response)
+
+    @staticmethod
+    def _build_user_info(response):
+        """Build user info dict from a requester response"""
         if response and 'requester' in response:
             user = response['requester']
             return {
@@ -428,11 +529,7 @@ class AssetManager(FreshServiceAPI):
 
     def get_asset_types(self):
         """Get all asset types"""
-        url = 'asset_types'
-        data = self.get_cached_request(url)
-        if data and 'asset_types' in data:
-            return {asset_type['id']: asset_type['name'] for asset_type in data['asset_types']}
-        return {}
+        return self.reference_index.get_names('asset_types')
 
     def get_asset_with_type_fields(self, asset_id):
         """Get asset with type fields included"""
@@ -468,10 +565,29 @@ class AssetManager(FreshServiceAPI):
             return asset_data.get('description', 'Unknown')
         return 'Unknown'
 
-    def find_user_by_name(self, first_name, last_name):
-        """Find user by first and last name"""
+    def _find_requesters(self, first_name, last_name):
+        """Get the requesters response for a first and last name, or None if known to be missing"""
+        if self.mirror is not None:
+            user = self.mirror.find_requester(first_name, last_name)
+            return {'requesters': [user] if user else []}
+        if self.name_index.use_requesters():
+            try:
+                user_id = self.resolve_name('requesters', f'{first_name} {last_name}')
+                return {'requesters': [self.name_index.get_requester(user_id)] if user_id is not None else []}
+            except ListingError as e:
+                logger.error(f"Requester list load failed, searching the API: {e}")
+        negative_key = f'requesters/name/{first_name} {last_name}'.casefold()
+        if self.cache.is_missing(negative_key):
+            return None
         query = f'requesters?query="first_name:\'{first_name}\'"&query="last_name:\'{last_name}\'"'
         response = self.make_request(query)
+        if response is not None and not response.get('requesters'):
+            self.cache.set_missing(negative_key)
+        return response
+
+    def find_user_by_name(self, first_name, last_name):
+        """Find user by first and last name"""
+        response = self._find_requesters(first_name, last_name)
         if response and 'requesters' in response and response['requesters']:
             return response['requesters'][0]['id']
         print(f"{Fore.YELLOW}No user found with name: {first_name} {last_name}")
@@ -479,15 +595,36 @@ class AssetManager(FreshServiceAPI):
 
     def get_user_by_name(self, first_name, last_name):
         """Get user by first and last name with full details"""
-        query = f'requesters?query="first_name:\'{first_name}\'"&query="last_name:\'{last_name}\'"'
-        response = self.make_request(query)
+        response = self._find_requesters(first_name, last_name)
         if response and 'requesters' in response and response['requesters']:
             return response['requesters'][0]
-        print(f"{Fore.YELLOW}No se encontró ningún usuario con nombre: {first_name} {last_name}")
+        suggestions = self._did_you_mean('requesters', f'{first_name} {last_name}') \
+            if self.name_index.use_requesters() else ''
+        print(f"{Fore.YELLOW}No se encontró ningún usuario con nombre: {first_name} {last_name}{suggestions}")
         return None
 
+    def use_asset_index(self):
+        """Check whether searches should be answered by the in-memory asset index"""
+        mode = ASSET_INDEX_CONFIG['mode']
+        if mode == 'auto':
+            # Cargar el índice completo solo compensa si ya está cargado o sale de la copia local
+            return self.asset_index.is_loaded or self.mirror is not None
+        return mode == 'on'
+
+    def _indexed_assets(self, **criteria):
+        """Get the matching assets from the asset index, or None if it could not be loaded"""
+        try:
+            return self.asset_index.get_assets(**criteria)
+        except ListingError as e:
+            logger.error(f"Asset index load failed, searching without it: {e}")
+            return None
+
     def get_assets_by_user(self, user_id):
         """Get all assets associated with a user"""
+        if self.use_asset_index() and (assets := self._indexed_assets(user_id=user_id)) is not None:
+            return assets
+        if self.mirror is not None:
+            return self.mirror.get_assets_by('user_id', user_id)
         query = f'assets?query="user_id:{user_id}"'
         assets = []
         page = 1
@@ -503,11 +640,30 @@ class AssetManager(FreshServiceAPI):
 
     def get_assets_by_department(self, department_id):
         """Get all assets in a department"""
+        if self.use_asset_index() and (assets := self._indexed_assets(department_id=department_id)) is not None:
+            return assets
+        if self.mirror is not None:
+            return self.mirror.get_assets_by('department_id', department_id)
         query = f'assets?query="department_id:{department_id}"'
         return self._get_assets_with_query(query)
 
-    def get_assets_by_location(self, location_id):
-        """Get all assets in a location"""
+    def get_assets_by_location(self, location_id, include_sublocations=False):
+        """Get all assets in a location (and optionally in all the locations below it)"""
+        if include_sublocations:
+            location_ids = self.location_manager.get_subtree_ids(location_id) or [location_id]
+            # Una sola pasada por el índice (o la copia local) en lugar de una búsqueda por ubicación
+            if self.use_asset_index() and (assets := self._indexed_assets(location_id=location_ids)) is not None:
+                return assets
+            if self.mirror is not None:
+                return self.mirror.get_assets_by('location_id', location_ids)
+            assets = []
+            for current_id in location_ids:
+                assets.extend(self._get_assets_with_query(f'assets?query="location_id:{current_id}"'))
+            return sorted(assets, key=lambda x: int(x['display_id']))
+        if self.use_asset_index() and (assets := self._indexed_assets(location_id=location_id)) is not None:
+            return assets
+        if self.mirror is not None:
+            return self.mirror.get_assets_by('location_id', location_id)
         query = f'assets?query="location_id:{location_id}"'
         return self._get_assets_with_query(query)
 
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import aiohttp
+from dotenv import load_dotenv
+from .cache_manager import CacheManager
+from .config import ASYNC_CONFIG, CACHE_CONFIG, HTTP_CONFIG, RATE_LIMIT_CONFIG
+from .rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+class AsyncFreshServiceAPI:
+    """asyncio counterpart of FreshServiceAPI, backed by a single aiohttp session"""
+
+    def __init__(self, max_in_flight=None):
+        load_dotenv()
+        self.subdomain = os.getenv('FRESHSERVICE_SUBDOMAIN')
+        self.api_key = os.getenv('FRESHSERVICE_API_KEY')
+        self.base_url = f'https://{self.subdomain}.freshservice.com/api/v2/'
+        self.request_counter = 0
+        self.rate_limiter = get_rate_limiter()
+        self.cache = CacheManager()
+        self.max_in_flight = max_in_flight or ASYNC_CONFIG['max_in_flight']
+        self._session = None
+        self._semaphore = None
+        self._refreshing = {}  # endpoint -> tarea de refresco en segundo plano
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self):
+        """Create the aiohttp session lazily (it must be bound to the running loop)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_in_flight,
+                limit_per_host=ASYNC_CONFIG['limit_per_host'],
+                keepalive_timeout=ASYNC_CONFIG['keepalive_timeout']
+            )
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=HTTP_CONFIG['connect_timeout'],
+                sock_read=HTTP_CONFIG['read_timeout']
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                auth=aiohttp.BasicAuth(self.api_key or '', '')
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._session
+
+    async def close(self):
+        """Wait for background cache refreshes and close the aiohttp session"""
+        if self._refreshing:
+            await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def make_request(self, endpoint, method='GET', params=None, data=None):
+        """Make API request with simplified logging"""
+        endpoint = endpoint.lstrip('/')
+        url = f'{self.base_url}{endpoint}'
+        session = self._get_session()
+
+        negative_key = self.cache.negative_key(endpoint) if method == 'GET' and params is None else None
+        if self.cache.is_missing(negative_key):
+            logger.info(f"Skipping {url}: recorded as not found")
+            return None
+
+        logger.info(f"API Request: {method} {url}")
+
+        try:
+            retries = 0
+            while True:
+                await self.rate_limiter.acquire_async()
+                async with self._semaphore:
+                    async with session.request(method, url, params=params, json=data) as response:
+                        self.request_counter += 1
+                        self.rate_limiter.update_from_headers(response.headers)
+                        logger.info(f"Response status: {response.status}")
+
+                        if response.status == 429 and retries < RATE_LIMIT_CONFIG['max_retries']:
+                            retries += 1
+                            wait_time = self.rate_limiter.penalize(response.headers)
+                            logger.warning(f"Rate limited on {url}, retry {retries}/{RATE_LIMIT_CONFIG['max_retries']} "
+                                           f"in {wait_time}s")
+                            continue
+                        if response.status == 404:
+                            self.cache.set_missing(negative_key)
+                        if response.status != 200:
+                            logger.error(f"Error response: {await response.text()}")
+                            return None
+                        return await response.json(content_type=None)
+
+        except Exception as e:
+            logger.error(f"Request failed: {str(e)}")
+            return None
+
+    async def get_cached_request(self, endpoint):
+        """Get cached request or make new one"""
+        try:
+            endpoint_parts = endpoint.split('/')
+            cache_type = endpoint_parts[0] if endpoint_parts else 'general'
+
+            if cache_type in CACHE_CONFIG.get('excluded_endpoints', []):
+                return await self.make_request(endpoint)
+
+            cached_data, stale = self.cache.lookup(endpoint, cache_type=cache_type)
+            if cached_data is not None:
+                logger.info(f"Cache hit for {endpoint}{' (stale)' if stale else ''}")
+                if stale and endpoint not in self._refreshing:
+                    self._refreshing[endpoint] = asyncio.ensure_future(self._refresh_entry(endpoint, cache_type))
+                return cached_data
+
+            data = await self.make_request(endpoint)
+            if data is not None:
+                self.cache.set(endpoint, data, cache_type=cache_type)
+            return data
+
+        except Exception as e:
+            logger.error(f"Error in cached request for {endpoint}: {e}")
+            return await self.make_request(endpoint)
+
+    async def _refresh_entry(self, endpoint, cache_type):
+        """Refetch a stale cache entry without blocking the caller"""
+        try:
+            data = await self.make_request(endpoint)
+            if data is not None:
+                self.cache.set(endpoint, data, cache_type=cache_type)
+        finally:
+            self._refreshing.pop(endpoint, None)
+
+    async def fetch_paginated_data(self, endpoint, query=''):
+        """Fetch all paginated data from an endpoint"""
+        all_data = []
+        page = 1
+        key = endpoint.split('/')[0]
+        while True:
+            separator = '&' if '?' in query else '?'
+            data = await self.make_request(f'{endpoint}{query}{separator}page={page}')
+            if not data or not data.get(key):
+                break
+            all_data.extend(data[key])
+            page += 1
+        return all_data
+
+    async def get_asset(self, asset_id):
+        """Get asset data by ID"""
+        response = await self.make_request(f'assets/{asset_id}')
+        return response.get('asset') if response else None
+
+    async def get_requester(self, user_id):
+        """Get requester response by ID"""
+        if not user_id:
+            return None
+        return await self.get_cached_request(f'requesters/{user_id}')
+
+    async def get_departments(self):
+        """Get all departments"""
+        data = await self.make_request('departments')
+        if data and 'departments' in data:
+            return {dept['id']: dept['name'] for dept in data['departments']}
+        return {}
+
+    async def get_locations(self):
+        """Get all locations"""
+        data = await self.fetch_paginated_data('locations')
+        return {loc['id']: loc['name'] for loc in data} if data else {}
+
+    async def get_location_name(self, location_id):
+        """Get location name"""
+        if not location_id:
+            return 'Unknown'
+
+        response = await self.get_cached_request(f'locations/{location_id}')
+        if response and 'location' in response:
+            return response['location'].get('name', 'Unknown')
+
+        locations = await self.get_locations()
+        return locations.get(location_id, 'Unknown')
+
+    async def get_asset_type(self, type_id):
+        """Get asset type name"""
+        if not type_id:
+            return 'Unknown'
+
+        response = await self.get_cached_request(f'asset_types/{type_id}')
+        if response and 'asset_type' in response:
+            return response['asset_type']['name']
+        return 'Unknown'
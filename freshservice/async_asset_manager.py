@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from collections import deque
+from .async_api import AsyncFreshServiceAPI
+from .asset_manager import AssetManager
+from .component_manager import ComponentManager
+from .config import TYPE_FIELDS
+from .fetch_planner import FetchPlanner
+
+logger = logging.getLogger(__name__)
+
+class AsyncAssetManager(AsyncFreshServiceAPI):
+    """Async asset processing that builds the same rows as AssetManager"""
+
+    def __init__(self, max_in_flight=None, fetch_planner=None, reference_index=None):
+        super().__init__(max_in_flight)
+        self.component_manager = ComponentManager(self)
+        self.fetch_planner = fetch_planner or FetchPlanner()
+        self.reference_index = reference_index
+
+    async def iter_assets(self, asset_ids, options, prefetched=None):
+        """Yield (asset_id, data) in input order keeping up to max_in_flight assets in flight"""
+        prefetched = prefetched or {}
+        pending = deque()
+        try:
+            for asset_id in asset_ids:
+                task = asyncio.ensure_future(self._process_asset_safely(asset_id, options, prefetched.pop(asset_id, None)))
+                pending.append((asset_id, task))
+                if len(pending) >= self.max_in_flight:
+                    done_id, task = pending[0]
+                    result = await task
+                    pending.popleft()
+                    yield done_id, result
+            while pending:
+                done_id, task = pending[0]
+                result = await task
+                pending.popleft()
+                yield done_id, result
+        finally:
+            # Al cerrar el generador o por un error, no dejar peticiones huérfanas
+            for _, task in pending:
+                task.cancel()
+            # Esperar a que terminen de cancelarse antes de que se cierre el bucle
+            await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+    async def process_asset(self, asset_id, options, prefetched=None):
+        """Public method to process a single asset"""
+        return await self._process_asset_safely(asset_id, options, prefetched)
+
+    async def _process_asset_safely(self, asset_id, options, prefetched=None):
+        """Process one asset, isolating failures so the rest of the run continues"""
+        try:
+            return await self._process_single_asset(asset_id, options, prefetched)
+        except Exception as e:
+            logger.error(f"Error processing asset {asset_id}: {str(e)}")
+            return None
+
+    async def _process_single_asset(self, asset_id, options, prefetched=None):
+        """Process single asset, running its lookups concurrently"""
+        payloads = await self.fetch_planner.fetch_async(asset_id, options, self.make_request, prefetched)
+        asset_data = payloads['asset'].get('asset') if payloads['asset'] else None
+        if not asset_data:
+            logger.warning(f"Asset {asset_id} not found")
+            return None
+
+        lookups = {}
+        if options.get('include_departments'):
+            lookups['department'] = self._get_department_name(asset_data)
+        if options.get('include_user'):
+            lookups['user'] = self._get_user_info(asset_data)
+        if options.get('include_location'):
+            lookups['location'] = self._get_location_name(asset_data)
+
+        values = await asyncio.gather(*lookups.values())
+        lookups = dict(zip(lookups.keys(), values))
+
+        if options.get('components'):
+            lookups['components'] = self.component_manager.process_components(
+                payloads['components'],
+                asset_id,
+                join=not options.get('disable_join', False),
+                combine_cpu_ram=options.get('combine_cpu_ram', False),
+                specified_components=options['components']
+            )
+        for field in TYPE_FIELDS:
+            if options.get(f'include_{field}'):
+                lookups[field] = AssetManager._extract_type_field(payloads['asset'], field)
+        if options.get('include_description'):
+            lookups['description'] = asset_data.get('description', 'Unknown')
+
+        result = AssetManager._build_asset_result(asset_data, options, lookups)
+        logger.info(f"Completed processing asset {asset_id}")
+        return result
+
+    async def _get_department_name(self, asset_data):
+        """Get department name for an asset"""
+        if 'department_id' not in asset_data:
+            return 'Unknown'
+        if self.reference_index:
+            return self.reference_index.get_name('departments', asset_data['department_id'])
+        departments = await self.get_departments()
+        return departments.get(asset_data['department_id'], 'Unknown')
+
+    async def _get_user_info(self, asset_data):
+        """Get user info for an asset"""
+        if 'user_id' not in asset_data:
+            return None
+        return AssetManager._build_user_info(await self.get_requester(asset_data['user_id']))
+
+    async def _get_location_name(self, asset_data):
+        """Get location name for an asset"""
+        if 'location_id' not in asset_data:
+            return 'Unknown'
+        if self.reference_index:
+            return self.reference_index.get_name('locations', asset_data['location_id'])
+        return await self.get_location_name(asset_data['location_id'])
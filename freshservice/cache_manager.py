@@ -1,98 +1,256 @@
 import json
 import os
+import re
 import logging
-from datetime import datetime, timedelta
+import threading
+import time
+from .config import CACHE_CONFIG
+from .cache_stores import JsonFileStore, SQLiteStore
+from .memory_cache import MemoryCache
+
+NEGATIVE_CACHE_TYPE = 'negative'
 
 class CacheManager:
-    def __init__(self):
+    def __init__(self, backend=None):
         from . import CACHE_DIR
         self.cache_dir = CACHE_DIR
-        
+        self.backend = backend or CACHE_CONFIG.get('backend', 'json')
+
         try:
             # Crear directorio principal
             os.makedirs(self.cache_dir, exist_ok=True)
-            
-            # Definir y crear subdirectorios
-            self.subdirs = {
-                'locations': 'locations',
-                'departments': 'departments',
-                'assets': 'assets',
-                'general': 'general',
-                'requesters': 'requesters'  # Agregar subdirectorio para requesters
-            }
-            
-            # Crear todos los subdirectorios
-            for subdir in self.subdirs.values():
-                subdir_path = os.path.join(self.cache_dir, subdir)
-                os.makedirs(subdir_path, exist_ok=True)
-                
-            logging.info(f"Cache directories created at {self.cache_dir}")
+            self.json_store = JsonFileStore(self.cache_dir)
+            if self.backend == 'sqlite':
+                self.store = SQLiteStore(CACHE_CONFIG.get('sqlite_path') or os.path.join(self.cache_dir, 'cache.db'))
+            else:
+                self.store = self.json_store
+            self.subdirs = self.json_store.subdirs
+
+            logging.info(f"Cache ({self.backend}) initialized at {self.cache_dir}")
         except Exception as e:
             logging.error(f"Error creating cache directories: {e}")
             raise
-    
-    def get(self, key, cache_type='general', max_age_hours=24):
-        """Get cached data if not expired"""
+
+        memory_config = CACHE_CONFIG.get('memory', {})
+        self.memory = None
+        if memory_config.get('enabled', True):
+            self.memory = MemoryCache(memory_config['max_entries'], memory_config['max_bytes'])
+        self.disk_stats = {}
+        self.negative_stats = {'hits': 0, 'stored': 0}
+        self.stats_lock = threading.Lock()
+
+    def get_policy(self, cache_type):
+        """Get the soft/hard TTLs (in seconds) configured for a cache_type"""
+        policy = CACHE_CONFIG.get('policies', {}).get(cache_type, {})
+        soft = policy.get('soft_ttl_hours', CACHE_CONFIG['max_age_hours']) * 3600
+        hard = policy.get('hard_ttl_hours', soft / 3600) * 3600
+        return soft, max(hard, soft)
+
+    def get(self, key, cache_type='general', max_age_hours=None):
+        """Get cached data if younger than max_age_hours (default: the soft TTL of its policy)"""
+        max_age = max_age_hours * 3600 if max_age_hours is not None else self.get_policy(cache_type)[0]
+        entry = self._lookup(key, cache_type, max_age)
+        return entry[0] if entry is not None else None
+
+    def lookup(self, key, cache_type='general'):
+        """Get (data, stale) within the hard TTL of the policy; stale once past the soft TTL"""
+        soft, hard = self.get_policy(cache_type)
+        entry = self._lookup(key, cache_type, hard)
+        if entry is None:
+            return None, False
+        data, stored_at = entry
+        return data, time.time() - stored_at > soft
+
+    def _lookup(self, key, cache_type, max_age):
+        """Get (data, stored_at) from the memory or store tier if younger than max_age seconds"""
         try:
-            cache_dir = self._get_cache_dir(cache_type)
-            # Sanitizar la key
-            key = str(key).replace('/', '_').replace('\\', '_')
-            cache_file = os.path.join(cache_dir, f"{key}.json")
-            
-            if not os.path.exists(cache_file):
+            original_key, key = key, self._sanitize(key)
+
+            if self.memory is not None:
+                entry = self.memory.get_entry(cache_type, key, max_age_seconds=max_age)
+                if entry is not None:
+                    return entry
+
+            entry = self.store.get(cache_type, key)
+            if entry is None:
+                entry = self._migrate_legacy_key(cache_type, original_key, key)
+            if entry is None:
                 logging.debug(f"Cache miss for {key} in {cache_type}")
+                self._count_disk(cache_type, 'misses')
                 return None
-                
-            # Check cache age
-            file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if file_age > timedelta(hours=max_age_hours):
+
+            data, stored_at, size = entry
+            if time.time() - stored_at > max_age:
                 logging.info(f"Cache expired for {key} in {cache_type}")
-                os.remove(cache_file)
-                return None
-                
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    logging.debug(f"Cache hit for {key} in {cache_type}")
-                    return data
-            except json.JSONDecodeError:
-                logging.warning(f"Corrupted cache file for {key} in {cache_type}")
-                os.remove(cache_file)
+                # Solo se borra al superar el TTL duro; antes puede servirse como dato obsoleto
+                if time.time() - stored_at > self.get_policy(cache_type)[1]:
+                    self.store.delete(cache_type, key)
+                self._count_disk(cache_type, 'misses')
                 return None
+
+            logging.debug(f"Cache hit for {key} in {cache_type}")
+            self._count_disk(cache_type, 'hits')
+            if self.memory is not None:
+                self.memory.set(cache_type, key, data, size, stored_at=stored_at)
+            return data, stored_at
         except Exception as e:
             logging.error(f"Error reading cache: {e}")
             return None
-    
+
+    def get_many(self, keys, cache_type='general', max_age_hours=None):
+        """Get {key: data} for the cached, non-expired keys (one query on SQLite)"""
+        try:
+            sanitized = {self._sanitize(key): key for key in keys}
+            max_age = max_age_hours * 3600 if max_age_hours is not None else self.get_policy(cache_type)[0]
+            found = {}
+            missing = []
+            for key in sanitized:
+                data = self.memory.get(cache_type, key, max_age_seconds=max_age) if self.memory is not None else None
+                if data is not None:
+                    found[sanitized[key]] = data
+                else:
+                    missing.append(key)
+
+            now = time.time()
+            stored = self.store.get_many(cache_type, missing)
+            for key in missing:
+                entry = stored.get(key)
+                if entry is None or now - entry[1] > max_age:
+                    self._count_disk(cache_type, 'misses')
+                    continue
+                data, stored_at, size = entry
+                found[sanitized[key]] = data
+                self._count_disk(cache_type, 'hits')
+                if self.memory is not None:
+                    self.memory.set(cache_type, key, data, size, stored_at=stored_at)
+            return found
+        except Exception as e:
+            logging.error(f"Error reading cache batch: {e}")
+            return {}
+
     def set(self, key, data, cache_type='general'):
         """Save data to cache"""
+        self.set_many({key: data}, cache_type=cache_type)
+
+    def set_many(self, items, cache_type='general'):
+        """Save {key: data} to cache (one transaction on SQLite)"""
         try:
-            cache_dir = self._get_cache_dir(cache_type)
-            os.makedirs(cache_dir, exist_ok=True)
-            
-            # Sanitizar la key
-            key = str(key).replace('/', '_').replace('\\', '_')
-            cache_file = os.path.join(cache_dir, f"{key}.json")
-            
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
-            logging.debug(f"Cache set for {key} in {cache_type}")
+            stored_at = time.time()
+            expires_at = stored_at + self.get_policy(cache_type)[1]
+            entries = []
+            for key, data in items.items():
+                key = self._sanitize(key)
+                serialized = json.dumps(data)
+                entries.append((key, serialized, stored_at, expires_at))
+
+                # Write-through a la capa en memoria
+                if self.memory is not None:
+                    self.memory.set(cache_type, key, data, len(serialized), stored_at=stored_at)
+
+            self.store.set_many(cache_type, entries)
+            logging.debug(f"Cache set for {len(entries)} keys in {cache_type}")
         except Exception as e:
-            logging.error(f"Error writing cache for {key} in {cache_type}: {e}")
-    
+            logging.error(f"Error writing cache in {cache_type}: {e}")
+
+    def delete(self, key, cache_type='general'):
+        """Remove a cached entry"""
+        key = self._sanitize(key)
+        if self.memory is not None:
+            self.memory.discard(cache_type, key)
+        self.store.delete(cache_type, key)
+
+    def invalidate_prefix(self, prefix, cache_type=None):
+        """Remove every entry whose key starts with prefix"""
+        prefix = self._sanitize(prefix)
+        if self.memory is not None:
+            self.memory.clear(cache_type, prefix=prefix)
+        removed = self.store.delete_prefix(prefix, cache_type)
+        logging.info(f"Invalidated {removed} cache entries with prefix {prefix}")
+        return removed
+
+    def import_json_cache(self):
+        """Migrate the .cache JSON files into the SQLite store"""
+        if not isinstance(self.store, SQLiteStore):
+            raise ValueError("JSON cache import requires CACHE_CONFIG['backend'] = 'sqlite'")
+        known_types = set(self.subdirs) | {'asset_types'}
+        imported = self.store.import_json_cache(self.cache_dir, known_types, lambda t: self.get_policy(t)[1])
+        logging.info(f"Imported {imported} JSON cache entries into SQLite")
+        return imported
+
+    def negative_key(self, endpoint):
+        """Get the negative cache key of a point lookup endpoint, or None if it isn't one"""
+        negative_config = CACHE_CONFIG.get('negative', {})
+        if not CACHE_CONFIG['enabled'] or not negative_config.get('enabled'):
+            return None
+        # La query (include=type_fields) no cambia que el recurso exista o no
+        path = endpoint.lstrip('/').split('?')[0]
+        parts = path.split('/')
+        if len(parts) < 2 or not parts[1] or parts[0] not in negative_config.get('endpoints', []):
+            return None
+        return path
+
+    def is_missing(self, key):
+        """Check whether key was recorded as missing (404 or empty search) within the negative TTL"""
+        if key is None or self.get(key, cache_type=NEGATIVE_CACHE_TYPE) is None:
+            return False
+        with self.stats_lock:
+            self.negative_stats['hits'] += 1
+        logging.debug(f"Negative cache hit for {key}")
+        return True
+
+    def set_missing(self, key):
+        """Record key as missing"""
+        if key is None:
+            return
+        self.set(key, True, cache_type=NEGATIVE_CACHE_TYPE)
+        with self.stats_lock:
+            self.negative_stats['stored'] += 1
+
+    def clear_missing(self, key):
+        """Forget a missing entry (the resource now exists)"""
+        self.delete(key, cache_type=NEGATIVE_CACHE_TYPE)
+
+    def _sanitize(self, key):
+        # Sanitizar la key (también caracteres no válidos en nombres de fichero de Windows)
+        return re.sub(r'[\\/:*?"<>|]', '_', str(key))
+
+    def _migrate_legacy_key(self, cache_type, key, sanitized):
+        """Move an entry saved under the old sanitized key (only '/' and '\\' replaced) to the current one"""
+        legacy = str(key).replace('/', '_').replace('\\', '_')
+        if legacy == sanitized:
+            return None
+        entry = self.store.get(cache_type, legacy)
+        if entry is not None:
+            data, stored_at, _ = entry
+            # Conserva la fecha original: la entrada caduca cuando lo habría hecho
+            self.store.set(cache_type, sanitized, json.dumps(data), stored_at,
+                           stored_at + self.get_policy(cache_type)[1])
+            self.store.delete(cache_type, legacy)
+            logging.info(f"Cache key migrated from {legacy} to {sanitized} in {cache_type}")
+        return entry
+
     def _get_cache_dir(self, cache_type):
         """Get appropriate cache directory based on type"""
-        if cache_type in self.subdirs:
-            return os.path.join(self.cache_dir, self.subdirs[cache_type])
-        return self.cache_dir
-    
+        return self.json_store._get_cache_dir(cache_type)
+
+    def get_stats(self):
+        """Get hit/miss/eviction counters per cache_type for memory and disk tiers"""
+        stats = {}
+        memory_stats = self.memory.stats if self.memory is not None else {}
+        for cache_type in set(memory_stats) | set(self.disk_stats):
+            stats[cache_type] = {
+                'memory': dict(memory_stats.get(cache_type, {})),
+                'disk': dict(self.disk_stats.get(cache_type, {}))
+            }
+        return stats
+
+    def _count_disk(self, cache_type, counter):
+        with self.stats_lock:
+            counters = self.disk_stats.setdefault(cache_type, {'hits': 0, 'misses': 0})
+            counters[counter] += 1
+
     def clear_cache(self, cache_type=None):
         """Clear all cache or specific cache type"""
-        if cache_type:
-            cache_dir = self._get_cache_dir(cache_type)
-            for file in os.listdir(cache_dir):
-                os.remove(os.path.join(cache_dir, file))
-        else:
-            for directory in [os.path.join(self.cache_dir, 'locations'), os.path.join(self.cache_dir, 'departments'), os.path.join(self.cache_dir, 'assets'), self.cache_dir]:
-                if os.path.exists(directory):
-                    for file in os.listdir(directory):
-                        os.remove(os.path.join(directory, file))
+        if self.memory is not None:
+            self.memory.clear(cache_type)
+        self.store.clear(cache_type)
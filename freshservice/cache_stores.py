@@ -0,0 +1,245 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class JsonFileStore:
+    """One JSON file per key under .cache/<type>/ (original cache layout)"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+        # Definir y crear subdirectorios
+        self.subdirs = {
+            'locations': 'locations',
+            'departments': 'departments',
+            'assets': 'assets',
+            'general': 'general',
+            'requesters': 'requesters',
+            'asset_types': 'asset_types',
+            'negative': 'negative'
+        }
+        for subdir in self.subdirs.values():
+            os.makedirs(os.path.join(self.cache_dir, subdir), exist_ok=True)
+
+    def _get_cache_dir(self, cache_type):
+        """Get appropriate cache directory based on type"""
+        # Nunca la raíz: ahí están cache.db, inventory.db, runs/ y uploads/
+        if cache_type not in self.subdirs:
+            self.subdirs[cache_type] = cache_type
+        return os.path.join(self.cache_dir, self.subdirs[cache_type])
+
+    def _get_cache_file(self, cache_type, key):
+        return os.path.join(self._get_cache_dir(cache_type), f"{key}.json")
+
+    def get(self, cache_type, key):
+        """Get (data, stored_at, size) or None"""
+        cache_file = self._get_cache_file(cache_type, key)
+        if not os.path.exists(cache_file):
+            return None
+        try:
+            with open(cache_file, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            logger.warning(f"Corrupted cache file for {key} in {cache_type}")
+            os.remove(cache_file)
+            return None
+        return data, os.path.getmtime(cache_file), os.path.getsize(cache_file)
+
+    def get_many(self, cache_type, keys):
+        """Get {key: (data, stored_at, size)} for the keys found"""
+        found = {}
+        for key in keys:
+            entry = self.get(cache_type, key)
+            if entry is not None:
+                found[key] = entry
+        return found
+
+    def set(self, cache_type, key, serialized, stored_at, expires_at):
+        """Save a serialized entry"""
+        cache_file = self._get_cache_file(cache_type, key)
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+        # Escritura atómica: varios hilos pueden guardar la misma key
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w') as f:
+            f.write(serialized)
+        # La fecha de guardado es la de modificación del fichero
+        os.utime(tmp_file, (stored_at, stored_at))
+        os.replace(tmp_file, cache_file)
+
+    def set_many(self, cache_type, entries):
+        """Save [(key, serialized, stored_at, expires_at)] entries"""
+        for key, serialized, stored_at, expires_at in entries:
+            self.set(cache_type, key, serialized, stored_at, expires_at)
+
+    def delete(self, cache_type, key):
+        """Remove an entry if present"""
+        cache_file = self._get_cache_file(cache_type, key)
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+
+    def delete_prefix(self, prefix, cache_type=None):
+        """Remove entries whose key starts with prefix"""
+        directories = self._all_dirs(cache_type)
+        removed = 0
+        for directory in directories:
+            for file in os.listdir(directory):
+                path = os.path.join(directory, file)
+                if file.startswith(prefix) and file.endswith('.json') and os.path.isfile(path):
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def clear(self, cache_type=None):
+        """Clear all entries or those of a cache_type"""
+        directories = self._all_dirs(cache_type)
+        for directory in directories:
+            for file in os.listdir(directory):
+                path = os.path.join(directory, file)
+                if file.endswith('.json') and os.path.isfile(path):
+                    os.remove(path)
+
+    def _all_dirs(self, cache_type=None):
+        cache_types = [cache_type] if cache_type else list(self.subdirs)
+        directories = [self._get_cache_dir(current) for current in cache_types]
+        return [directory for directory in directories if os.path.exists(directory)]
+
+class SQLiteStore:
+    """Single SQLite database with indexed keys and stored expiry"""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    cache_type TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (cache_type, key)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at)")
+
+    def _connect(self):
+        """Get this thread's connection (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get(self, cache_type, key):
+        """Get (data, stored_at, size) or None"""
+        row = self._connect().execute(
+            "SELECT value, stored_at, expires_at FROM cache WHERE cache_type = ? AND key = ?",
+            (cache_type, key)
+        ).fetchone()
+        if row is None or (row[2] is not None and row[2] < time.time()):
+            return None
+        return json.loads(row[0]), row[1], len(row[0])
+
+    def get_many(self, cache_type, keys):
+        """Get {key: (data, stored_at, size)} for the keys found, in chunked queries"""
+        found = {}
+        keys = list(keys)
+        now = time.time()
+        conn = self._connect()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, value, stored_at, expires_at FROM cache "
+                f"WHERE cache_type = ? AND key IN ({placeholders})",
+                [cache_type, *chunk]
+            )
+            for key, value, stored_at, expires_at in rows:
+                if expires_at is None or expires_at >= now:
+                    found[key] = (json.loads(value), stored_at, len(value))
+        return found
+
+    def set(self, cache_type, key, serialized, stored_at, expires_at):
+        """Save a serialized entry"""
+        self.set_many(cache_type, [(key, serialized, stored_at, expires_at)])
+
+    def set_many(self, cache_type, entries):
+        """Save [(key, serialized, stored_at, expires_at)] entries in one transaction"""
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (cache_type, key, value, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(cache_type, key, serialized, stored_at, expires_at)
+                 for key, serialized, stored_at, expires_at in entries]
+            )
+
+    def delete(self, cache_type, key):
+        """Remove an entry if present"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE cache_type = ? AND key = ?", (cache_type, key))
+
+    def delete_prefix(self, prefix, cache_type=None):
+        """Remove entries whose key starts with prefix"""
+        # Rango [prefix, prefix + U+FFFF) para usar la clave primaria en lugar de LIKE
+        bounds = (prefix, prefix + '\uffff')
+        with self._connect() as conn:
+            if cache_type:
+                cursor = conn.execute("DELETE FROM cache WHERE cache_type = ? AND key >= ? AND key < ?",
+                                      (cache_type, *bounds))
+            else:
+                cursor = conn.execute("DELETE FROM cache WHERE key >= ? AND key < ?", bounds)
+            return cursor.rowcount
+
+    def clear(self, cache_type=None):
+        """Clear all entries or those of a cache_type"""
+        with self._connect() as conn:
+            if cache_type:
+                conn.execute("DELETE FROM cache WHERE cache_type = ?", (cache_type,))
+            else:
+                conn.execute("DELETE FROM cache")
+
+    def purge_expired(self):
+        """Remove entries past their stored expiry"""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),)).rowcount
+
+    def import_json_cache(self, cache_dir, known_types, ttl_for):
+        """Import the JSON files of a .cache directory, keeping their modification time"""
+        imported = 0
+        directories = [(cache_dir, None)] + [(os.path.join(cache_dir, t), t) for t in known_types]
+        for directory, subdir_type in directories:
+            if not os.path.isdir(directory):
+                continue
+            entries = {}
+            for file in os.listdir(directory):
+                path = os.path.join(directory, file)
+                if not file.endswith('.json') or not os.path.isfile(path):
+                    continue
+                key = file[:-len('.json')]
+                cache_type = subdir_type or _infer_cache_type(key, known_types)
+                try:
+                    with open(path, 'r') as f:
+                        serialized = f.read()
+                    json.loads(serialized)
+                except (OSError, ValueError):
+                    logger.warning(f"Skipping unreadable cache file {path}")
+                    continue
+                stored_at = os.path.getmtime(path)
+                entries.setdefault(cache_type, []).append((key, serialized, stored_at, stored_at + ttl_for(cache_type)))
+            for cache_type, type_entries in entries.items():
+                self.set_many(cache_type, type_entries)
+                imported += len(type_entries)
+        return imported
+
+def _infer_cache_type(key, known_types):
+    """Infer the cache_type of a sanitized key from the root cache directory"""
+    matches = [cache_type for cache_type in known_types if key.startswith(f"{cache_type}_")]
+    return max(matches, key=len) if matches else 'general'
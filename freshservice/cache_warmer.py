@@ -0,0 +1,76 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .config import WARM_CACHE_CONFIG
+from .name_index import REQUESTERS_CACHE_KEY
+from .reference_index import REFERENCE_CACHE_KEYS, REFERENCE_TYPES
+
+logger = logging.getLogger(__name__)
+
+class ListingError(RuntimeError):
+    """A page of a listing could not be fetched, so the listing is incomplete"""
+
+class CacheWarmer:
+    """Prefetch every page of the reference endpoints into the cache and the reference index"""
+
+    def __init__(self, api, workers=None):
+        self.api = api
+        self.workers = max(workers or WARM_CACHE_CONFIG['workers'], 1)
+        self.page_size = WARM_CACHE_CONFIG['page_size']
+
+    def warm(self, types=None):
+        """Fetch all pages of each type concurrently and return {type: records cached}"""
+        start = time.time()
+        records = self.fetch_all(types)
+
+        counts = {}
+        for ref_type, items in records.items():
+            if ref_type in REFERENCE_TYPES:
+                # La lista entera es lo que lee ReferenceIndex al cargarse (también en otro proceso)
+                self.api.cache.set(REFERENCE_CACHE_KEYS[ref_type], items, cache_type=ref_type)
+                self.api.reference_index.load(ref_type, items)
+            elif ref_type == 'requesters':
+                # Cada usuario para get_cached_request('requesters/<id>') y la lista para la búsqueda por nombre
+                self.api.cache.set_many(
+                    {f'requesters/{item["id"]}': {'requester': item} for item in items if 'id' in item},
+                    cache_type=ref_type
+                )
+                self.api.cache.set(REQUESTERS_CACHE_KEY, items, cache_type=ref_type)
+                self.api.name_index.load(ref_type, items)
+            counts[ref_type] = len(items)
+        logger.info(f"Cache warm-up finished in {time.time() - start:.1f}s: {counts}")
+        return counts
+
+    def fetch_all(self, types=None):
+        """Fetch all pages of each type concurrently and return {type: records}"""
+        types = list(types or WARM_CACHE_CONFIG['types'])
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='warm-page') as pages, \
+                ThreadPoolExecutor(max_workers=len(types), thread_name_prefix='warm-type') as per_type:
+            return dict(zip(types, per_type.map(lambda t: self._fetch_all(t, pages), types)))
+
+    def fetch_listing(self, ref_type, query=''):
+        """Fetch every page of a single listing, e.g. fetch_listing('assets', 'include=type_fields&')"""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='warm-page') as pages:
+            return self._fetch_all(ref_type, pages, query)
+
+    def _fetch_all(self, ref_type, pages, query=''):
+        """Fetch every page of an endpoint, requesting a wave of pages at a time
+
+        Raises ListingError if a page fails: a partial listing would pass for the whole list.
+        """
+        items = []
+        page = 1
+        while True:
+            # La primera página sola: la mayoría de listas de referencia caben en ella
+            wave = range(page, page + (1 if page == 1 else self.workers))
+            responses = list(pages.map(
+                lambda p: self.api.make_request(f'{ref_type}?{query}per_page={self.page_size}&page={p}'), wave
+            ))
+            for offset, response in enumerate(responses):
+                if response is None:
+                    raise ListingError(f"Could not fetch page {page + offset} of {ref_type}")
+                page_items = response.get(ref_type) or []
+                items.extend(page_items)
+                if len(page_items) < self.page_size:
+                    return items
+            page += len(wave)
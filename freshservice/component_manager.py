@@ -1,6 +1,9 @@
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style, init
+from .config import COMPONENT_CONFIG
+from .fetch_planner import COMPONENTS_ENDPOINT
 
 logger = logging.getLogger(__name__)
 
@@ -19,31 +22,69 @@ class ComponentManager:
         """Get and process components for an asset"""
         logger.info(f"Getting components for asset {asset_id}")
         
+        try:
+            # Obtener componentes (de la caché de activos si están guardados)
+            endpoint = COMPONENTS_ENDPOINT.format(id=asset_id)
+            components = self.api.asset_cache.fetch(asset_id, 'components', endpoint, self.api.make_request)
+            return self.process_components(components, asset_id, join, combine_cpu_ram, specified_components)
+        except Exception as e:
+            logger.error(f"Error processing components for asset {asset_id}: {str(e)}")
+            return []
+
+    def prefetch(self, prefetched, workers=None):
+        """Fetch the components of every prefetched asset concurrently into prefetched[id]['components']"""
+        assets = [payloads['asset']['asset'] for payloads in prefetched.values()
+                  if payloads.get('asset') and payloads['asset'].get('asset') and 'components' not in payloads]
+        if not assets:
+            return 0
+        workers = max(workers or COMPONENT_CONFIG['workers'], 1)
+        fetch = lambda asset: self.api.asset_cache.fetch_components(
+            asset, COMPONENTS_ENDPOINT.format(id=asset['display_id']), self.api.make_request
+        )
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='components') as executor:
+            for asset, components in zip(assets, executor.map(fetch, assets)):
+                prefetched[asset['display_id']]['components'] = components
+        logger.info(f"Prefetched components for {len(assets)} assets")
+        return len(assets)
+
+    def output_columns(self, specified_components, combine_cpu_ram=False):
+        """Get every key process_components can return for these options, in output order"""
+        wanted = set(specified_components or ())
+        columns = []
+        if combine_cpu_ram and {'cpu', 'ram'} <= wanted:
+            columns += ['component_type', 'cpu_model', 'cpu_cores', 'cpu_speed', 'ram_capacity', 'ram_speed',
+                        'ram_socket', 'ram_memory_type', 'ram_total_capacity']
+        # Sin combinar (o si al activo le falta CPU o RAM) cada tipo va por separado
+        if 'ram' in wanted:
+            columns += ['memory_capacity', 'memory_speed', 'memory_type']
+        if 'cpu' in wanted:
+            columns += ['cpu_model', 'cpu_speed', 'cpu_cores']
+        return list(dict.fromkeys(columns))
+
+    def process_components(self, components, asset_id, join=True, combine_cpu_ram=False, specified_components=None):
+        """Process a components API response for an asset"""
         # Traducir los tipos de componentes especificados
+        wanted_types = None
         if specified_components:
-            specified_components = [self.component_types[comp] for comp in specified_components]
-            logger.debug(f"Looking for component types: {specified_components}")
+            wanted_types = {self.component_types[comp] for comp in specified_components}
+            logger.debug(f"Looking for component types: {wanted_types}")
         
         try:
-            # Obtener componentes de la API
-            components = self.api.make_request(f'assets/{asset_id}/components')
-            
             if not components or 'components' not in components:
                 logger.warning(f"No components found for asset {asset_id}")
                 return []
 
-            # Filtrar componentes
-            filtered_components = [
-                c for c in components['components']
-                if specified_components is None or c.get('component_type') in specified_components
-            ]
+            # Filtrar y agrupar por tipo en una sola pasada
+            by_type = {}
+            for component in components['components']:
+                component_type = component.get('component_type')
+                if wanted_types is None or component_type in wanted_types:
+                    by_type.setdefault(component_type, []).append(component)
             
-            logger.info(f"Found {len(filtered_components)} matching components")
-            logger.debug(f"Component types found: {[c.get('component_type') for c in filtered_components]}")
+            logger.debug(f"Component types found: { {k: len(v) for k, v in by_type.items()} }")
 
-            # Separar por tipo
-            ram_components = [c for c in filtered_components if c.get('component_type') == 'Memory']
-            cpu_components = [c for c in filtered_components if c.get('component_type') == 'Processor']
+            ram_components = by_type.get('Memory', [])
+            cpu_components = by_type.get('Processor', [])
 
             # Si se solicita combinar CPU y RAM y tenemos ambos componentes
             if combine_cpu_ram and cpu_components and ram_components:
@@ -5,6 +5,37 @@ MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
 RATE_LIMIT_DELAY = 60  # seconds
 
+# Rate limiting (token bucket paced from X-Ratelimit-* headers)
+RATE_LIMIT_CONFIG = {
+    'requests_per_minute': 100,  # initial budget until the API reports X-Ratelimit-Total
+    'safety_margin': 0.9,        # fraction of the reported budget we allow ourselves to use
+    'max_retries': 10            # times a 429 response is retried before giving up
+}
+
+# HTTP transport settings (pooled keep-alive connections)
+HTTP_CONFIG = {
+    'pool_connections': 4,    # number of host pools to keep
+    'pool_maxsize': 16,       # max connections kept per host
+    'pool_block': False,      # block instead of opening extra connections when the pool is full
+    'keep_alive': True,
+    'connect_timeout': 5,     # seconds
+    'read_timeout': 30        # seconds
+}
+
+# Concurrent asset processing
+CONCURRENCY_CONFIG = {
+    'workers': 1,              # CLI default (1 = serial processing)
+    'web_workers': 8,          # default used by the web app
+    'max_in_flight_factor': 2  # queued assets per worker before waiting for results
+}
+
+# Asyncio client settings
+ASYNC_CONFIG = {
+    'max_in_flight': 100,      # concurrent requests (and assets) kept in flight
+    'limit_per_host': 100,     # max open connections to the Freshservice host
+    'keepalive_timeout': 30    # seconds an idle connection is kept open
+}
+
 # Export settings
 EXCEL_SETTINGS = {
     'header_color': '003366',
@@ -33,20 +64,142 @@ COMPONENT_TYPES = {
     'nic': 'Network Adapter'
 }
 
+# Bulk listing mode for dense display_id ranges
+BULK_CONFIG = {
+    'mode': 'auto',   # auto: page the listing when it costs fewer calls than point lookups; on/off to force
+    'page_size': 100  # maximum per_page accepted by the assets listing endpoint
+}
+
+# In-memory reference data index (departments, locations, asset types)
+REFERENCE_CONFIG = {
+    'ttl_minutes': 60,    # re-read a reference list from the cache after this many minutes (the API is
+                          # only called per the CACHE_CONFIG policy of its type)
+    'retry_seconds': 60   # wait before refetching a list whose listing failed
+}
+
+# Cache warm-up (--warm-cache and web startup)
+WARM_CACHE_CONFIG = {
+    'types': ['departments', 'locations', 'asset_types', 'requesters'],
+    'workers': 8,            # pages fetched in parallel
+    'page_size': 100,
+    'on_web_startup': True   # warm the cache in a background thread when the web app starts
+}
+
+# Local inventory mirror (--sync / --mirror)
+MIRROR_CONFIG = {
+    'db_path': None,               # defaults to .cache/inventory.db
+    'workers': 8,                  # parallel requests while syncing
+    'components': True,            # also mirror each asset's components
+    'max_incremental_pages': 40,   # updated-since listing pages before falling back to a full load
+    'reconcile_hours': 24          # list every asset ID this often to drop assets deleted in Freshservice
+                                   # (the updated-since listing does not show them); 0: only with --sync full
+}
+
+# Excel export (.xlsx files are streamed row by row)
+EXCEL_CONFIG = {
+    'width_sample_rows': 1000,  # rows used to size the columns before streaming the rest
+    'max_column_width': 50
+}
+
+# Component fetching (-c)
+COMPONENT_CONFIG = {
+    'workers': 8  # concurrent component requests for the assets of a bulk listing
+}
+
+# Streaming pipeline from fetch to export
+PIPELINE_CONFIG = {
+    'window_size': 1000,  # asset IDs prefetched (mirror rows, bulk components) per window
+    'preview_rows': 20    # rows kept for the -v console preview
+}
+
+# Run journal for resumable -i runs (--resume RUN_ID)
+RUN_JOURNAL_CONFIG = {
+    'enabled': True,
+    'min_assets': 200,     # smaller runs are not journaled
+    'fsync_every': 100,    # finished assets between forced disk syncs
+    'keep_days': 7,        # unfinished journals older than this are removed
+    'dir': None            # defaults to .cache/runs
+}
+
+# Local name index for department, location and requester name lookups
+NAME_INDEX_CONFIG = {
+    'requesters': 'auto',          # auto: resolve user names locally once the requester list is loaded,
+                                   # cached (--warm-cache, web startup) or mirrored; on/off to force
+    'requesters_ttl_minutes': 60,
+    'limit': 10,                   # max suggestions
+    'min_score': 0.3,              # minimum trigram similarity for a suggestion
+    'resolve_score': 0.6,          # a non-exact name is accepted from this similarity...
+    'resolve_margin': 0.1          # ...if it beats the next candidate by this much
+}
+
+# In-memory inverted index of assets for the searches
+ASSET_INDEX_CONFIG = {
+    'mode': 'auto',                # auto: use it once loaded (web startup) or with --mirror; on/off to force
+    'ttl_minutes': 15,             # apply changed assets to the index (in the background) after this many minutes
+    'workers': 8,                  # parallel refetches of changed assets
+    'page_size': 50,               # results per page
+    'max_incremental_pages': 40
+}
+
+# Asset type_fields keys for the information options
+TYPE_FIELDS = {
+    'system_os': 'os_23001176139',
+    'machine_ip': 'computer_ip_address_23001176139',
+    'machine_mac': 'mac_address_23001176139',
+    'serial_number': 'serial_number_23001176134'
+}
+
 # Cache settings
 CACHE_CONFIG = {
     'enabled': True,
-    'max_age_hours': 24,
-    'excluded_endpoints': ['assets']  # endpoints that shouldn't be cached
+    'max_age_hours': 24,               # TTL of cache types without a policy
+    'excluded_endpoints': ['assets'],  # endpoints that shouldn't be cached as-is (assets use 'assets' below)
+    'backend': 'json',                 # 'json' (one file per key) or 'sqlite' (single database)
+    'sqlite_path': None,               # defaults to .cache/cache.db
+    'memory': {                        # in-process LRU tier in front of the cache files
+        'enabled': True,
+        'max_entries': 10000,
+        'max_bytes': 64 * 1024 * 1024
+    },
+    'refresh_workers': 2,              # background threads refreshing stale entries
+    'policies': {                      # per cache_type TTLs: past soft_ttl an entry is served stale and
+                                       # refreshed in the background, past hard_ttl it is refetched first
+        # departments, locations and asset_types: the whole lists loaded by ReferenceIndex
+        'departments': {'soft_ttl_hours': 24 * 7, 'hard_ttl_hours': 24 * 30},
+        'locations': {'soft_ttl_hours': 24 * 7, 'hard_ttl_hours': 24 * 30},
+        'requesters': {'soft_ttl_hours': 24, 'hard_ttl_hours': 24 * 7},
+        'asset_types': {'soft_ttl_hours': 24 * 30, 'hard_ttl_hours': 24 * 90},
+        'assets': {'soft_ttl_hours': 24 * 7, 'hard_ttl_hours': 24 * 7},  # revalidated by updated_at instead
+        'negative': {'soft_ttl_hours': 6, 'hard_ttl_hours': 6}
+    },
+    'negative': {                      # remember 404s and unknown names so they aren't requested again
+        'enabled': True,
+        'endpoints': ['assets', 'requesters', 'departments', 'locations', 'asset_types']
+    },
+    'assets': {                        # asset/component payloads, revalidated against the assets updated since the last run
+        'enabled': True,
+        'revalidate_minutes': 5,       # long-running processes (web) re-check after this many minutes
+        'clock_skew_seconds': 300,     # margin subtracted from the local clock for the updated-since watermark
+        'max_check_pages': 40          # updated-since listing pages before dropping the whole asset cache instead
+    }
 }
 
 # Export settings
 EXPORT_CONFIG = {
     'default_format': 'xlsx',
-    'allowed_formats': ['xlsx', 'csv', 'json'],
+    'allowed_formats': ['xlsx', 'csv', 'json', 'ndjson', 'parquet'],  # -o picks one by extension (.gz for csv/json/ndjson)
+    'sample_rows': 1000,  # rows read before writing the header, to collect every column
     'excel': {
         'date_format': 'DD/MM/YYYY',
         'freeze_panes': True,
         'auto_filter': True
+    },
+    'csv': {
+        'delimiter': ',',
+        'encoding': 'utf-8-sig'
+    },
+    'parquet': {
+        'compression': 'zstd',
+        'row_group_size': 10000
     }
 }
@@ -1,10 +1,11 @@
 class DataExporter:
-    def __init__(self, excel_manager):
-        self.excel_manager = excel_manager
+    def __init__(self, export_manager):
+        self.export_manager = export_manager
         
     def export_data(self, df, options):
         if options.get('output'):
-            self.excel_manager.export_to_excel(df, options['output'])
+            # El formato sale de la extensión: .xlsx, .csv, .ndjson, .json, .parquet (y .gz)
+            self.export_manager.export_data(df, options['output'])
         
         if options.get('verbose'):
             print(df)
@@ -1,59 +1,46 @@
-import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Columnas que van primero en cada fila exportada
+PRIORITY_COLUMNS = ('asset_id', 'department_name', 'location_name')
+
 class DataProcessor:
+    def iter_rows(self, items):
+        """Yield export rows one at a time: one per component when an item has components"""
+        for item in items:
+            if 'components' in item:
+                # Procesar cada componente y agregar la info base
+                base_info = self._reorder({k: v for k, v in item.items() if k != 'components'})
+                for component in item.get('components') or []:
+                    row = base_info.copy()
+                    row.update(component)
+                    yield row
+            else:
+                yield self._reorder(item)
+
+    def order_columns(self, columns):
+        """Get the export column order of rows with these keys"""
+        return list(self._reorder(dict.fromkeys(columns)))
+
     def process_dataframe(self, data):
         """Convert data to DataFrame"""
         if not data:
             return None
-            
+
         try:
-            # Procesar datos combinados de asset y componentes
-            if isinstance(data, list) and 'components' in data[0]:
-                logger.info("Processing combined asset and components data")
-                processed_data = []
-                
-                for item in data:
-                    base_info = {k: v for k, v in item.items() if k != 'components'}
-                    
-                    # Procesar cada componente y agregar la info base
-                    for component in item.get('components', []):
-                        row = base_info.copy()
-                        row.update(component)
-                        processed_data.append(row)
-                        
-                df = pd.DataFrame(processed_data)
-            else:
-                logger.info("Processing regular asset data")
-                df = pd.DataFrame(data)
-            
-            return self._reorder_columns(df)
-                
+            import pandas as pd
+            return pd.DataFrame(list(self.iter_rows(data)))
         except Exception as e:
             logger.error(f"Error processing DataFrame: {e}")
             logger.exception(e)
             return None
 
-    def _reorder_columns(self, df):
-        """Reorder columns to desired order"""
-        if df is None or df.empty:
-            return df
-
-        # Define priority columns
-        priority_columns = ['asset_id', 'department_name', 'location_name']
-        
-        # Get existing columns
-        existing_columns = df.columns.tolist()
-        
-        # Filter priority columns that exist in the dataframe
-        priority_exists = [col for col in priority_columns if col in existing_columns]
-        
-        # Get remaining columns
-        other_columns = [col for col in existing_columns if col not in priority_exists]
-        
-        # Reorder columns
-        new_column_order = priority_exists + other_columns
-        
-        return df[new_column_order]
+    @staticmethod
+    def _reorder(row):
+        """Put the priority columns first"""
+        if not any(column in row for column in PRIORITY_COLUMNS):
+            return row
+        ordered = {column: row[column] for column in PRIORITY_COLUMNS if column in row}
+        ordered.update((key, value) for key, value in row.items() if key not in ordered)
+        return ordered
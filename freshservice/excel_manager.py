@@ -1,66 +1,87 @@
-import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill
 import os
+from itertools import chain, islice
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+from .config import EXCEL_CONFIG
 
 class ExcelManager:
     def export_to_excel(self, df, output_file):
         """Export DataFrame to Excel with formatting"""
         # Generate unique filename if needed
         output_file = self._get_unique_filename(output_file)
-        
-        # Export to Excel
-        df.to_excel(output_file, index=False)
-        
-        # Apply formatting
-        if output_file.endswith('.xlsx'):
-            self.format_excel_file(output_file)
-
-    def format_excel_file(self, file_path):
-        """Apply formatting to Excel file"""
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
-
-        # Personalizar estilos
-        header_fill = PatternFill(start_color="003366", end_color="003366", fill_type="solid")
-        header_font = Font(color="FFFFFF", bold=True)
-        row_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-        
-        # Aplicar formato automático a columnas
-        self._auto_adjust_columns(ws)
-        
-        # Aplicar estilos mejorados
-        self._apply_header_styles(ws, header_fill, header_font)
-        self._apply_row_styles(ws, row_fill)
-
-        wb.save(file_path)
-
-    def _auto_adjust_columns(self, ws):
-        """Auto-adjust column widths"""
-        for col in ws.columns:
-            max_length = 0
-            col_letter = col[0].column_letter
-            for cell in col:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            adjusted_width = min(max_length + 3, 50)  # Cap width at 50
-            ws.column_dimensions[col_letter].width = adjusted_width
-
-    def _apply_header_styles(self, ws, header_fill, header_font):
-        """Apply styles to header row"""
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    def _apply_row_styles(self, ws, row_fill):
-        """Apply styles to data rows"""
-        for row in ws.iter_rows(min_row=2):
-            for cell in row:
-                cell.fill = row_fill
-                cell.alignment = Alignment(vertical="center", wrap_text=True)
+
+        if not output_file.endswith('.xlsx'):
+            df.to_excel(output_file, index=False)
+            return output_file
+
+        return self.write_rows(list(df.columns), df.itertuples(index=False, name=None), output_file)
+
+    def write_rows(self, columns, rows, output_file):
+        """Stream rows into a formatted .xlsx in a single pass with constant memory"""
+        # Los anchos deben fijarse antes de escribir filas: se calculan con una muestra inicial
+        rows = iter(rows)
+        sample = list(islice(rows, EXCEL_CONFIG['width_sample_rows']))
+        sheet = self.open_sheet(columns, sample, output_file)
+        for row in chain(sample, rows):
+            sheet.append(row)
+        sheet.close()
+        return output_file
+
+    def open_sheet(self, columns, sample, output_file, freeze_header=False, auto_filter=False):
+        """Open a write-only sheet sized from the sample rows; rows are then added with append()"""
+        return ExcelSheetWriter(self, columns, sample, output_file, freeze_header, auto_filter)
+
+    def _register_styles(self, wb):
+        """Register the header and row styles once so every cell just references them"""
+        header_style = NamedStyle(name='fstools_header')
+        header_style.fill = PatternFill(start_color="003366", end_color="003366", fill_type="solid")
+        header_style.font = Font(color="FFFFFF", bold=True)
+        header_style.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+        row_style = NamedStyle(name='fstools_row')
+        row_style.fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+        row_style.alignment = Alignment(vertical="center", wrap_text=True)
+
+        wb.add_named_style(header_style)
+        wb.add_named_style(row_style)
+        return header_style.name, row_style.name
+
+    def _set_column_widths(self, ws, columns, sample):
+        """Auto-adjust column widths from the header and the sampled rows"""
+        for index, column in enumerate(columns):
+            max_length = len(str(column))
+            for row in sample:
+                value = self._value(row[index]) if index < len(row) else None
+                if value is not None:
+                    max_length = max(max_length, len(str(value)))
+            ws.column_dimensions[get_column_letter(index + 1)].width = min(max_length + 3, EXCEL_CONFIG['max_column_width'])
+
+    def _cell(self, ws, value, style):
+        cell = WriteOnlyCell(ws, value=self._value(value))
+        cell.style = style
+        return cell
+
+    def _styled_like(self, ws, value, template):
+        cell = WriteOnlyCell(ws, value=self._value(value))
+        cell._style = template._style
+        return cell
+
+    @staticmethod
+    def _value(value):
+        """Convert a value to what openpyxl can store (NaN as an empty cell, lists as text)"""
+        if isinstance(value, (list, tuple, dict, set)):
+            return str(value)
+        if value is None:
+            return None
+        # NaN (float o numpy) y NaT no son iguales a sí mismos; pd.NA no admite la comparación
+        try:
+            if value != value:
+                return None
+        except TypeError:
+            return None
+        return value
 
     def _get_unique_filename(self, file_path):
         """Generate unique filename"""
@@ -70,4 +91,33 @@ class ExcelManager:
         while os.path.exists(new_file_path):
             new_file_path = f"{base}-({counter}){ext}"
             counter += 1
-        return new_file_path
\ No newline at end of file
+        return new_file_path
+
+class ExcelSheetWriter:
+    """Write-only .xlsx sheet with the header written and the column widths already set"""
+
+    def __init__(self, excel_manager, columns, sample, output_file, freeze_header=False, auto_filter=False):
+        self.excel_manager = excel_manager
+        self.output_file = output_file
+        self.columns = columns
+        self.auto_filter = auto_filter
+        self.rows = 0
+        self.wb = openpyxl.Workbook(write_only=True)
+        self.ws = self.wb.create_sheet()
+        if freeze_header:
+            self.ws.freeze_panes = 'A2'
+        header_style, row_style = excel_manager._register_styles(self.wb)
+        excel_manager._set_column_widths(self.ws, columns, sample)
+        self.ws.append([excel_manager._cell(self.ws, column, header_style) for column in columns])
+        # Resolver el estilo una vez y compartirlo: asignar cell.style por nombre en cada celda es lento
+        self.row_template = excel_manager._cell(self.ws, None, row_style)
+
+    def append(self, row):
+        self.ws.append([self.excel_manager._styled_like(self.ws, value, self.row_template) for value in row])
+        self.rows += 1
+
+    def close(self):
+        if self.auto_filter and self.columns:
+            # El rango solo se conoce al final; el filtro se escribe después de los datos
+            self.ws.auto_filter.ref = f"A1:{get_column_letter(len(self.columns))}{self.rows + 1}"
+        self.wb.save(self.output_file)
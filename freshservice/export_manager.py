@@ -1,37 +1,369 @@
+import csv
+import gzip
 import json
-import pandas as pd
+import logging
+import math
+import os
+from abc import ABC, abstractmethod
 from .config import EXPORT_CONFIG
+from .lazy import lazy_property
+
+logger = logging.getLogger(__name__)
 
 class ExportManager:
+    """Pick an exporter by file extension and stream rows into it"""
+
+    def __init__(self, excel_manager=None):
+        if excel_manager is not None:
+            self.excel_manager = excel_manager
+
+    @lazy_property
+    def excel_manager(self):
+        # openpyxl solo se importa al exportar
+        from .excel_manager import ExcelManager
+        return ExcelManager()
+
     def export_data(self, data, output_file, format=None):
-        if not format:
-            format = EXPORT_CONFIG['default_format']
-            
+        """Export a DataFrame or a list/iterable of row dicts and return the file written"""
+        if hasattr(data, 'itertuples'):
+            columns = [str(column) for column in data.columns]
+            rows = (dict(zip(columns, values)) for values in data.itertuples(index=False, name=None))
+        else:
+            columns, rows = None, data
+
+        with self.open(output_file, columns, format) as exporter:
+            for row in rows:
+                exporter.write(row)
+        return exporter.output_file
+
+    def open(self, output_file, columns=None, format=None, overwrite=False):
+        """Open a streaming exporter for output_file; use write(row) and close() (or a with block)"""
+        format, compressed = self.detect_format(output_file, format)
         if format not in EXPORT_CONFIG['allowed_formats']:
             raise ValueError(f"Unsupported format: {format}")
-            
-        method_name = f"_export_to_{format}"
-        export_method = getattr(self, method_name)
-        return export_method(data, output_file)
-        
-    def _export_to_xlsx(self, data, output_file):
-        df = pd.DataFrame(data)
-        writer = pd.ExcelWriter(output_file, engine='openpyxl')
-        
-        df.to_excel(writer, index=False)
-        
-        if EXPORT_CONFIG['excel']['freeze_panes']:
-            writer.sheets['Sheet1'].freeze_panes = 'A2'
-            
-        if EXPORT_CONFIG['excel']['auto_filter']:
-            writer.sheets['Sheet1'].auto_filter.ref = writer.sheets['Sheet1'].dimensions
-            
-        writer.save()
-        
-    def _export_to_csv(self, data, output_file):
-        df = pd.DataFrame(data)
-        df.to_csv(output_file, index=False)
-        
-    def _export_to_json(self, data, output_file):
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        if compressed and format not in ('csv', 'ndjson', 'json'):
+            raise ValueError(f"Gzip compression is not supported for {format} files")
+
+        if not overwrite:
+            output_file = self._get_unique_filename(output_file)
+        logger.info(f"Exporting {format}{' (gzip)' if compressed else ''} to {output_file}")
+        exporter_class = EXPORTERS[format]
+        if format == 'xlsx':
+            return exporter_class(output_file, columns, self.excel_manager)
+        return exporter_class(output_file, columns, compressed)
+
+    @staticmethod
+    def detect_format(output_file, format=None):
+        """Get (format, gzip compressed) from the file extension, e.g. 'out.csv.gz' -> ('csv', True)"""
+        name = output_file.lower()
+        compressed = name.endswith('.gz')
+        if compressed:
+            name = name[:-3]
+        if not format:
+            extension = os.path.splitext(name)[1].lstrip('.')
+            format = FORMAT_ALIASES.get(extension, extension or EXPORT_CONFIG['default_format'])
+        return format, compressed
+
+    def _get_unique_filename(self, file_path):
+        """Generate unique filename (an empty placeholder, like the web's temp files, is reused)"""
+        if os.path.exists(file_path) and os.path.getsize(file_path) == 0:
+            return file_path
+        return self.excel_manager._get_unique_filename(file_path)
+
+class RowExporter(ABC):
+    """Base streaming exporter: the columns come from the caller or from the first rows written"""
+
+    def __init__(self, output_file, columns=None, compressed=False):
+        self.output_file = output_file
+        # Se escribe aparte y se renombra al terminar: un export a medias nunca queda con el nombre final
+        self.temp_file = f'{output_file}.part'
+        self.compressed = compressed
+        self.columns = list(columns) if columns else None
+        self.sample = []
+        self.rows = 0
+        self.started = False
+        self.dropped = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # Tras un error no se completa el fichero: un export a medias no debe parecer terminado
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, row):
+        """Write one row dict"""
+        self.rows += 1
+        if not self.started:
+            # Primeras filas en memoria para conocer todas las columnas antes de escribir la cabecera
+            self.sample.append(row)
+            if len(self.sample) >= EXPORT_CONFIG['sample_rows']:
+                self._start_with_sample()
+            return
+        self._write(row)
+
+    def close(self):
+        if not self.started:
+            self._start_with_sample()
+        self._finish()
+        os.replace(self.temp_file, self.output_file)
+        if self.dropped:
+            logger.warning(f"Columns not in the first {EXPORT_CONFIG['sample_rows']} rows were not exported: "
+                           f"{sorted(self.dropped)}")
+        logger.info(f"Exported {self.rows} rows to {self.output_file}")
+
+    def abort(self):
+        """Release the output after an error without writing the rest of the file"""
+        if self.started:
+            self._abort()
+        if os.path.exists(self.temp_file):
+            os.remove(self.temp_file)
+        logger.warning(f"Export to {self.output_file} aborted after {self.rows} rows")
+
+    def _start_with_sample(self):
+        if self.columns is None:
+            self.columns = list(dict.fromkeys(key for row in self.sample for key in row))
+        self.column_set = set(self.columns)
+        self._start()
+        self.started = True
+        sample, self.sample = self.sample, []
+        for row in sample:
+            self._write(row)
+
+    def _values(self, row):
+        """Get the row values in column order"""
+        for key in row:
+            if key not in self.column_set:
+                self.dropped.add(key)
+        return [_clean(row.get(column)) for column in self.columns]
+
+    @abstractmethod
+    def _start(self):
+        """Open the output and write the header once the columns are known"""
+
+    @abstractmethod
+    def _write(self, row):
+        """Write one row after the header"""
+
+    @abstractmethod
+    def _finish(self):
+        """Write the footer and close the output"""
+
+    def _abort(self):
+        self.file.close()
+
+class CsvExporter(RowExporter):
+    def _start(self):
+        # utf-8-sig para que Excel abra bien las tildes
+        encoding = 'utf-8' if self.compressed else EXPORT_CONFIG['csv']['encoding']
+        opener = gzip.open if self.compressed else open
+        self.file = opener(self.temp_file, 'wt', newline='', encoding=encoding)
+        self.writer = csv.writer(self.file, delimiter=EXPORT_CONFIG['csv']['delimiter'])
+        self.writer.writerow(self.columns)
+
+    def _write(self, row):
+        self.writer.writerow(_text(value) for value in self._values(row))
+
+    def _finish(self):
+        self.file.close()
+
+class NdjsonExporter(RowExporter):
+    """One JSON object per line; rows are written as they arrive (no column sampling needed)"""
+
+    def __init__(self, output_file, columns=None, compressed=False):
+        super().__init__(output_file, columns, compressed)
+        opener = gzip.open if compressed else open
+        self.file = opener(self.temp_file, 'wt', encoding='utf-8')
+        self.started = True
+
+    def _start(self):
+        """Nothing to do: the file is opened in __init__ and rows have no header"""
+
+    def write(self, row):
+        self.rows += 1
+        self._write(row)
+
+    def _write(self, row):
+        self.file.write(_json_line(row))
+        self.file.write('\n')
+
+    def _finish(self):
+        self.file.close()
+
+class JsonExporter(NdjsonExporter):
+    """A JSON array streamed one row at a time"""
+
+    def __init__(self, output_file, columns=None, compressed=False):
+        super().__init__(output_file, columns, compressed)
+        self.file.write('[')
+
+    def _write(self, row):
+        self.file.write(',\n' if self.rows > 1 else '\n')
+        self.file.write(_json_line(row))
+
+    def _finish(self):
+        self.file.write('\n]\n')
+        self.file.close()
+
+class ParquetExporter(RowExporter):
+    """Parquet written one row group at a time; the schema comes from the first rows"""
+
+    def _start(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from e
+        self.pa = pa
+        self.pq = pq
+        self.batch = []
+        sample = [self._values(row) for row in self.sample]
+        self.schema = pa.schema([(column, self._infer_type([row[i] for row in sample]))
+                                 for i, column in enumerate(self.columns)])
+        self.writer = pq.ParquetWriter(self.temp_file, self.schema,
+                                       compression=EXPORT_CONFIG['parquet']['compression'])
+
+    def _infer_type(self, values):
+        """Column type from the sample: mixed, empty or nested columns are stored as text"""
+        pa = self.pa
+        try:
+            inferred = pa.array(values).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.string()
+        if pa.types.is_integer(inferred) or pa.types.is_floating(inferred) or pa.types.is_boolean(inferred):
+            return inferred
+        return pa.string()
+
+    def _write(self, row):
+        self.batch.append(self._values(row))
+        if len(self.batch) >= EXPORT_CONFIG['parquet']['row_group_size']:
+            self._flush()
+
+    def _flush(self):
+        if not self.batch:
+            return
+        columns = [[row[i] for row in self.batch] for i in range(len(self.schema))]
+        widened = [self._widened_type(values, field) for values, field in zip(columns, self.schema)]
+        if any(widened):
+            self._widen(self.pa.schema([(field.name, new_type or field.type)
+                                        for field, new_type in zip(self.schema, widened)]))
+        arrays = [self._array(values, field) for values, field in zip(columns, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+        self.batch = []
+
+    def _widened_type(self, values, field):
+        """Get a wider type for the column if these values don't fit its type, or None if they do"""
+        pa = self.pa
+        if pa.types.is_string(field.type):
+            return None
+        numbers = all(value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+                      for value in values)
+        if pa.types.is_integer(field.type) and numbers:
+            # pyarrow trunca 2.5 a 2 sin avisar: los decimales (o enteros enormes) pasan la columna a float
+            if any(isinstance(value, float) and not value.is_integer() for value in values):
+                return pa.float64()
+            try:
+                pa.array(values, type=field.type)
+                return None
+            except (pa.ArrowInvalid, OverflowError):
+                return pa.float64()
+        try:
+            pa.array(values, type=field.type)
+            return None
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            # Cualquier otro valor (p. ej. 'Unknown' en una columna numérica) pasa la columna a texto
+            return pa.string()
+
+    def _widen(self, schema):
+        """Switch to a wider schema, rewriting the row groups already written with it"""
+        changed = [f"{field.name} ({field.type})" for field, old in zip(schema, self.schema) if field.type != old.type]
+        logger.warning(f"Parquet columns widened to fit later rows: {', '.join(changed)}")
+        self.writer.close()
+        temp_file = f'{self.temp_file}.tmp'
+        os.replace(self.temp_file, temp_file)
+        self.writer = self.pq.ParquetWriter(self.temp_file, schema,
+                                            compression=EXPORT_CONFIG['parquet']['compression'])
+        source = self.pq.ParquetFile(temp_file)
+        try:
+            for batch in source.iter_batches():
+                self.writer.write_table(self.pa.Table.from_batches([batch]).cast(schema))
+        finally:
+            source.close()
+        os.remove(temp_file)
+        self.schema = schema
+
+    def _array(self, values, field):
+        pa = self.pa
+        if pa.types.is_string(field.type):
+            return pa.array([None if value is None else str(_text(value)) for value in values], type=field.type)
+        return pa.array(values, type=field.type)
+
+    def _finish(self):
+        self._flush()
+        self.writer.close()
+
+    def _abort(self):
+        self.writer.close()
+
+class XlsxExporter(RowExporter):
+    """Formatted .xlsx through ExcelManager's write-only sheet"""
+
+    def __init__(self, output_file, columns=None, excel_manager=None):
+        super().__init__(output_file, columns)
+        if excel_manager is None:
+            from .excel_manager import ExcelManager
+            excel_manager = ExcelManager()
+        self.excel_manager = excel_manager
+
+    def _start(self):
+        sample = [self._values(row) for row in self.sample]
+        self.sheet = self.excel_manager.open_sheet(self.columns, sample, self.temp_file,
+                                                   freeze_header=EXPORT_CONFIG['excel']['freeze_panes'],
+                                                   auto_filter=EXPORT_CONFIG['excel']['auto_filter'])
+
+    def _write(self, row):
+        self.sheet.append(self._values(row))
+
+    def _finish(self):
+        self.sheet.close()
+
+    def _abort(self):
+        # El libro de solo escritura no se guarda: no queda un .xlsx a medias
+        pass
+
+EXPORTERS = {
+    'csv': CsvExporter,
+    'ndjson': NdjsonExporter,
+    'json': JsonExporter,
+    'parquet': ParquetExporter,
+    'xlsx': XlsxExporter
+}
+
+FORMAT_ALIASES = {
+    'jsonl': 'ndjson',
+    'pq': 'parquet'
+}
+
+def _clean(value):
+    """Convert pandas/numpy values to plain Python (NaN as None)"""
+    if hasattr(value, 'item') and not isinstance(value, (list, dict)):
+        try:
+            value = value.item()
+        except (ValueError, TypeError):
+            pass
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+def _json_line(row):
+    return json.dumps({str(key): _clean(value) for key, value in row.items()}, ensure_ascii=False, default=str)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import math
+import threading
+from .config import BULK_CONFIG, TYPE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+ASSET_ENDPOINT = 'assets/{id}'
+ASSET_TYPE_FIELDS_ENDPOINT = 'assets/{id}?include=type_fields'
+COMPONENTS_ENDPOINT = 'assets/{id}/components'
+
+# Clave del payload en la caché de activos para cada endpoint
+PAYLOAD_KINDS = {
+    ASSET_ENDPOINT: 'asset',
+    ASSET_TYPE_FIELDS_ENDPOINT: 'type_fields',
+    COMPONENTS_ENDPOINT: 'components'
+}
+
+class FetchPlanner:
+    """Plan the smallest set of endpoints needed per asset and fetch each one once"""
+
+    def __init__(self, asset_cache=None):
+        self.asset_cache = asset_cache
+        self.lock = threading.Lock()
+        self.stats = {'assets': 0, 'calls': 0, 'naive_calls': 0}
+
+    def plan(self, options):
+        """Get the endpoint templates needed for the given options"""
+        needs_type_fields = any(options.get(f'include_{field}') for field in TYPE_FIELDS)
+        plan = {'asset': ASSET_TYPE_FIELDS_ENDPOINT if needs_type_fields else ASSET_ENDPOINT}
+        if options.get('components'):
+            plan['components'] = COMPONENTS_ENDPOINT
+        return plan
+
+    def naive_calls(self, options):
+        """Count the calls made when every extractor fetches its own payload"""
+        calls = 1
+        calls += sum(1 for field in TYPE_FIELDS if options.get(f'include_{field}'))
+        calls += 1 if options.get('include_description') else 0
+        calls += 1 if options.get('components') else 0
+        return calls
+
+    def use_bulk(self, asset_ids, options):
+        """Decide whether paging the assets listing is cheaper than one call per ID"""
+        mode = options.get('bulk') or BULK_CONFIG['mode']
+        if mode == 'off' or not asset_ids:
+            return False
+        if mode == 'on':
+            return True
+        # Los display_id son secuenciales: el listado cubre como mucho max(id) activos
+        pages = math.ceil(_max_id(asset_ids) / BULK_CONFIG['page_size'])
+        return pages < len(asset_ids)
+
+    def fetch(self, asset_id, options, fetch, prefetched=None):
+        """Fetch the planned payloads for an asset using fetch(endpoint)"""
+        plan, payloads = self._start(options, prefetched)
+        if 'asset' in plan:
+            payloads['asset'] = self._fetch_one(asset_id, plan.pop('asset'), fetch)
+        if _has_asset(payloads['asset']):
+            for name, template in plan.items():
+                payloads[name] = self._fetch_one(asset_id, template, fetch, payloads['asset']['asset'])
+        self._record(options, payloads, prefetched)
+        return payloads
+
+    async def fetch_async(self, asset_id, options, fetch, prefetched=None):
+        """Fetch the planned payloads for an asset using the coroutine fetch(endpoint)"""
+        plan, payloads = self._start(options, prefetched)
+        if 'asset' in plan:
+            payloads['asset'] = await self._fetch_one_async(asset_id, plan.pop('asset'), fetch)
+        if _has_asset(payloads['asset']) and plan:
+            values = await asyncio.gather(*(self._fetch_one_async(asset_id, template, fetch, payloads['asset']['asset'])
+                                            for template in plan.values()))
+            payloads.update(zip(plan.keys(), values))
+        self._record(options, payloads, prefetched)
+        return payloads
+
+    def _fetch_one(self, asset_id, template, fetch, asset=None):
+        endpoint = template.format(id=asset_id)
+        if self.asset_cache is None:
+            return fetch(endpoint)
+        if template == COMPONENTS_ENDPOINT and asset:
+            return self.asset_cache.fetch_components(asset, endpoint, fetch)
+        return self.asset_cache.fetch(asset_id, PAYLOAD_KINDS[template], endpoint, fetch)
+
+    async def _fetch_one_async(self, asset_id, template, fetch, asset=None):
+        endpoint = template.format(id=asset_id)
+        if self.asset_cache is None:
+            return await fetch(endpoint)
+        if template == COMPONENTS_ENDPOINT and asset:
+            return await self.asset_cache.fetch_components_async(asset, endpoint, fetch)
+        return await self.asset_cache.fetch_async(asset_id, PAYLOAD_KINDS[template], endpoint, fetch)
+
+    def _start(self, options, prefetched):
+        """Get the endpoints still to fetch and the payloads already available"""
+        payloads = dict(prefetched or {})
+        plan = {name: template for name, template in self.plan(options).items() if name not in payloads}
+        return plan, payloads
+
+    def _record(self, options, payloads, prefetched=None):
+        """Record calls made against the calls the unplanned path would make"""
+        naive = self.naive_calls(options) if _has_asset(payloads['asset']) else 1
+        with self.lock:
+            self.stats['assets'] += 1
+            self.stats['calls'] += len(payloads) - len(prefetched or {})
+            self.stats['naive_calls'] += naive
+
+    @property
+    def calls_saved(self):
+        """Calls avoided by fetching each endpoint once"""
+        return self.stats['naive_calls'] - self.stats['calls']
+
+def _has_asset(response):
+    return bool(response and response.get('asset'))
+
+def _max_id(asset_ids):
+    """Highest requested ID without walking an IntervalSet"""
+    return asset_ids.last if hasattr(asset_ids, 'last') else max(asset_ids)
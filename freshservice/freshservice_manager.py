@@ -1,30 +1,72 @@
 import logging
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from venv import logger
-from colorama import Fore, init
-import pandas as pd
-from .asset_manager import AssetManager
-from .excel_manager import ExcelManager
-from .data_processor import DataProcessor
-from .data_exporter import DataExporter
-from .search_manager import SearchManager
-from .location_manager import LocationManager
+from colorama import Fore, Style, init
+from .config import CONCURRENCY_CONFIG, HTTP_CONFIG, PIPELINE_CONFIG, RUN_JOURNAL_CONFIG
+from .interval_set import IntervalSet
+from .lazy import lazy_property
+from .run_journal import RunJournal
 import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tipos aceptados por -fn y /autocomplete
+NAME_TYPE_ALIASES = {
+    'department': 'departments',
+    'location': 'locations',
+    'user': 'requesters'
+}
 
 class FreshServiceManager:
     def __init__(self):
         init(autoreset=True)
-        self.asset_manager = AssetManager()
-        self.excel_manager = ExcelManager()
-        self.data_processor = DataProcessor()
-        self.data_exporter = DataExporter(self.excel_manager)
-        self.search_manager = SearchManager(self.asset_manager)
-        self.location_manager = LocationManager(self.asset_manager)  # Add this line
+        # Los gestores se crean al usarse por primera vez: -ld no necesita pandas ni openpyxl
+        self.async_request_count = 0
+        self.async_negative_hits = 0
         self._setup_logging()
+
+    @lazy_property
+    def asset_manager(self):
+        from .asset_manager import AssetManager
+        return AssetManager()
+
+    @lazy_property
+    def excel_manager(self):
+        from .excel_manager import ExcelManager
+        return ExcelManager()
+
+    @lazy_property
+    def data_processor(self):
+        from .data_processor import DataProcessor
+        return DataProcessor()
+
+    @lazy_property
+    def export_manager(self):
+        from .export_manager import ExportManager
+        return ExportManager(self.excel_manager)
+
+    @lazy_property
+    def data_exporter(self):
+        from .data_exporter import DataExporter
+        return DataExporter(self.export_manager)
+
+    @lazy_property
+    def search_manager(self):
+        from .search_manager import SearchManager
+        return SearchManager(self.asset_manager)
+
+    @property
+    def location_manager(self):
+        # El mismo gestor que usa AssetManager, para compartir el árbol ya construido
+        return self.asset_manager.location_manager
     
     def _setup_logging(self):
         """Configure logging"""
-        from . import LOGS_DIR
+        from . import LOGS_DIR, setup_logging
+        setup_logging()
         
         log_filename = os.path.join(LOGS_DIR, f'freshservice_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
         logging.basicConfig(
@@ -42,26 +84,314 @@ class FreshServiceManager:
             print(f"{Fore.RED}Error: No valid IDs found in provided input.")
             return
 
-        data = []
-        for asset_id in asset_ids:
-            # Usar el método público process_asset en lugar del privado
-            asset_data = self.asset_manager.process_asset(asset_id, options)
-            if asset_data:
-                data.append(asset_data)
+        journal = None
+        if RUN_JOURNAL_CONFIG['enabled'] and len(asset_ids) >= RUN_JOURNAL_CONFIG['min_assets']:
+            journal = RunJournal.create(options, asset_ids)
+            print(f"{Fore.CYAN}Run ID: {journal.run_id} (if interrupted, continue with --resume {journal.run_id})"
+                  f"{Style.RESET_ALL}")
+        self._run_assets(asset_ids, options, journal)
+
+    def resume(self, run_id):
+        """Continue an interrupted run: finished assets are replayed from its journal, the rest are fetched"""
+        journal = RunJournal.open(run_id)
+        if journal is None:
+            print(f"{Fore.RED}Error: No unfinished run with ID '{run_id}'.")
+            return
+        logging.info(f"Resuming run {run_id} with options: {journal.options}")
+        self._run_assets(journal.asset_ids, journal.options, journal)
 
-        if data:
-            print(f"{Fore.GREEN}Successfully processed {len(data)} entries")
-            logging.info(f"Successfully processed {len(data)} entries")
-            self._export_data(data, options)
+    def _run_assets(self, asset_ids, options, journal=None):
+        results = self.iter_results(asset_ids, options)
+        output_file = options.get('output')
+        if journal is not None:
+            done = journal.completed_ids()
+            if done:
+                print(f"{Fore.CYAN}Resuming run {journal.run_id}: {len(done)} of {len(asset_ids)} assets already "
+                      f"finished{Style.RESET_ALL}")
+            results = self._iter_journaled_results(asset_ids, options, journal, done)
+            # Al reanudar se reescribe el mismo fichero con lo ya hecho más lo nuevo
+            output_file = journal.meta['output_file'] or output_file
+
+        # Cada resultado pasa directamente al exportador: no se acumulan filas ni DataFrames
+        try:
+            count = self.write_rows(results, dict(options, output=output_file), journal)
+        except KeyboardInterrupt:
+            if journal is None:
+                raise
+            print(f"{Fore.YELLOW}Interrupted. Continue with: python fstools.py --resume {journal.run_id}")
+            return
+        except Exception:
+            if journal is not None:
+                print(f"{Fore.YELLOW}Run stopped. Continue with: python fstools.py --resume {journal.run_id}")
+            raise
+        finally:
+            if journal is not None:
+                journal.close()
+
+        if journal is not None:
+            journal.discard()
+
+        if count:
+            print(f"{Fore.GREEN}Successfully processed {count} entries")
+            logging.info(f"Successfully processed {count} entries")
         else:
             print(f"{Fore.YELLOW}No data obtained")
             logging.warning("No data obtained")
 
-    def _export_data(self, data, options):
-        """Export processed data"""
-        df = self.data_processor.process_dataframe(data)
-        if df is not None:
-            self.data_exporter.export_data(df, options)
+        self._report_stats()
+
+    def iter_results(self, asset_ids, options):
+        """Yield the processed result of each found asset, in input order"""
+        for _, asset_data in self._iter_asset_data(asset_ids, options):
+            if asset_data:
+                yield asset_data
+
+    def _iter_journaled_results(self, asset_ids, options, journal, done):
+        """Replay the journaled results, then process and journal the assets still pending"""
+        for _, asset_data in journal.iter_completed():
+            if asset_data:
+                yield asset_data
+        pending = asset_ids - IntervalSet.from_ids(done)
+        for asset_id, asset_data in self._iter_asset_data(pending, options):
+            journal.record(asset_id, asset_data)
+            if asset_data:
+                yield asset_data
+
+    def write_rows(self, results, options, journal=None, columns=None):
+        """Stream results as rows to the -o exporter (and a console preview); return the rows written
+
+        The columns come from the run options (every key a result can have), so keys that only show up
+        after the exporter's first rows are not lost.
+        """
+        if columns is None:
+            columns = self.asset_manager.result_columns(options)
+        columns = self.data_processor.order_columns(columns)
+        exporter = None
+        preview = []
+        count = 0
+        try:
+            for row in self.data_processor.iter_rows(results):
+                if exporter is None and options.get('output'):
+                    # Se abre con la primera fila: sin resultados no se crea ningún fichero
+                    exporter = self.export_manager.open(options['output'], columns,
+                                                        overwrite=bool(journal and journal.meta['output_file']))
+                    if journal is not None:
+                        journal.set_output_file(exporter.output_file)
+                if exporter is not None:
+                    exporter.write(row)
+                if len(preview) < PIPELINE_CONFIG['preview_rows']:
+                    preview.append(row)
+                count += 1
+        except BaseException:
+            # Interrupción o error: el fichero no se completa como si la exportación hubiera terminado
+            if exporter is not None:
+                exporter.abort()
+            raise
+        if exporter is not None:
+            exporter.close()
+            print(f"{Fore.GREEN}Exported {exporter.rows} rows to {exporter.output_file}{Style.RESET_ALL}")
+            if exporter.dropped:
+                print(f"{Fore.YELLOW}Warning: columns not exported: {', '.join(sorted(exporter.dropped))}"
+                      f"{Style.RESET_ALL}")
+
+        if options.get('verbose') and preview:
+            import pandas as pd
+            print(pd.DataFrame(preview))
+            if count > len(preview):
+                print(f"... {count - len(preview)} more rows")
+        return count
+
+    def _iter_asset_data(self, asset_ids, options):
+        """Yield (asset_id, data) in input order, using worker threads when configured"""
+        workers = max(int(options.get('workers') or CONCURRENCY_CONFIG['workers']), 1)
+        if self.asset_manager.mirror is not None:
+            # Todo sale de la copia local: sin llamadas a la API, por ventanas para acotar la memoria
+            for window in _windows(asset_ids, PIPELINE_CONFIG['window_size']):
+                prefetched = self.asset_manager.mirror.prefetch(window, options)
+                for asset_id in window:
+                    yield asset_id, self._process_asset_safely(asset_id, options, prefetched.pop(asset_id, None))
+            return
+
+        self.asset_manager.asset_cache.revalidate()
+        prefetched = {}
+        if self.asset_manager.fetch_planner.use_bulk(asset_ids, options):
+            print(f"{Fore.CYAN}Using bulk listing mode for {len(asset_ids)} IDs{Style.RESET_ALL}")
+            prefetched = self.asset_manager.get_assets_bulk(asset_ids, workers)
+
+        if options.get('async_concurrency'):
+            yield from self._iter_asset_data_async(asset_ids, options, prefetched)
+            return
+
+        if prefetched and options.get('components'):
+            asset_ids = self._prefetch_components_by_window(asset_ids, prefetched)
+
+        if workers == 1:
+            for asset_id in asset_ids:
+                yield asset_id, self._process_asset_safely(asset_id, options, prefetched.pop(asset_id, None))
+            return
+
+        if workers > HTTP_CONFIG['pool_maxsize']:
+            logging.warning(f"{workers} workers exceed the HTTP pool size ({HTTP_CONFIG['pool_maxsize']}), "
+                            "extra connections will not be reused")
+
+        # Cola acotada: como mucho max_in_flight assets pendientes a la vez
+        max_in_flight = workers * CONCURRENCY_CONFIG['max_in_flight_factor']
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asset-worker')
+        pending = deque()
+        try:
+            for asset_id in asset_ids:
+                future = executor.submit(self._process_asset_safely, asset_id, options, prefetched.pop(asset_id, None))
+                pending.append((asset_id, future))
+                if len(pending) >= max_in_flight:
+                    done_id, future = pending.popleft()
+                    yield done_id, future.result()
+            while pending:
+                done_id, future = pending.popleft()
+                yield done_id, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _prefetch_components_by_window(self, asset_ids, prefetched):
+        """Yield the IDs, fetching the components of each window of listed assets concurrently first"""
+        for window in _windows(asset_ids, PIPELINE_CONFIG['window_size']):
+            self.asset_manager.component_manager.prefetch(
+                {asset_id: prefetched[asset_id] for asset_id in window if asset_id in prefetched}
+            )
+            yield from window
+
+    def _iter_asset_data_async(self, asset_ids, options, prefetched=None):
+        """Yield (asset_id, data) in input order from the asyncio client"""
+        import asyncio
+        from .async_asset_manager import AsyncAssetManager
+
+        # Cargar el índice antes del event loop para no bloquearlo después
+        reference_index = self.asset_manager.reference_index
+        if options.get('include_departments'):
+            reference_index.ensure_loaded('departments')
+        if options.get('include_location'):
+            reference_index.ensure_loaded('locations')
+
+        loop = asyncio.new_event_loop()
+        async_manager = AsyncAssetManager(options['async_concurrency'], self.asset_manager.fetch_planner,
+                                          reference_index)
+        results = async_manager.iter_assets(asset_ids, options, prefetched)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.run_until_complete(async_manager.close())
+            loop.close()
+            self.async_request_count += async_manager.request_counter
+            self.async_negative_hits += async_manager.cache.negative_stats['hits']
+            logging.info(f"Async client made {async_manager.request_counter} requests")
+
+    def _process_asset_safely(self, asset_id, options, prefetched=None):
+        """Process one asset, isolating failures so the rest of the run continues"""
+        try:
+            return self.asset_manager.process_asset(asset_id, options, prefetched)
+        except Exception as e:
+            logging.error(f"Error processing asset {asset_id}: {e}")
+            return None
+
+    def _report_stats(self):
+        """Log and show API usage statistics for the run"""
+        stats = self.asset_manager.get_connection_stats()
+        logging.info(f"Connection stats: {stats}")
+        print(f"{Fore.CYAN}API requests: {stats['requests']} "
+              f"(connections opened: {stats['connections']}, reused: {stats['reused']}){Style.RESET_ALL}")
+        if self.async_request_count:
+            print(f"{Fore.CYAN}Async API requests: {self.async_request_count}{Style.RESET_ALL}")
+
+        planner = self.asset_manager.fetch_planner
+        logging.info(f"Fetch planner stats: {planner.stats}")
+        if planner.calls_saved:
+            print(f"{Fore.CYAN}Fetch planner: {planner.calls_saved} duplicate asset calls avoided "
+                  f"over {planner.stats['assets']} assets{Style.RESET_ALL}")
+
+        asset_cache_stats = self.asset_manager.asset_cache.stats
+        logging.info(f"Asset cache stats: {asset_cache_stats}")
+        if asset_cache_stats['hits'] or asset_cache_stats['check_calls']:
+            print(f"{Fore.CYAN}Asset cache: {asset_cache_stats['hits']} payloads reused, "
+                  f"{asset_cache_stats['changed']} assets changed since last run "
+                  f"({asset_cache_stats['check_calls']} check requests){Style.RESET_ALL}")
+
+        bulk_stats = self.asset_manager.bulk_stats
+        if bulk_stats['pages']:
+            print(f"{Fore.CYAN}Bulk listing: {bulk_stats['pages']} pages fetched "
+                  f"for {bulk_stats['assets']} assets{Style.RESET_ALL}")
+
+        cache_stats = self.asset_manager.cache.get_stats()
+        logging.info(f"Cache stats: {cache_stats}")
+        for cache_type, tiers in sorted(cache_stats.items()):
+            memory, disk = tiers['memory'], tiers['disk']
+            print(f"{Fore.CYAN}Cache {cache_type}: {memory.get('hits', 0)} memory hits, "
+                  f"{disk.get('hits', 0)} disk hits, {disk.get('misses', 0)} misses, "
+                  f"{memory.get('evictions', 0)} evictions{Style.RESET_ALL}")
+
+        negative_stats = self.asset_manager.cache.negative_stats
+        negative_hits = negative_stats['hits'] + self.async_negative_hits
+        logging.info(f"Negative cache stats: {negative_stats} (async hits: {self.async_negative_hits})")
+        if negative_hits or negative_stats['stored']:
+            print(f"{Fore.CYAN}Negative cache: {negative_hits} calls saved on known misses, "
+                  f"{negative_stats['stored']} new misses recorded{Style.RESET_ALL}")
+
+        limiter_stats = self.asset_manager.rate_limiter.stats
+        logging.info(f"Rate limiter stats: {limiter_stats}")
+        if limiter_stats['throttled'] or limiter_stats['waited_seconds']:
+            print(f"{Fore.CYAN}Rate limit: {limiter_stats['throttled']} throttled responses retried, "
+                  f"{limiter_stats['waited_seconds']:.1f}s cumulative wait across requests{Style.RESET_ALL}")
+
+    def sync_inventory(self, full=False, workers=None):
+        """Update the local inventory mirror (full load the first time, then only changed assets)"""
+        from .cache_warmer import ListingError
+        from .inventory_mirror import InventoryMirror
+
+        mirror = InventoryMirror(self.asset_manager)
+        try:
+            stats = mirror.sync(full=full, workers=workers)
+        except ListingError as e:
+            logger.error(f"Inventory sync failed: {e}")
+            print(f"{Fore.RED}Error: inventory sync failed, the mirror was left unchanged: {e}{Style.RESET_ALL}")
+            return None
+        print(f"{Fore.GREEN}Inventory {stats['mode']} sync finished in {stats['seconds']}s: "
+              f"{stats['assets']} assets, {stats['deleted']} deleted, {stats['components']} component lists, "
+              f"{stats['requesters']} requesters{Style.RESET_ALL}")
+        if stats['failed']:
+            print(f"{Fore.YELLOW}Warning: {stats['failed']} assets could not be fetched; "
+                  f"the next sync will retry them{Style.RESET_ALL}")
+        return stats
+
+    def use_mirror(self):
+        """Serve asset queries and searches from the local inventory mirror"""
+        from .inventory_mirror import InventoryMirror
+
+        mirror = InventoryMirror(self.asset_manager)
+        if mirror.last_sync is None:
+            print(f"{Fore.RED}Error: the inventory mirror is empty. Run with --sync first.{Style.RESET_ALL}")
+            return False
+        mirror.load_reference_index(self.asset_manager.reference_index)
+        self.asset_manager.mirror = mirror
+        print(f"{Fore.CYAN}Using inventory mirror (last sync: {mirror.last_sync}){Style.RESET_ALL}")
+        return True
+
+    def warm_cache(self, workers=None):
+        """Prefetch all reference data into the cache before the first query"""
+        from .cache_warmer import CacheWarmer, ListingError
+
+        start_time = time.time()
+        try:
+            counts = CacheWarmer(self.asset_manager, workers).warm()
+        except ListingError as e:
+            logger.error(f"Cache warm-up failed: {e}")
+            print(f"{Fore.RED}Error: cache warm-up failed: {e}{Style.RESET_ALL}")
+            return None
+        summary = ', '.join(f"{count} {ref_type}" for ref_type, count in counts.items())
+        print(f"{Fore.GREEN}Cache warmed in {time.time() - start_time:.1f}s: {summary}{Style.RESET_ALL}")
+        return counts
 
     def list_departments(self):
         """List all departments"""
@@ -148,31 +478,111 @@ class FreshServiceManager:
             
         return processed_data, f"Assets found in department: {department_name}"
 
-    def search_by_location(self, location_name, output_file=None):
-        """Search assets by location"""
+    def search_by_location(self, location_name, output_file=None, include_sublocations=False):
+        """Search assets by location (optionally including every sublocation)"""
         loc_id = self.asset_manager.map_location_name_to_id(location_name)
         if not loc_id:
             return None, "Location not found"
             
-        assets = self.asset_manager.get_assets_by_location(loc_id)
+        assets = self.asset_manager.get_assets_by_location(loc_id, include_sublocations)
         if not assets:
             return None, "No assets found in this location"
             
         processed_data = []
         for asset in assets:
-            processed_data.append({
+            asset_info = {
                 'Asset ID': asset.get('display_id'),
                 'Name': asset.get('name'),
                 'Department': self.asset_manager._get_department_name(asset),
                 'Type': self.asset_manager._get_asset_type(asset),
                 'State': asset.get('asset_state')
-            })
+            }
+            if include_sublocations:
+                asset_info['Location'] = self.location_manager.get_location_path(asset.get('location_id'))
+            processed_data.append(asset_info)
 
         if output_file:
             self.search_manager.export_results(assets, output_file)
             
         return processed_data, f"Assets found in location: {location_name}"
 
+    def suggest_names(self, name_type, text, prefix=False, limit=None):
+        """Get [(name, score)] of the names closest to text, or None for an unknown type"""
+        name_type = NAME_TYPE_ALIASES.get(name_type)
+        if name_type is None:
+            return None
+        name_index = self.asset_manager.name_index
+        if name_type == 'requesters' and not name_index.use_requesters():
+            return []
+        if prefix:
+            return [(name, 1.0) for name in name_index.complete(name_type, text, limit)]
+        return [(name, score) for name, _, score in name_index.search(name_type, text, limit)]
+
+    def search_assets(self, user=None, department=None, location=None, page=None, per_page=None,
+                      include_sublocations=False):
+        """Search assets matching every given user/department/location name (answered by the asset index)"""
+        criteria = {}
+        if user:
+            try:
+                first_name, last_name = user.split(' ', 1)
+            except ValueError:
+                return None, "Error: Full name must include first and last name"
+            found = self.asset_manager.get_user_by_name(first_name, last_name)
+            if not found:
+                return None, "User not found"
+            criteria['user_id'] = found['id']
+        if department:
+            criteria['department_id'] = self.asset_manager.map_department_name_to_id(department)
+            if not criteria['department_id']:
+                return None, "Department not found"
+        if location:
+            criteria['location_id'] = self.asset_manager.map_location_name_to_id(location)
+            if not criteria['location_id']:
+                return None, "Location not found"
+            if include_sublocations:
+                criteria['location_id'] = self.location_manager.get_subtree_ids(criteria['location_id'])
+        if not criteria:
+            return None, "Error: At least one search criterion is required"
+
+        from .cache_warmer import ListingError
+
+        index = self.asset_manager.asset_index
+        try:
+            if page:
+                assets = index.page(page, per_page, **criteria)
+            else:
+                assets = index.get_assets(**criteria)
+        except ListingError as e:
+            logger.error(f"Asset index load failed: {e}")
+            return None, "Error: the asset index could not be loaded, try again later"
+        if not assets:
+            return None, "No assets found for these criteria"
+
+        processed_data = [{
+            'Asset ID': asset.get('display_id'),
+            'Name': asset.get('name'),
+            'Department': self.asset_manager._get_department_name(asset),
+            'Location': self.asset_manager._get_location_name(asset),
+            'Type': self.asset_manager._get_asset_type(asset),
+            'State': asset.get('asset_state')
+        } for asset in assets]
+        return processed_data, f"{index.count(**criteria)} assets found"
+
+    def load_asset_index(self):
+        """Load the in-memory asset index used by the searches"""
+        from .cache_warmer import ListingError
+
+        start_time = time.time()
+        try:
+            self.asset_manager.asset_index.ensure_loaded()
+        except ListingError as e:
+            logger.error(f"Asset index load failed: {e}")
+            print(f"{Fore.RED}Error: the asset index could not be loaded: {e}{Style.RESET_ALL}")
+            return False
+        print(f"{Fore.GREEN}Asset index loaded in {time.time() - start_time:.1f}s: "
+              f"{len(self.asset_manager.asset_index.records)} assets{Style.RESET_ALL}")
+        return True
+
     def import_excel_ids(self, excel_file):
         """Import IDs from Excel and export to txt"""
         if not excel_file.endswith(('.xlsx', '.xls')):
@@ -191,10 +601,10 @@ class FreshServiceManager:
             
             # Export IDs to txt file
             with open(output_file, 'w') as f:
-                f.write(','.join(map(str, ids)))
+                f.write(ids.to_text())
 
             print(f"{Fore.GREEN}Successfully exported {len(ids)} IDs to {output_file}")
-            print(f"{Fore.CYAN}IDs: {','.join(map(str, ids[:5])) + ('...' if len(ids) > 5 else '')}")
+            print(f"{Fore.CYAN}IDs: {','.join(map(str, islice(ids, 5))) + ('...' if len(ids) > 5 else '')}")
 
         except Exception as e:
             print(f"{Fore.RED}Error processing Excel file: {str(e)}")
@@ -233,20 +643,24 @@ class FreshServiceManager:
         if not asset_ids:
             return None
 
-        data = []
-        for asset_id in asset_ids:
-            asset_data = self.asset_manager.process_asset(asset_id, options)
-            if asset_data:
-                data.append(asset_data)
-
+        data = list(self.iter_results(asset_ids, options))
         return data if data else None
 
+    def export_results(self, results, output_file):
+        """Export run_and_get_results() output through the same row pipeline as -o; return the rows written"""
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        results = results or []
+        # Los resultados ya están en memoria: las columnas salen de todas las filas
+        columns = dict.fromkeys(key for row in self.data_processor.iter_rows(results) for key in row)
+        return self.write_rows(results, {'output': output_file}, columns=columns)
+
     def export_to_excel(self, data, output_file):
         """Export data to Excel file"""
         try:
             if not data:
                 return False
-                
+
+            import pandas as pd
             # Si los datos son una lista de departamentos, formatear adecuadamente
             if isinstance(data, list) and all('Departamento' in d for d in data):
                 df = pd.DataFrame(data)
@@ -263,3 +677,11 @@ class FreshServiceManager:
         except Exception as e:
             logger.error(f"Error exporting to Excel: {e}")
             return False
+
+def _windows(items, size):
+    """Split a list or IntervalSet into consecutive lists of at most size items"""
+    iterator = iter(items)
+    window = list(islice(iterator, size))
+    while window:
+        yield window
+        window = list(islice(iterator, size))
@@ -0,0 +1,155 @@
+import csv
+import io
+import logging
+import os
+from .interval_set import ID_SEPARATORS, IntervalSet, parse_id_part
+
+logger = logging.getLogger(__name__)
+
+# Extensiones aceptadas por -i, -ie y la subida de ficheros de la web
+ID_FILE_EXTENSIONS = ('.txt', '.csv', '.tsv', '.xlsx', '.xlsm', '.xls')
+
+# Rangos acumulados (como mínimo) antes de fundirlos en el conjunto
+MERGE_EVERY = 50000
+TEXT_CHUNK_SIZE = 64 * 1024
+MAX_INVALID_KEPT = 20
+
+class IdReadResult:
+    """IDs read from a file plus a sample of the values that were not valid IDs"""
+
+    def __init__(self, ids, invalid, invalid_count):
+        self.ids = ids
+        self.invalid = invalid
+        self.invalid_count = invalid_count
+
+def read_ids(source, filename=None):
+    """Stream the IDs of a path or binary file object (e.g. an upload) into an IntervalSet
+
+    Text files may separate IDs and ranges with commas, semicolons or newlines; CSV/TSV and
+    Excel files use their first column. Memory depends on the number of ranges, not of IDs.
+    """
+    filename = filename or (source if isinstance(source, str) else getattr(source, 'name', ''))
+    extension = os.path.splitext(str(filename).lower())[1]
+    if extension not in ID_FILE_EXTENSIONS:
+        extension = '.txt'
+
+    if isinstance(source, str):
+        with open(source, 'rb') as stream:
+            return _read_stream(stream, extension)
+    return _read_stream(source, extension)
+
+def _read_stream(stream, extension):
+    if extension in ('.xlsx', '.xlsm'):
+        values = _iter_xlsx(stream)
+    elif extension == '.xls':
+        values = _iter_xls(stream)
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            if extension in ('.csv', '.tsv'):
+                return _collect(_iter_csv(text, '\t' if extension == '.tsv' else None))
+            return _collect(_iter_text(text))
+        finally:
+            # No cerrar el fichero del llamador (p. ej. la subida de Flask)
+            text.detach()
+    return _collect(values)
+
+def _collect(values):
+    """Merge (value, is_header) pairs into an IntervalSet in bounded batches"""
+    merged = IntervalSet()
+    pending = []
+    invalid = []
+    invalid_count = 0
+    for value, is_header in values:
+        if value.__class__ is str and value.isdecimal():
+            # Caso habitual: un ID suelto en texto
+            id_range = (int(value),) * 2
+        else:
+            id_range = _parse_value(value)
+        if id_range is None:
+            if not is_header:
+                invalid_count += 1
+                if len(invalid) < MAX_INVALID_KEPT:
+                    invalid.append(str(value))
+            continue
+        start, end = id_range
+        # IDs consecutivos (lo habitual) alargan el último rango sin crecer la lista
+        if pending and pending[-1][1] + 1 == start and end >= start:
+            pending[-1] = (pending[-1][0], end)
+        else:
+            pending.append(id_range)
+            # El lote crece con el conjunto: cada rango se funde un número acotado de veces
+            if len(pending) >= max(MERGE_EVERY, len(merged.starts)):
+                merged = merged | IntervalSet(pending)
+                pending = []
+    if pending:
+        merged = merged | IntervalSet(pending)
+    logger.info(f"Read {len(merged)} IDs in {len(merged.starts)} ranges ({invalid_count} invalid values)")
+    return IdReadResult(merged, invalid, invalid_count)
+
+def _parse_value(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value, value
+    if isinstance(value, float):
+        return (int(value), int(value)) if value.is_integer() else None
+    return parse_id_part(str(value).strip())
+
+def _iter_text(text):
+    """Yield the parts of a comma/semicolon/newline separated text, reading fixed-size chunks"""
+    rest = ''
+    while True:
+        chunk = text.read(TEXT_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts = ID_SEPARATORS.split(rest + chunk)
+        # La última parte puede estar cortada por el final del bloque
+        rest = parts.pop()
+        for part in parts:
+            if part:
+                yield part, False
+    if rest.strip():
+        yield rest.strip(), False
+
+def _iter_csv(text, delimiter=None):
+    """Yield the first column of a CSV/TSV; the first row may be a header"""
+    if delimiter is None:
+        sample = text.read(TEXT_CHUNK_SIZE)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+        except csv.Error:
+            delimiter = ','
+        text = _iter_lines(sample, text)
+    for row_number, row in enumerate(csv.reader(text, delimiter=delimiter)):
+        if row and row[0].strip():
+            yield row[0].strip(), row_number == 0
+
+def _iter_xlsx(stream):
+    """Yield the first column of the first sheet in read-only mode (rows are not kept in memory)"""
+    import openpyxl
+    wb = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for row_number, row in enumerate(ws.iter_rows(min_col=1, max_col=1, values_only=True)):
+            value = row[0] if row else None
+            if value is not None and value != '':
+                yield value, row_number == 0
+    finally:
+        wb.close()
+
+def _iter_xls(stream):
+    """Old .xls files have no streaming reader: they are loaded whole with pandas (needs xlrd)"""
+    import pandas as pd
+    df = pd.read_excel(stream, header=None, usecols=[0])
+    for row_number, value in enumerate(df.iloc[:, 0].dropna()):
+        yield value, row_number == 0
+
+def _iter_lines(sample, text):
+    """Lines of an already read sample followed by the rest of the stream"""
+    for line in io.StringIO(sample, newline=''):
+        # Una línea cortada al final de la muestra se completa con el resto del fichero
+        if not line.endswith(('\n', '\r')):
+            line += text.readline()
+        yield line
+    yield from text
@@ -0,0 +1,158 @@
+import re
+from bisect import bisect_right
+from itertools import chain
+
+class IntervalSet:
+    """Immutable sorted set of integers stored as merged inclusive ranges, e.g. 1-500000 is one range"""
+
+    __slots__ = ('starts', 'ends', '_size')
+
+    def __init__(self, ranges=()):
+        starts, ends = [], []
+        for start, end in sorted((int(start), int(end)) for start, end in ranges if start <= end):
+            # Rangos solapados o contiguos se funden en uno
+            if ends and start <= ends[-1] + 1:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        self.starts = starts
+        self.ends = ends
+        self._size = sum(end - start + 1 for start, end in zip(starts, ends))
+
+    @classmethod
+    def from_ids(cls, ids):
+        """Build the set from individual IDs"""
+        return cls((id_, id_) for id_ in ids)
+
+    @classmethod
+    def _from_merged(cls, starts, ends):
+        interval_set = cls()
+        interval_set.starts, interval_set.ends = starts, ends
+        interval_set._size = sum(end - start + 1 for start, end in zip(starts, ends))
+        return interval_set
+
+    def ranges(self):
+        """Get the (start, end) inclusive ranges in order"""
+        return list(zip(self.starts, self.ends))
+
+    @property
+    def first(self):
+        return self.starts[0] if self.starts else None
+
+    @property
+    def last(self):
+        return self.ends[-1] if self.ends else None
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return bool(self.starts)
+
+    def __iter__(self):
+        return chain.from_iterable(range(start, end + 1) for start, end in zip(self.starts, self.ends))
+
+    def __contains__(self, value):
+        if not isinstance(value, int):
+            return False
+        index = bisect_right(self.starts, value) - 1
+        return index >= 0 and value <= self.ends[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self.starts == other.starts and self.ends == other.ends
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    def union(self, other):
+        return IntervalSet(chain(self.ranges(), other.ranges()))
+
+    def intersection(self, other):
+        """Get the IDs in both sets (linear in the number of ranges)"""
+        starts, ends = [], []
+        i = j = 0
+        while i < len(self.starts) and j < len(other.starts):
+            start = max(self.starts[i], other.starts[j])
+            end = min(self.ends[i], other.ends[j])
+            if start <= end:
+                starts.append(start)
+                ends.append(end)
+            if self.ends[i] < other.ends[j]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet._from_merged(starts, ends)
+
+    def difference(self, other):
+        """Get the IDs of this set not in other (linear in the number of ranges)"""
+        starts, ends = [], []
+        j = 0
+        for start, end in zip(self.starts, self.ends):
+            # Saltar los rangos a restar que terminan antes de este
+            while j < len(other.starts) and other.ends[j] < start:
+                j += 1
+            k = j
+            while k < len(other.starts) and other.starts[k] <= end:
+                if other.starts[k] > start:
+                    starts.append(start)
+                    ends.append(other.starts[k] - 1)
+                start = max(start, other.ends[k] + 1)
+                k += 1
+            if start <= end:
+                starts.append(start)
+                ends.append(end)
+        return IntervalSet._from_merged(starts, ends)
+
+    def to_text(self):
+        """Format as the -i syntax, e.g. '1-5,8,10-12'"""
+        return ','.join(str(start) if start == end else f'{start}-{end}' for start, end in zip(self.starts, self.ends))
+
+    def __repr__(self):
+        text = self.to_text()
+        return f"IntervalSet('{text if len(text) <= 80 else text[:77] + '...'}')"
+
+ID_SEPARATORS = re.compile(r'[,;\s]+')
+
+def parse_ids(text):
+    """Parse '143-150,155' style input (commas or whitespace between parts) into (IntervalSet, invalid parts)"""
+    ranges = []
+    invalid = []
+    for part in ID_SEPARATORS.split(str(text or '').strip()):
+        if not part:
+            continue
+        id_range = parse_id_part(part)
+        if id_range is None:
+            invalid.append(part)
+        else:
+            ranges.append(id_range)
+    return IntervalSet(ranges), invalid
+
+def parse_id_part(part):
+    """Parse one ID ('155', '155.0' from Excel) or range ('143-150') into (start, end), or None if invalid"""
+    if '-' in part:
+        try:
+            start, end = map(int, part.split('-'))
+        except ValueError:
+            return None
+        # Un rango invertido (150-143) se informa como inválido en lugar de descartarse sin aviso
+        return (start, end) if start <= end else None
+    if part.isdecimal():
+        return int(part), int(part)
+    # Manejar números con .0 desde Excel; '10.05' o '1.0.0' no son IDs
+    try:
+        value = float(part)
+    except ValueError:
+        return None
+    if not part[0].isdecimal() or not value.is_integer():
+        return None
+    return int(value), int(value)
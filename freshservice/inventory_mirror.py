@@ -0,0 +1,309 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .asset_cache import fetch_changed_since, utc_watermark
+from .cache_warmer import CacheWarmer, ListingError
+from .config import CACHE_CONFIG, MIRROR_CONFIG
+from .reference_index import REFERENCE_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Campos de enlace de un activo que se indexan para las búsquedas
+ASSET_LINKS = ('user_id', 'department_id', 'location_id', 'asset_type_id')
+
+class InventoryMirror:
+    """Local SQLite mirror of assets, components, requesters and reference data"""
+
+    def __init__(self, api, db_path=None):
+        from . import CACHE_DIR
+        self.api = api
+        self.db_path = str(db_path or MIRROR_CONFIG.get('db_path') or os.path.join(CACHE_DIR, 'inventory.db'))
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS assets (
+                    display_id INTEGER PRIMARY KEY,
+                    user_id INTEGER,
+                    department_id INTEGER,
+                    location_id INTEGER,
+                    asset_type_id INTEGER,
+                    updated_at TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_assets_user ON assets (user_id);
+                CREATE INDEX IF NOT EXISTS idx_assets_department ON assets (department_id);
+                CREATE INDEX IF NOT EXISTS idx_assets_location ON assets (location_id);
+                CREATE TABLE IF NOT EXISTS components (
+                    display_id INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS requesters (
+                    id INTEGER PRIMARY KEY,
+                    full_name TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_requesters_name ON requesters (full_name);
+                CREATE TABLE IF NOT EXISTS reference (
+                    ref_type TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (ref_type, id)
+                );
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def _connect(self):
+        """Get this thread's connection (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get_state(self, key):
+        row = self._connect().execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def last_sync(self):
+        """Watermark of the last completed sync, or None if the mirror was never loaded"""
+        return self.get_state('assets_watermark')
+
+    # --- Sincronización ---
+
+    def sync(self, full=False, workers=None):
+        """Bring the mirror up to date and return counters of what was synced
+
+        Raises ListingError (leaving the mirror as it was) if the listing of a full load fails.
+        """
+        workers = max(workers or MIRROR_CONFIG['workers'], 1)
+        start = time.time()
+        # Marca tomada antes de empezar: lo que cambie durante la sincronización entra en la siguiente
+        watermark = utc_watermark(CACHE_CONFIG['assets']['clock_skew_seconds'])
+        since = None if full else self.last_sync
+
+        stats = {'mode': 'incremental' if since else 'full', 'assets': 0, 'deleted': 0, 'components': 0, 'failed': 0,
+                 'reconciled': False}
+        stats.update(self._sync_references(workers))
+
+        changed = None
+        if since:
+            changed, _ = fetch_changed_since(self.api, since, MIRROR_CONFIG['max_incremental_pages'])
+            if changed is None:
+                logger.info("Too many changes for an incremental sync, doing a full load")
+                stats['mode'] = 'full'
+
+        if changed is None:
+            assets = CacheWarmer(self.api, workers).fetch_listing('assets', 'include=type_fields&')
+            display_ids = [asset['display_id'] for asset in assets if 'display_id' in asset]
+            deleted, failed = [], []
+            reconciled = True
+        else:
+            display_ids = set(changed)
+            reconciled = self._reconcile_due()
+            if reconciled:
+                # El listado de cambios no incluye los activos borrados: se buscan los que ya no aparecen
+                unlisted = self._unlisted_ids(workers)
+                reconciled = unlisted is not None
+                display_ids |= unlisted or set()
+            display_ids = sorted(display_ids)
+            assets, deleted, failed = self._fetch_assets(display_ids, workers)
+
+        components = {}
+        if MIRROR_CONFIG['components']:
+            found = {asset['display_id'] for asset in assets if 'display_id' in asset}
+            components, failed_components = self._fetch_components(
+                [display_id for display_id in display_ids if display_id in found], workers
+            )
+            failed.extend(failed_components)
+
+        # Una sola transacción: si algo falla al escribir, la copia queda como estaba
+        with self._connect() as conn:
+            if changed is None:
+                conn.execute("DELETE FROM assets")
+            self._store_assets(conn, assets)
+            conn.executemany("DELETE FROM assets WHERE display_id = ?", [(i,) for i in deleted])
+            if changed is None:
+                # Los componentes que no se pudieron pedir se conservan mientras el activo exista
+                conn.execute("DELETE FROM components WHERE display_id NOT IN (SELECT display_id FROM assets)")
+            else:
+                conn.executemany("DELETE FROM components WHERE display_id = ?", [(i,) for i in deleted])
+            conn.executemany("INSERT OR REPLACE INTO components (display_id, data) VALUES (?, ?)",
+                             components.items())
+            # Con fallos la marca no avanza: la próxima sincronización vuelve a pedir esos activos
+            if not failed:
+                self._set_state(conn, 'assets_watermark', watermark)
+                if reconciled:
+                    self._set_state(conn, 'reconciled_at', str(start))
+
+        stats.update(assets=len(assets), deleted=len(deleted), components=len(components), failed=len(set(failed)),
+                     reconciled=reconciled)
+        stats['seconds'] = round(time.time() - start, 1)
+        if failed:
+            logger.warning(f"Inventory mirror sync could not fetch {len(set(failed))} assets, watermark not advanced")
+        logger.info(f"Inventory mirror sync finished: {stats}")
+        return stats
+
+    def _sync_references(self, workers):
+        """Reload requesters and the reference lists (small enough to fetch whole every sync)"""
+        records = CacheWarmer(self.api, workers).fetch_all(list(REFERENCE_TYPES) + ['requesters'])
+        with self._connect() as conn:
+            for ref_type in REFERENCE_TYPES:
+                conn.execute("DELETE FROM reference WHERE ref_type = ?", (ref_type,))
+                conn.executemany(
+                    "INSERT INTO reference (ref_type, id, data) VALUES (?, ?, ?)",
+                    [(ref_type, record['id'], json.dumps(record)) for record in records[ref_type] if 'id' in record]
+                )
+            conn.execute("DELETE FROM requesters")
+            conn.executemany(
+                "INSERT INTO requesters (id, full_name, data) VALUES (?, ?, ?)",
+                [(user['id'], _full_name(user.get('first_name'), user.get('last_name')), json.dumps(user))
+                 for user in records['requesters'] if 'id' in user]
+            )
+        return {ref_type: len(items) for ref_type, items in records.items()}
+
+    def _reconcile_due(self):
+        """Check whether this incremental sync should also look for deleted assets"""
+        hours = MIRROR_CONFIG.get('reconcile_hours')
+        if not hours:
+            return False
+        reconciled_at = self.get_state('reconciled_at')
+        return reconciled_at is None or time.time() - float(reconciled_at) > hours * 3600
+
+    def _unlisted_ids(self, workers):
+        """Get the mirrored IDs missing from the asset listing, or None if the listing failed"""
+        try:
+            listed = {asset.get('display_id') for asset in CacheWarmer(self.api, workers).fetch_listing('assets')}
+        except ListingError as e:
+            logger.warning(f"Inventory mirror reconciliation skipped: {e}")
+            return None
+        mirrored = {display_id for display_id, in self._connect().execute("SELECT display_id FROM assets")}
+        # Solo candidatos: se borran si además dan 404 (el listado se desplaza si algo cambia mientras se pide)
+        return mirrored - listed
+
+    def _fetch_assets(self, display_ids, workers):
+        """Refetch changed assets and return (assets, deleted IDs, failed IDs)
+
+        Only assets that answered 404 (recorded in the negative cache) count as deleted; an error or
+        timeout is a failure and the asset stays in the mirror.
+        """
+        for display_id in display_ids:
+            # Un 404 anterior (p. ej. un hueco de -i 1-20000) no vale: el activo ha cambiado desde entonces
+            self.api.cache.clear_missing(f'assets/{display_id}')
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mirror-asset') as executor:
+            responses = list(executor.map(
+                lambda display_id: self.api.make_request(f'assets/{display_id}?include=type_fields'), display_ids
+            ))
+        assets, deleted, failed = [], [], []
+        for display_id, response in zip(display_ids, responses):
+            if response and response.get('asset'):
+                assets.append(response['asset'])
+            elif response is None and self.api.cache.is_missing(f'assets/{display_id}'):
+                deleted.append(display_id)
+            else:
+                failed.append(display_id)
+        return assets, deleted, failed
+
+    def _fetch_components(self, display_ids, workers):
+        """Fetch the components of the given assets and return ({display_id: JSON}, failed IDs)"""
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mirror-components') as executor:
+            responses = executor.map(
+                lambda display_id: (display_id, self.api.make_request(f'assets/{display_id}/components')),
+                display_ids
+            )
+            components, failed = {}, []
+            for display_id, response in responses:
+                if response is None:
+                    failed.append(display_id)
+                else:
+                    components[display_id] = json.dumps(response.get('components') or [])
+        return components, failed
+
+    def _store_assets(self, conn, assets):
+        conn.executemany(
+            "INSERT OR REPLACE INTO assets (display_id, user_id, department_id, location_id, asset_type_id, "
+            "updated_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(asset['display_id'], *(asset.get(field) for field in ASSET_LINKS), asset.get('updated_at'),
+              json.dumps(asset))
+             for asset in assets if 'display_id' in asset]
+        )
+
+    # --- Consultas ---
+
+    def load_reference_index(self, reference_index):
+        """Load the mirrored reference lists into a ReferenceIndex"""
+        for ref_type in REFERENCE_TYPES:
+            rows = self._connect().execute("SELECT data FROM reference WHERE ref_type = ?", (ref_type,))
+            reference_index.load(ref_type, [json.loads(data) for data, in rows])
+
+    def prefetch(self, asset_ids, options):
+        """Get {display_id: payloads} in the FetchPlanner prefetched format for the given IDs"""
+        with_components = bool(options.get('components'))
+        prefetched = {display_id: {'asset': None} for display_id in asset_ids}
+        conn = self._connect()
+        ids = list(asset_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for display_id, data in conn.execute(
+                    f"SELECT display_id, data FROM assets WHERE display_id IN ({placeholders})", chunk):
+                prefetched[display_id] = {'asset': {'asset': json.loads(data)}}
+                if with_components:
+                    prefetched[display_id]['components'] = {'components': []}
+            if with_components:
+                for display_id, data in conn.execute(
+                        f"SELECT display_id, data FROM components WHERE display_id IN ({placeholders})", chunk):
+                    if display_id in prefetched and prefetched[display_id]['asset']:
+                        prefetched[display_id]['components'] = {'components': json.loads(data)}
+        return prefetched
+
+    def iter_assets(self):
+        """Yield every mirrored asset record in display_id order"""
+        for data, in self._connect().execute("SELECT data FROM assets ORDER BY display_id"):
+            yield json.loads(data)
+
+    def get_requesters(self):
+        """Get every mirrored requester record"""
+        return [json.loads(data) for data, in self._connect().execute("SELECT data FROM requesters")]
+
+    def get_requester(self, user_id):
+        """Get a mirrored requester record by ID"""
+        row = self._connect().execute("SELECT data FROM requesters WHERE id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_requester(self, first_name, last_name):
+        """Get the first mirrored requester with this first and last name (case-insensitive)"""
+        row = self._connect().execute(
+            "SELECT data FROM requesters WHERE full_name = ? ORDER BY id LIMIT 1",
+            (_full_name(first_name, last_name),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_assets_by(self, field, value):
+        """Get mirrored assets whose link field (user_id, department_id, ...) equals value (or any of a list)"""
+        if field not in ASSET_LINKS:
+            raise ValueError(f"Unsupported asset field: {field}")
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        if not values:
+            return []
+        placeholders = ','.join('?' * len(values))
+        rows = self._connect().execute(
+            f"SELECT data FROM assets WHERE {field} IN ({placeholders}) ORDER BY display_id", values
+        )
+        return [json.loads(data) for data, in rows]
+
+def _full_name(first_name, last_name):
+    return f"{first_name or ''} {last_name or ''}".strip().casefold()
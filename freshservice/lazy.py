@@ -0,0 +1,22 @@
+import threading
+
+class lazy_property:
+    """Build an attribute on first access, once even if several threads ask at the same time"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.name = factory.__name__
+        self.lock = threading.RLock()
+        self.__doc__ = factory.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # Una vez construido, el valor queda en el __dict__ de la instancia y ya no pasa por aquí
+        with self.lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.factory(instance)
+        return instance.__dict__[self.name]
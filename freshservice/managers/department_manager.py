@@ -12,15 +12,14 @@ class DepartmentManager:
         """Get all departments"""
         try:
             logger.info("Fetching all departments")
-            data = self.api.make_request('departments')
+            departments = self.api.reference_index.get_names('departments')
             
-            if data and 'departments' in data:
-                departments = {dept['id']: dept['name'] for dept in data['departments']}
+            if departments:
                 logger.info(f"Found {len(departments)} departments")
                 logger.debug(f"Department data: {departments}")
                 return departments
                 
-            logger.warning("No departments found in response")
+            logger.warning("No departments found in reference index")
             return {}
             
         except Exception as e:
@@ -32,13 +31,9 @@ class DepartmentManager:
         """Map department name to ID"""
         logger.info(f"Mapping department name: {department_name}")
         
-        query = f'departments/?query="name:\'{department_name}\'"'
-        logger.debug(f"Department search query: {query}")
+        dept_id = self.api.reference_index.get_id('departments', department_name)
         
-        data = self.api.make_request(query)
-        
-        if data and 'departments' in data and len(data['departments']) > 0:
-            dept_id = data['departments'][0]['id']
+        if dept_id is not None:
             logger.info(f"Found department ID {dept_id} for name '{department_name}'")
             return dept_id
             
@@ -1,99 +1,151 @@
 from colorama import Fore
 import logging
+import threading
 
 class LocationManager:
     def __init__(self, api):
         self.api = api
         self.logger = logging.getLogger(__name__)
-        self.logger.info("LocationManager initialized")
+        self.lock = threading.Lock()
+        self._tree = None
+        self._epoch = None
 
     def get_all_locations(self):
         """Get all locations with complete data"""
-        self.logger.info("Fetching all locations from API")
-        locations = self.api.fetch_paginated_data('locations')
-        
+        locations = self.api.reference_index.get_all('locations')
         if not locations:
-            self.logger.error("No locations returned from API")
+            self.logger.error("No locations available in reference index")
             return []
-            
-        self.logger.info(f"Retrieved {len(locations)} locations")
-        self.logger.debug(f"Raw locations data: {locations}")
-        
-        sorted_locations = sorted(locations, key=lambda x: x.get('name', ''))
-        self.logger.info("Locations sorted alphabetically")
-        return sorted_locations
+        return sorted(locations, key=lambda x: x.get('name', ''))
 
     def map_location_name_to_id(self, location_name):
         """Map location name to ID"""
-        data = self.api.make_request(f'locations/?query="name:\'{location_name}\'"')
-        if data and 'locations' in data and len(data['locations']) > 0:
-            return data['locations'][0]['id']
+        loc_id = self.api.reference_index.get_id('locations', location_name)
+        if loc_id is not None:
+            return loc_id
         print(f"{Fore.YELLOW}Warning: No location found with name '{location_name}'.")
         return None
 
+    def get_tree(self):
+        """Get the location tree, rebuilt only when the reference index reloads the locations"""
+        reference_index = self.api.reference_index
+        reference_index.ensure_loaded('locations')
+        epoch = reference_index.epochs['locations']
+        if self._tree is None or self._epoch != epoch:
+            with self.lock:
+                if self._tree is None or self._epoch != epoch:
+                    self._tree = LocationTree(self.get_all_locations())
+                    self._epoch = epoch
+                    self.logger.info(f"Location tree built with {len(self._tree.roots)} root locations")
+        return self._tree
+
+    def get_subtree_ids(self, location_id):
+        """Get the IDs of a location and all its descendants"""
+        return self.get_tree().subtree(location_id)
+
+    def get_location_path(self, location_id, separator=' > '):
+        """Get the full path of a location, e.g. 'Madrid > Planta 1 > Sala A'"""
+        return separator.join(self.get_tree().paths.get(location_id, ()))
+
     def build_location_hierarchy(self):
         """Build location hierarchy tree"""
-        self.logger.info("Building location hierarchy")
-        locations = self.get_all_locations()
-        
-        if not locations:
-            self.logger.error("No locations available to build hierarchy")
-            return []
-            
-        hierarchy = {}
-        self.logger.info("Creating node dictionary")
-        
-        # First pass: Create all nodes
-        for loc in locations:
-            loc_id = loc.get('id')
-            self.logger.debug(f"Processing location: ID={loc_id}, Name={loc.get('name')}")
-            
-            hierarchy[loc_id] = {
-                'name': loc.get('name', 'Unknown'),
-                'children': [],
-                'parent_id': loc.get('parent_location_id'),
-                'data': loc
+        tree = self.get_tree()
+
+        def build_node(loc_id):
+            return {
+                'name': tree.names[loc_id],
+                'children': [build_node(child_id) for child_id in tree.child_ids(loc_id)],
+                'parent_id': tree.parents[loc_id],
+                'data': tree.records[loc_id]
             }
-        
-        # Second pass: Build tree structure
-        self.logger.info("Building tree relationships")
-        root_locations = []
-        for loc_id, loc_data in hierarchy.items():
-            parent_id = loc_data['parent_id']
-            self.logger.debug(f"Processing relationships for {loc_data['name']} (ID: {loc_id}, Parent: {parent_id})")
-            
-            if parent_id and parent_id in hierarchy:
-                self.logger.debug(f"Adding {loc_data['name']} as child to {hierarchy[parent_id]['name']}")
-                hierarchy[parent_id]['children'].append(loc_data)
-            else:
-                self.logger.debug(f"Adding {loc_data['name']} as root location")
-                root_locations.append(loc_data)
-        
-        self.logger.info(f"Hierarchy built with {len(root_locations)} root locations")
-        return root_locations
+
+        return [build_node(loc_id) for loc_id in tree.roots]
 
     def format_location_tree(self, prefix=""):
         """Format location hierarchy as text tree"""
-        self.logger.info("Starting location tree formatting")
-        root_locations = self.build_location_hierarchy()
-        output = []
+        tree = self.get_tree()
+        if prefix:
+            return tree.render(prefix)
+        # El árbol sin prefijo (-ll y la web) se genera una vez por versión de las ubicaciones
+        if tree.lines is None:
+            tree.lines = tree.render()
+        return tree.lines
 
-        def format_node(node, level=0, prefix="", is_last=True):
-            marker = "└── " if is_last else "├── "
-            text = f"{prefix}{marker}{node['name']}"
-            output.append(text)
-            
-            if node['children']:
-                child_prefix = prefix + ("    " if is_last else "│   ")
-                sorted_children = sorted(node['children'], key=lambda x: x['name'])
-                
-                for i, child in enumerate(sorted_children):
-                    is_last_child = i == len(sorted_children) - 1
-                    format_node(child, level + 1, child_prefix, is_last_child)
-
-        sorted_roots = sorted(root_locations, key=lambda x: x['name'])
-        for i, location in enumerate(sorted_roots):
-            is_last = i == len(sorted_roots) - 1
-            format_node(location, 0, prefix, is_last)
+class LocationTree:
+    """Parent/children index of the locations with precomputed paths and preorder subtree ranges"""
 
+    def __init__(self, locations):
+        self.records = {loc['id']: loc for loc in locations if 'id' in loc}
+        self.names = {loc_id: loc.get('name', 'Unknown') for loc_id, loc in self.records.items()}
+        self.parents = {}
+        self.children = {}
+        self.roots = []
+        for loc_id, loc in self.records.items():
+            parent_id = loc.get('parent_location_id')
+            if parent_id and parent_id in self.records and parent_id != loc_id:
+                self.parents[loc_id] = parent_id
+                self.children.setdefault(parent_id, []).append(loc_id)
+            else:
+                self.parents[loc_id] = None
+                self.roots.append(loc_id)
+        by_name = lambda loc_id: self.names[loc_id]
+        self.roots.sort(key=by_name)
+        for child_ids in self.children.values():
+            child_ids.sort(key=by_name)
+
+        # Recorrido en preorden: el subárbol de un nodo es un rango contiguo de self.order
+        self.order = []
+        self.position = {}
+        self.subtree_end = {}
+        self.paths = {}
+        for root_id in self.roots:
+            self._walk(root_id)
+        # Nodos en un ciclo de padres no cuelgan de ninguna raíz: se tratan como raíces
+        for loc_id in sorted(set(self.records) - set(self.position), key=by_name):
+            if loc_id in self.position:
+                continue
+            self.parents[loc_id] = None
+            self.roots.append(loc_id)
+            self._walk(loc_id)
+        self.lines = None
+
+    def _walk(self, root_id):
+        stack = [(root_id, (), False)]
+        while stack:
+            loc_id, parent_path, done = stack.pop()
+            if done:
+                self.subtree_end[loc_id] = len(self.order)
+                continue
+            if loc_id in self.position:
+                continue
+            self.position[loc_id] = len(self.order)
+            self.order.append(loc_id)
+            self.paths[loc_id] = parent_path + (self.names[loc_id],)
+            stack.append((loc_id, None, True))
+            for child_id in reversed(self.children.get(loc_id, [])):
+                stack.append((child_id, self.paths[loc_id], False))
+
+    def subtree(self, loc_id):
+        """Get loc_id followed by all its descendants (empty if unknown)"""
+        if loc_id not in self.position:
+            return []
+        return self.order[self.position[loc_id]:self.subtree_end[loc_id]]
+
+    def child_ids(self, loc_id):
+        """Get the children of a location sorted by name"""
+        return [child_id for child_id in self.children.get(loc_id, []) if self.parents.get(child_id) == loc_id]
+
+    def render(self, prefix=""):
+        """Render the tree as text lines"""
+        output = []
+        stack = [(loc_id, prefix, i == len(self.roots) - 1)
+                 for i, loc_id in reversed(list(enumerate(self.roots)))]
+        while stack:
+            loc_id, node_prefix, is_last = stack.pop()
+            marker = "└── " if is_last else "├── "
+            output.append(f"{node_prefix}{marker}{self.names[loc_id]}")
+            child_prefix = node_prefix + ("    " if is_last else "│   ")
+            child_ids = self.child_ids(loc_id)
+            stack.extend((child_id, child_prefix, i == len(child_ids) - 1)
+                         for i, child_id in reversed(list(enumerate(child_ids))))
         return output
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class MemoryCache:
+    """Size-bounded in-process LRU tier with hit/miss/eviction counters per cache_type"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (cache_type, key) -> (data, size, stored_at)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _stats_for(self, cache_type):
+        if cache_type not in self.stats:
+            self.stats[cache_type] = {'hits': 0, 'misses': 0, 'evictions': 0}
+        return self.stats[cache_type]
+
+    def get(self, cache_type, key, max_age_seconds=None):
+        """Get an entry (treat it as read-only) or None when missing or expired"""
+        entry = self.get_entry(cache_type, key, max_age_seconds)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, cache_type, key, max_age_seconds=None):
+        """Get (data, stored_at) or None when missing or expired"""
+        with self.lock:
+            entry = self.entries.get((cache_type, key))
+            if entry is not None and max_age_seconds is not None and time.time() - entry[2] > max_age_seconds:
+                self._remove((cache_type, key))
+                entry = None
+            if entry is None:
+                self._stats_for(cache_type)['misses'] += 1
+                return None
+            self.entries.move_to_end((cache_type, key))
+            self._stats_for(cache_type)['hits'] += 1
+            return entry[0], entry[2]
+
+    def set(self, cache_type, key, data, size, stored_at=None):
+        """Store an entry, evicting least recently used ones to stay within budget"""
+        if size > self.max_bytes:
+            logger.debug(f"Entry {key} ({size} bytes) exceeds memory cache budget, not kept in memory")
+            return
+        with self.lock:
+            self._remove((cache_type, key))
+            self.entries[(cache_type, key)] = (data, size, stored_at or time.time())
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self._stats_for(oldest[0])['evictions'] += 1
+
+    def discard(self, cache_type, key):
+        """Remove an entry if present"""
+        with self.lock:
+            self._remove((cache_type, key))
+
+    def clear(self, cache_type=None, prefix=None):
+        """Remove all entries, or those of a cache_type and/or key prefix"""
+        with self.lock:
+            for entry_key in [k for k in self.entries
+                              if (cache_type is None or k[0] == cache_type)
+                              and (prefix is None or k[1].startswith(prefix))]:
+                self._remove(entry_key)
+
+    def _remove(self, entry_key):
+        entry = self.entries.pop(entry_key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
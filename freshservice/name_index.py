@@ -0,0 +1,171 @@
+import bisect
+import logging
+import threading
+import time
+import unicodedata
+from .config import NAME_INDEX_CONFIG
+
+logger = logging.getLogger(__name__)
+
+NAME_TYPES = ('departments', 'locations', 'requesters')
+REQUESTERS_CACHE_KEY = 'requesters/all'
+
+class NameIndex:
+    """Accent-insensitive trigram and prefix index over department, location and requester names"""
+
+    def __init__(self, api):
+        self.api = api
+        self.lock = threading.RLock()
+        self.entries = {name_type: {} for name_type in NAME_TYPES}     # id -> (nombre, nombre normalizado)
+        self.trigrams = {name_type: {} for name_type in NAME_TYPES}    # trigrama -> ids
+        self.sorted_names = {name_type: [] for name_type in NAME_TYPES}  # (palabra normalizada, id) ordenadas
+        self.requesters = {}
+        self.epochs = {name_type: None for name_type in NAME_TYPES}
+
+    def load(self, name_type, records):
+        """Replace the names of a type with the given records"""
+        entries, trigrams, sorted_names = {}, {}, []
+        for record in records:
+            if 'id' not in record:
+                continue
+            name = _display_name(name_type, record)
+            normalized = normalize(name)
+            if not normalized:
+                continue
+            entries[record['id']] = (name, normalized)
+            for trigram in _trigrams(normalized):
+                trigrams.setdefault(trigram, set()).add(record['id'])
+            # Cada palabra permite autocompletar por nombre o por apellido
+            sorted_names.append((normalized, record['id']))
+            sorted_names.extend((word, record['id']) for word in normalized.split(' ')[1:])
+        sorted_names.sort()
+
+        with self.lock:
+            self.entries[name_type] = entries
+            self.trigrams[name_type] = trigrams
+            self.sorted_names[name_type] = sorted_names
+            if name_type == 'requesters':
+                self.requesters = {record['id']: record for record in records if 'id' in record}
+                self.epochs[name_type] = time.monotonic()
+        logger.info(f"Name index loaded {len(entries)} {name_type}")
+
+    def ensure_loaded(self, name_type):
+        """(Re)build the names of a type when its source data changed"""
+        if name_type == 'requesters':
+            if self.epochs['requesters'] is None or \
+                    time.monotonic() - self.epochs['requesters'] > NAME_INDEX_CONFIG['requesters_ttl_minutes'] * 60:
+                with self.lock:
+                    if self.epochs['requesters'] is None or \
+                            time.monotonic() - self.epochs['requesters'] > NAME_INDEX_CONFIG['requesters_ttl_minutes'] * 60:
+                        self.load('requesters', self._requester_records())
+            return
+
+        # Departamentos y ubicaciones salen del índice de referencia: se reconstruye cuando este se recarga
+        reference_index = self.api.reference_index
+        reference_index.ensure_loaded(name_type)
+        if self.epochs[name_type] != reference_index.epochs[name_type]:
+            with self.lock:
+                epoch = reference_index.epochs[name_type]
+                if self.epochs[name_type] != epoch:
+                    self.load(name_type, reference_index.get_all(name_type))
+                    self.epochs[name_type] = epoch
+
+    def use_requesters(self):
+        """Check whether user names should be resolved with the requester list"""
+        mode = NAME_INDEX_CONFIG['requesters']
+        if mode == 'auto':
+            # Descargar la lista entera solo compensa si ya está cargada, en caché o en la copia local
+            return self.epochs['requesters'] is not None or getattr(self.api, 'mirror', None) is not None or \
+                self.api.cache.get(REQUESTERS_CACHE_KEY, cache_type='requesters') is not None
+        return mode == 'on'
+
+    def _requester_records(self):
+        mirror = getattr(self.api, 'mirror', None)
+        if mirror is not None:
+            return mirror.get_requesters()
+        records = self.api.cache.get(REQUESTERS_CACHE_KEY, cache_type='requesters')
+        if records is None:
+            from .cache_warmer import CacheWarmer
+            records = CacheWarmer(self.api).fetch_listing('requesters')
+            self.api.cache.set(REQUESTERS_CACHE_KEY, records, cache_type='requesters')
+        return records
+
+    def search(self, name_type, text, limit=None):
+        """Get [(name, id, score)] ranked by trigram similarity to text (prefix matches first)"""
+        self.ensure_loaded(name_type)
+        limit = limit or NAME_INDEX_CONFIG['limit']
+        query = normalize(text)
+        if not query:
+            return []
+        entries = self.entries[name_type]
+
+        # Candidatos: los que comparten algún trigrama; la puntuación es el coeficiente de Dice
+        query_trigrams = _trigrams(query)
+        shared = {}
+        for trigram in query_trigrams:
+            for entry_id in self.trigrams[name_type].get(trigram, ()):
+                shared[entry_id] = shared.get(entry_id, 0) + 1
+        scores = {}
+        for entry_id, count in shared.items():
+            scores[entry_id] = 2 * count / (len(query_trigrams) + len(_trigrams(entries[entry_id][1])))
+        for entry_id in self._prefix_ids(name_type, query):
+            scores[entry_id] = max(scores.get(entry_id, 0), 1.0 if entries[entry_id][1] == query else 0.9)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], entries[item[0]][0]))
+        return [(entries[entry_id][0], entry_id, round(score, 3))
+                for entry_id, score in ranked[:limit] if score >= NAME_INDEX_CONFIG['min_score']]
+
+    def complete(self, name_type, prefix, limit=None):
+        """Get the names starting with prefix (or with a word starting with it), for autocompletion"""
+        self.ensure_loaded(name_type)
+        limit = limit or NAME_INDEX_CONFIG['limit']
+        entries = self.entries[name_type]
+        ids = self._prefix_ids(name_type, normalize(prefix))
+        return sorted({entries[entry_id][0] for entry_id in ids}, key=normalize)[:limit]
+
+    def _prefix_ids(self, name_type, prefix):
+        if not prefix:
+            return []
+        sorted_names = self.sorted_names[name_type]
+        ids = []
+        position = bisect.bisect_left(sorted_names, (prefix,))
+        while position < len(sorted_names) and sorted_names[position][0].startswith(prefix):
+            if sorted_names[position][1] not in ids:
+                ids.append(sorted_names[position][1])
+            position += 1
+        return ids
+
+    def resolve(self, name_type, text):
+        """Get the ID of the single best match for text, or None if there is no clear winner"""
+        matches = self.search(name_type, text, limit=2)
+        if not matches:
+            return None
+        best_name, best_id, best_score = matches[0]
+        if normalize(best_name) == normalize(text):
+            return best_id
+        # Sin coincidencia exacta solo se acepta un candidato claramente mejor que el siguiente
+        if best_score < NAME_INDEX_CONFIG['resolve_score'] or \
+                (len(matches) > 1 and best_score - matches[1][2] < NAME_INDEX_CONFIG['resolve_margin']):
+            return None
+        logger.info(f"Resolved '{text}' to {name_type} '{best_name}' (score {best_score})")
+        return best_id
+
+    def get_requester(self, requester_id):
+        """Get a requester record loaded into the index"""
+        self.ensure_loaded('requesters')
+        return self.requesters.get(requester_id)
+
+def normalize(name):
+    """Casefold, strip accents and collapse whitespace"""
+    decomposed = unicodedata.normalize('NFKD', str(name or ''))
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.casefold().split())
+
+def _trigrams(normalized):
+    padded = f'  {normalized} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _display_name(name_type, record):
+    if name_type == 'requesters':
+        return f"{record.get('first_name') or ''} {record.get('last_name') or ''}".strip()
+    return record.get('name') or ''
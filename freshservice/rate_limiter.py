@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import threading
+import time
+from .config import RATE_LIMIT_CONFIG, RATE_LIMIT_DELAY
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """Thread-safe token bucket paced from Freshservice rate limit headers"""
+
+    def __init__(self, requests_per_minute=None):
+        self.lock = threading.Lock()
+        self.capacity = float(requests_per_minute or RATE_LIMIT_CONFIG['requests_per_minute'])
+        self.refill_rate = self.capacity / 60.0  # tokens per second
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.stats = {'throttled': 0, 'waited_seconds': 0.0}
+
+    def _refill(self, now):
+        """Add the tokens earned since the last refill"""
+        elapsed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.last_refill = now
+
+    def reserve(self):
+        """Take a token and return the seconds to wait before sending the request"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.refill_rate if self.tokens < 0 else 0.0
+            wait = max(wait, self.blocked_until - now)
+            if wait > 0:
+                self.stats['waited_seconds'] += wait
+            return wait
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"Rate limiter pacing request for {wait:.2f}s")
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a request may be sent"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers):
+        """Adjust the bucket to the X-Ratelimit-Total/Remaining headers of a response"""
+        total = _header_int(headers, 'X-Ratelimit-Total')
+        remaining = _header_int(headers, 'X-Ratelimit-Remaining')
+        if total is None and remaining is None:
+            return
+
+        with self.lock:
+            self._refill(time.monotonic())
+            if total:
+                capacity = max(total * RATE_LIMIT_CONFIG['safety_margin'], 1.0)
+                if capacity != self.capacity:
+                    logger.info(f"Rate limit budget set to {capacity:.0f} requests/minute")
+                    self.capacity = capacity
+                    self.refill_rate = capacity / 60.0
+            if remaining is not None:
+                # Dejar sin usar la parte del presupuesto fuera del margen de seguridad
+                usable = remaining - (total or self.capacity) * (1 - RATE_LIMIT_CONFIG['safety_margin'])
+                self.tokens = min(self.tokens, usable)
+
+    def penalize(self, headers):
+        """Pause every request after a 429 and return the seconds to wait"""
+        retry_after = _header_int(headers, 'Retry-After')
+        wait = retry_after if retry_after is not None else RATE_LIMIT_DELAY
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + wait)
+            self.tokens = min(self.tokens, 0.0)
+            self.stats['throttled'] += 1
+        return wait
+
+def _header_int(headers, name):
+    """Read an integer header, returning None when missing or invalid"""
+    value = headers.get(name)
+    try:
+        return int(float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter():
+    """Get the process-wide rate limiter shared by every API client"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
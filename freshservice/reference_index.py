@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from .config import REFERENCE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_TYPES = ('departments', 'locations', 'asset_types')
+# Entrada de caché con la lista completa de cada tipo (la escribe también CacheWarmer.warm)
+REFERENCE_CACHE_KEYS = {ref_type: f'{ref_type}/all' for ref_type in REFERENCE_TYPES}
+
+class ReferenceIndex:
+    """In-memory id <-> name index for departments, locations and asset types"""
+
+    def __init__(self, api, ttl_minutes=None):
+        self.api = api
+        self.ttl = (ttl_minutes or REFERENCE_CONFIG['ttl_minutes']) * 60
+        self.lock = threading.RLock()
+        self.load_locks = {ref_type: threading.Lock() for ref_type in REFERENCE_TYPES}
+        self.records = {ref_type: {} for ref_type in REFERENCE_TYPES}  # id -> record
+        self.names = {ref_type: {} for ref_type in REFERENCE_TYPES}    # nombre normalizado -> id
+        self.loaded_at = {ref_type: None for ref_type in REFERENCE_TYPES}
+        self.epochs = {ref_type: 0 for ref_type in REFERENCE_TYPES}
+        self.retry_at = {ref_type: 0 for ref_type in REFERENCE_TYPES}
+
+    def refresh(self, ref_type=None):
+        """Reload one reference list (or all of them) from the cache, or from the API if it isn't cached
+
+        The cached list follows the CACHE_CONFIG policy of its type: past soft_ttl it is still loaded and
+        refetched in the background, past hard_ttl it is refetched first.
+        """
+        for current in ([ref_type] if ref_type else REFERENCE_TYPES):
+            records, stale = self.api.cache.lookup(REFERENCE_CACHE_KEYS[current], cache_type=current)
+            if records is None:
+                records = self._fetch(current)
+            if records is not None:
+                self.load(current, records)
+            if stale:
+                # Tras cargar la lista obsoleta: si no, podría pisar la nueva al terminar la recarga antes
+                self.api.run_in_background(f'reference_index/{current}/fetch', self._fetch_and_load, current)
+
+    def _fetch_and_load(self, ref_type):
+        records = self._fetch(ref_type)
+        if records is not None:
+            self.load(ref_type, records)
+
+    def _fetch(self, ref_type):
+        """Fetch a whole reference list and cache it, or None (keeping the current one) if a page failed"""
+        from .cache_warmer import CacheWarmer, ListingError
+        try:
+            records = CacheWarmer(self.api).fetch_listing(ref_type)
+        except ListingError as e:
+            logger.error(f"Could not reload {ref_type}: {e}")
+            # Sin reintentar en cada búsqueda mientras la API falla
+            self.retry_at[ref_type] = time.monotonic() + REFERENCE_CONFIG['retry_seconds']
+            return None
+        self.api.cache.set(REFERENCE_CACHE_KEYS[ref_type], records, cache_type=ref_type)
+        return records
+
+    def load(self, ref_type, records):
+        """Replace a reference list with the given records"""
+        by_id = {record['id']: record for record in records if 'id' in record}
+        by_name = {}
+        for record in by_id.values():
+            by_name.setdefault(_normalize(record.get('name')), record['id'])
+
+        with self.lock:
+            self.records[ref_type] = by_id
+            self.names[ref_type] = by_name
+            self.loaded_at[ref_type] = time.monotonic()
+            self.epochs[ref_type] += 1
+        logger.info(f"Reference index loaded {len(by_id)} {ref_type}")
+
+    def ensure_loaded(self, ref_type=None):
+        """Load missing reference lists; one older than the TTL is served as is and reloaded in the background"""
+        for current in ([ref_type] if ref_type else REFERENCE_TYPES):
+            if self._is_fresh(current):
+                continue
+            if self.loaded_at[current] is not None:
+                self.api.run_in_background(f'reference_index/{current}', self.refresh, current)
+                continue
+            # Primera carga: solo esperan los que piden esta lista, sin bloquear las demás consultas
+            with self.load_locks[current]:
+                # Otro hilo puede haberla cargado mientras esperábamos
+                if not self._is_fresh(current):
+                    self.refresh(current)
+
+    def _is_fresh(self, ref_type):
+        loaded_at = self.loaded_at[ref_type]
+        if time.monotonic() < self.retry_at[ref_type]:
+            return True
+        return loaded_at is not None and time.monotonic() - loaded_at < self.ttl
+
+    def get_name(self, ref_type, ref_id, default='Unknown'):
+        """Get the name of a record by ID"""
+        self.ensure_loaded(ref_type)
+        record = self.records[ref_type].get(ref_id)
+        return record.get('name', default) if record else default
+
+    def get_id(self, ref_type, name):
+        """Get the ID of a record by name (case-insensitive)"""
+        self.ensure_loaded(ref_type)
+        return self.names[ref_type].get(_normalize(name))
+
+    def get_record(self, ref_type, ref_id):
+        """Get the full record by ID"""
+        self.ensure_loaded(ref_type)
+        return self.records[ref_type].get(ref_id)
+
+    def get_all(self, ref_type):
+        """Get all records of a reference list"""
+        self.ensure_loaded(ref_type)
+        return list(self.records[ref_type].values())
+
+    def get_names(self, ref_type):
+        """Get an id -> name mapping of a reference list"""
+        self.ensure_loaded(ref_type)
+        return {ref_id: record.get('name') for ref_id, record in self.records[ref_type].items()}
+
+def _normalize(name):
+    return str(name or '').strip().casefold()
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import secrets
+import time
+from datetime import datetime
+from .config import RUN_JOURNAL_CONFIG
+from .interval_set import parse_ids
+
+logger = logging.getLogger(__name__)
+
+class RunJournal:
+    """On-disk record of an -i run: its options and the result of every finished asset, for --resume"""
+
+    def __init__(self, run_id, meta, directory=None):
+        self.run_id = run_id
+        self.meta = meta
+        self.directory = directory or journal_dir()
+        self.meta_path = os.path.join(self.directory, f'{run_id}.json')
+        self.results_path = os.path.join(self.directory, f'{run_id}.ndjson')
+        self.file = None
+        self.unsynced = 0
+
+    @classmethod
+    def create(cls, options, asset_ids, directory=None):
+        """Start the journal of a new run"""
+        directory = directory or journal_dir()
+        os.makedirs(directory, exist_ok=True)
+        prune(directory)
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(2)}"
+        meta = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'options': options,
+            'asset_ids': asset_ids.to_text(),
+            'output_file': None
+        }
+        journal = cls(run_id, meta, directory)
+        journal._save_meta()
+        logger.info(f"Run journal {run_id} started for {len(asset_ids)} assets")
+        return journal
+
+    @classmethod
+    def open(cls, run_id, directory=None):
+        """Open the journal of an unfinished run (None if there is no such run)"""
+        directory = directory or journal_dir()
+        meta_path = os.path.join(directory, f'{run_id}.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            return cls(run_id, json.load(f), directory)
+
+    @property
+    def options(self):
+        return self.meta['options']
+
+    @property
+    def asset_ids(self):
+        return parse_ids(self.meta['asset_ids'])[0]
+
+    def set_output_file(self, output_file):
+        """Remember the file actually written (it may differ from -o when that file already existed)"""
+        if self.meta['output_file'] != output_file:
+            self.meta['output_file'] = output_file
+            self._save_meta()
+
+    def _save_meta(self):
+        # Escritura atómica: un corte a mitad no deja el fichero de la ejecución a medias
+        temp_path = f'{self.meta_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, default=str)
+        os.replace(temp_path, self.meta_path)
+
+    def completed_ids(self):
+        """Get the IDs already finished (found or not)"""
+        return {asset_id for asset_id, _ in self.iter_completed()}
+
+    def iter_completed(self):
+        """Yield (asset_id, result) for every finished asset, in the order they finished"""
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Última línea cortada por una interrupción: ese activo se vuelve a procesar
+                    logger.warning(f"Ignoring truncated record in run journal {self.run_id}")
+                    continue
+                yield record['id'], record['result']
+
+    def record(self, asset_id, result):
+        """Append a finished asset (result None when it was not found)"""
+        if self.file is None:
+            self.file = open(self.results_path, 'a', encoding='utf-8')
+        self.file.write(json.dumps({'id': asset_id, 'result': result}, ensure_ascii=False, default=str))
+        self.file.write('\n')
+        self.file.flush()
+        self.unsynced += 1
+        if self.unsynced >= RUN_JOURNAL_CONFIG['fsync_every']:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+            self.unsynced = 0
+
+    def discard(self):
+        """Remove the journal once the run finished and the output is complete"""
+        self.close()
+        for path in (self.results_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        logger.info(f"Run journal {self.run_id} completed and removed")
+
+def journal_dir():
+    from . import CACHE_DIR
+    return str(RUN_JOURNAL_CONFIG.get('dir') or os.path.join(CACHE_DIR, 'runs'))
+
+def prune(directory):
+    """Remove journals of runs not resumed within keep_days"""
+    cutoff = time.time() - RUN_JOURNAL_CONFIG['keep_days'] * 86400
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
@@ -1,10 +1,15 @@
-import pandas as pd
 from colorama import Fore
+from .lazy import lazy_property
 
 class SearchManager:
     def __init__(self, asset_manager):
         self.asset_manager = asset_manager
 
+    @lazy_property
+    def export_manager(self):
+        from .export_manager import ExportManager
+        return ExportManager(self.asset_manager.excel_manager)
+
     def display_user_assets(self, user, assets):
         """Display user information and associated assets"""
         print(f"{Fore.GREEN}Usuario encontrado:")
@@ -76,7 +81,8 @@ class SearchManager:
         if not output_file:
             return
 
-        if output_file.endswith('.xlsx'):
+        if not output_file.endswith('.txt'):
+            import pandas as pd
             df = pd.DataFrame(assets)
             # Seleccionar solo las columnas que existen
             columns_to_show = []
@@ -87,6 +93,10 @@ class SearchManager:
                     columns_to_show.append(col)
             
             df = df[columns_to_show]
+            if 'department_id' in df.columns:
+                departments = self.asset_manager.reference_index.get_names('departments')
+                df.insert(df.columns.get_loc('department_id') + 1, 'department_name',
+                          df['department_id'].map(lambda dept_id: departments.get(dept_id, 'Unknown')))
             
             # Mapear nombres de columnas a español
             column_mapping = {
@@ -94,14 +104,15 @@ class SearchManager:
                 "name": "Nombre",
                 "asset_tag": "Tag",
                 "department_id": "Departamento ID",
+                "department_name": "Departamento",
                 "user_id": "Usuario ID",
                 "state": "Estado"
             }
             
             df.columns = [column_mapping.get(col, col) for col in df.columns]
-            self.asset_manager.excel_manager.export_to_excel(df, output_file)
+            output_file = self.export_manager.export_data(df, output_file)
             print(f"{Fore.GREEN}Resultados exportados a {output_file}")
-        elif output_file.endswith('.txt'):
+        else:
             with open(output_file, 'w') as f:
                 f.write(','.join(str(asset['display_id']) for asset in assets))
             print(f"{Fore.GREEN}IDs exportados a {output_file}")
@@ -1,7 +1,9 @@
 import argparse
 import logging
 from colorama import Fore, init, Style
-from freshservice import FreshServiceManager
+from freshservice import FreshServiceManager, setup_logging
+from freshservice.config import ASYNC_CONFIG, BULK_CONFIG, CONCURRENCY_CONFIG, EXPORT_CONFIG
+from freshservice.export_manager import ExportManager
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +39,11 @@ Information Options:
 Search Options:
 -su: Search by user full name
 -sd: Search by department name
--sl: Search by location name
+-sl: Search by location name (combine -su, -sd and -sl to get the assets matching all of them)
+--include-sublocations: With -sl, include the assets of all sublocations
 -ld: List all departments
 -ll: List all locations in hierarchy
+-fn: Find the closest department, location or user names (typo and accent tolerant)
 
 Component Options:
 -c: Specify component types to include
@@ -48,14 +52,32 @@ Component Options:
 
 File Options:
 -ie: Import IDs from Excel
--o: Export results to file
--v: Show results in console""",
+-o: Export results to file (.xlsx, .csv, .ndjson, .json, .parquet; .csv.gz/.ndjson.gz compressed)
+-v: Show results in console
+
+Performance Options:
+-w: Number of parallel workers for asset processing
+--async: Use the asyncio client (optionally with max requests in flight)
+--bulk: Page the assets listing instead of one request per ID (auto/on/off)
+--resume: Continue an interrupted -i run by its run ID
+--migrate-cache: Import the JSON cache files into the SQLite cache
+--warm-cache: Prefetch departments, locations, asset types and requesters into the cache
+
+Mirror Options:
+--sync: Update the local inventory mirror (--sync full to reload everything)
+--mirror: Run -i, -su, -sd and -sl against the local mirror (no API calls)""",
         epilog=f"""{Fore.YELLOW}Examples:
 1. Get asset info: python fstools.py -i 143-150 -e 145,147 -a -o output.xlsx
 2. Get components: python fstools.py -i 143-150 -c cpu ram -o output.xlsx
 3. Search by user: python fstools.py -su "John Doe" -o user_assets.xlsx
 4. List locations: python fstools.py -ll
-5. Import from Excel: python fstools.py -ie assets.xlsx"""
+5. Import from Excel: python fstools.py -ie assets.xlsx
+6. Parallel processing: python fstools.py -i 1-2000 -a -w 8 -o output.xlsx
+7. Asyncio client: python fstools.py -i 1-2000 -a --async 200 -o output.xlsx
+8. Warm the cache: python fstools.py --warm-cache
+9. Sync and query the mirror: python fstools.py --sync && python fstools.py -i 1-30000 -a --mirror -o output.xlsx
+10. Parquet for BI tools: python fstools.py -i 1-30000 -a --bulk on -o inventory.parquet
+11. Resume an interrupted run: python fstools.py --resume 20240501-093000-1a2b"""
     )
     
     parser.add_argument('-i', '--ids',
@@ -66,7 +88,8 @@ File Options:
                       choices=['cpu', 'ram', 'hdd', 'nic'],
                       help='Component types to include (space-separated). Valid options: cpu ram hdd nic')
     parser.add_argument('-o', '--output',
-                      help='Output Excel file path')
+                      help='Output file path; the extension picks the format: .xlsx, .csv, .ndjson, .json, '
+                           '.parquet (add .gz to compress csv/ndjson/json)')
     parser.add_argument('-v', '--verbose',
                       type=lambda x: x.lower() == 'true',
                       default=True,
@@ -107,12 +130,39 @@ File Options:
                       help='Search assets by department name')
     parser.add_argument('-sl', '--search-location',
                       help='Search assets by location name')
+    parser.add_argument('--include-sublocations', action='store_true',
+                      help='With -sl, also return the assets of every location below it')
     parser.add_argument('-ld', '--list-departments', action='store_true',
                       help='List all available departments')
     parser.add_argument('-ll', '--list-locations', action='store_true',
                       help='List all available locations')
+    parser.add_argument('-fn', '--find-name', nargs=2, metavar=('TYPE', 'TEXT'),
+                      help='Show the closest department, location or user names to TEXT '
+                           '(TYPE: department, location or user; accents and typos are tolerated)')
     parser.add_argument('-ie', '--import-excel',
                       help='Import asset IDs from the first column of an Excel file and export to .txt')
+    parser.add_argument('-w', '--workers', type=int,
+                      default=CONCURRENCY_CONFIG['workers'],
+                      help=f"Number of parallel workers for asset processing (default: {CONCURRENCY_CONFIG['workers']})")
+    parser.add_argument('--async', dest='async_concurrency', type=int, nargs='?',
+                      const=ASYNC_CONFIG['max_in_flight'], default=None,
+                      help=f"Process assets with the asyncio client, keeping N requests in flight (default N: {ASYNC_CONFIG['max_in_flight']})")
+    parser.add_argument('--bulk', choices=['auto', 'on', 'off'],
+                      default=BULK_CONFIG['mode'],
+                      help='Page the assets listing instead of one request per ID. '
+                           'auto uses it when the ID range is dense enough (default: %(default)s)')
+    parser.add_argument('--resume', metavar='RUN_ID',
+                      help='Continue an interrupted -i run: finished assets are not fetched again and '
+                           'the same output file is completed')
+    parser.add_argument('--warm-cache', action='store_true',
+                      help='Prefetch every page of departments, locations, asset types and requesters into the cache')
+    parser.add_argument('--sync', nargs='?', const='incremental', choices=['incremental', 'full'],
+                      help='Update the local inventory mirror: only assets changed since the last sync, '
+                           'or everything with --sync full')
+    parser.add_argument('--mirror', action='store_true',
+                      help='Answer -i, -su, -sd and -sl from the local inventory mirror instead of the API')
+    parser.add_argument('--migrate-cache', action='store_true',
+                      help="Import the existing .cache JSON files into the SQLite cache (CACHE_CONFIG['backend'] = 'sqlite')")
     
     return parser.parse_args()
 
@@ -120,6 +170,7 @@ def main():
     """Main execution function"""
     init(autoreset=True, convert=True)  # Asegurar que colorama se inicialice correctamente
     args = parse_arguments()
+    setup_logging()
     
     logger.info("Starting Freshservice Tool")
     logger.debug("Command line arguments: %s", vars(args))
@@ -145,6 +196,30 @@ def main():
         manager.import_excel_ids(args.import_excel)
         return
 
+    if args.warm_cache:
+        manager.warm_cache(args.workers if args.workers > 1 else None)
+        return
+
+    if args.sync:
+        manager.sync_inventory(full=args.sync == 'full', workers=args.workers if args.workers > 1 else None)
+        return
+
+    if args.mirror and not manager.use_mirror():
+        return
+
+    if args.output:
+        output_format, _ = ExportManager.detect_format(args.output)
+        if output_format not in EXPORT_CONFIG['allowed_formats'] and not args.output.endswith('.txt'):
+            print(f"{Fore.RED}Error: Unsupported output format '{output_format}'. "
+                  f"Use one of: {', '.join(EXPORT_CONFIG['allowed_formats'])}")
+            return
+
+    if args.migrate_cache:
+        from freshservice.cache_manager import CacheManager
+        imported = CacheManager(backend='sqlite').import_json_cache()
+        print(f"{Fore.GREEN}Imported {imported} cache entries into SQLite")
+        return
+
     # Primero manejar las opciones de búsqueda y listado
     if args.list_departments:
         manager.list_departments()
@@ -152,6 +227,30 @@ def main():
     elif args.list_locations:
         manager.list_locations()
         return
+    elif args.find_name:
+        name_type, text = args.find_name
+        matches = manager.suggest_names(name_type, text)
+        if matches is None:
+            print(f"{Fore.RED}Error: TYPE must be department, location or user.")
+        elif not matches:
+            print(f"{Fore.YELLOW}No names similar to '{text}'")
+        for name, score in matches or []:
+            print(f"{score:.2f}  {name}")
+        return
+    elif sum(bool(option) for option in (args.search_user, args.search_department, args.search_location)) > 1:
+        # Varios criterios: intersección en el índice local de activos
+        results, message = manager.search_assets(
+            user=' '.join(args.search_user) if args.search_user else None,
+            department=args.search_department,
+            location=args.search_location,
+            include_sublocations=args.include_sublocations
+        )
+        print(f"{Fore.CYAN if results else Fore.YELLOW}{message}{Style.RESET_ALL}")
+        for row in results or []:
+            print(' | '.join(str(value) for value in row.values()))
+        if results and args.output:
+            manager.export_to_excel(results, args.output)
+        return
     elif args.search_user:
         manager.search_by_user(' '.join(args.search_user), args.output)
         return
@@ -159,13 +258,25 @@ def main():
         manager.search_by_department(args.search_department, args.output)
         return
     elif args.search_location:
-        manager.search_by_location(args.search_location, args.output)
+        manager.search_by_location(args.search_location, args.output, args.include_sublocations)
+        return
+
+    if args.resume:
+        manager.resume(args.resume)
         return
 
     # Verificar si se proporcionó el argumento ids
     if not args.ids:
         print(f"{Fore.RED}Error: The -i/--ids argument is required when not using search options.")
         return
+
+    if args.workers < 1:
+        print(f"{Fore.RED}Error: -w/--workers must be at least 1.")
+        return
+
+    if args.async_concurrency is not None and args.async_concurrency < 1:
+        print(f"{Fore.RED}Error: --async must be at least 1.")
+        return
     
     # Procesar opciones
     options = {
@@ -185,7 +296,10 @@ def main():
         'include_serial_number': args.serial_number or args.asset_data,
         'include_description': args.description or args.asset_data,
         'disable_join': args.disable_join,
-        'combine_cpu_ram': args.combine_cpu_ram
+        'combine_cpu_ram': args.combine_cpu_ram,
+        'workers': args.workers,
+        'async_concurrency': args.async_concurrency,
+        'bulk': args.bulk
     }
     
     logger.debug("Processing with options: %s", options)
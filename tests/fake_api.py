@@ -0,0 +1,84 @@
+import re
+
+REFERENCE_ENDPOINTS = ('departments', 'locations', 'asset_types', 'requesters')
+
+class FakeCache:
+    """Negative cache of the fake API: the endpoints that answered 404"""
+
+    def __init__(self):
+        self.missing = set()
+
+    def is_missing(self, key):
+        return key in self.missing
+
+    def set_missing(self, key):
+        self.missing.add(key)
+
+    def clear_missing(self, key):
+        self.missing.discard(key)
+
+class FakeAPI:
+    """Stand-in for FreshServiceAPI answering make_request from in-memory assets
+
+    IDs in failing answer like a 5xx or a timeout (None, not recorded as missing); IDs not in
+    assets answer 404 (None, recorded in the negative cache like the real client does). IDs in the
+    negative cache get None without reaching the assets, as in FreshServiceAPI.make_request.
+    """
+
+    def __init__(self, assets=(), failing=(), changed=(), references=None, cache=None):
+        self.assets = {asset['display_id']: asset for asset in assets}
+        self.references = dict(references or {})  # departments/locations/... -> registros
+        self.failing = set(failing)
+        self.changed = list(changed)
+        self.listing_fails = False
+        self.failing_pages = {}  # página del listado -> veces que falla antes de responder
+        self.cache = cache or FakeCache()
+        self.requests = []
+        self.background = []
+
+    def make_request(self, endpoint):
+        self.requests.append(endpoint)
+        path, _, query = endpoint.partition('?')
+        page_match = re.search(r'(?<!per_)page=(\d+)', query)
+        page = int(page_match.group(1)) if page_match else 1
+        per_page_match = re.search(r'per_page=(\d+)', query)
+        per_page = int(per_page_match.group(1)) if per_page_match else 30
+        if path in REFERENCE_ENDPOINTS:
+            if self.failing_pages.get(page):
+                self.failing_pages[page] -= 1
+                return None
+            return {path: self.references.get(path, [])[(page - 1) * per_page:page * per_page]}
+        if path == 'assets':
+            if 'updated_at' in query:
+                items = [self.assets.get(display_id, {'display_id': display_id, 'updated_at': '2099-01-01T00:00:00Z'})
+                         for display_id in self.changed]
+            elif self.listing_fails:
+                return None
+            else:
+                items = sorted(self.assets.values(), key=lambda asset: asset['display_id'])
+            if self.failing_pages.get(page):
+                self.failing_pages[page] -= 1
+                return None
+            return {'assets': items[(page - 1) * per_page:page * per_page]}
+
+        match = re.fullmatch(r'assets/(\d+)(/components)?', path)
+        display_id = int(match.group(1))
+        if self.cache.is_missing(path):
+            return None
+        if display_id in self.failing:
+            return None
+        if display_id not in self.assets:
+            self.cache.set_missing(path)
+            return None
+        if match.group(2):
+            return {'components': []}
+        return {'asset': self.assets[display_id]}
+
+    def run_in_background(self, key, function, *args):
+        """Run the task right away, recording its key"""
+        self.background.append(key)
+        function(*args)
+        return True
+
+def make_asset(display_id, updated_at='2099-01-01T00:00:00Z', **fields):
+    return {'display_id': display_id, 'name': f'PC-{display_id}', 'updated_at': updated_at, **fields}
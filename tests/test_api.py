@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.api import FreshServiceAPI
+from freshservice.rate_limiter import RateLimiter
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+        self.text = ''
+
+    def json(self):
+        return self.data
+
+class FakeSession:
+    """requests.Session stand-in answering with the given responses (the last one repeats)"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.urls = []
+
+    def request(self, method, url, params=None, json=None, timeout=None):
+        self.urls.append(url)
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+    def close(self):
+        pass
+
+class FreshServiceAPITest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with mock.patch('freshservice.CACHE_DIR', self.tmp.name):
+            self.api = FreshServiceAPI()
+        self.api.base_url = 'https://test.freshservice.com/api/v2/'
+        # Un limitador propio: el compartido del proceso no se toca
+        self.api.rate_limiter = RateLimiter(6000)
+
+    def tearDown(self):
+        self.api.close()
+        self.tmp.cleanup()
+
+    def respond(self, *responses):
+        self.api.session = FakeSession(*responses)
+        return self.api.session
+
+    def test_rate_limit_headers_adjust_the_shared_budget(self):
+        self.respond(FakeResponse(200, {'asset': {}}, {'X-Ratelimit-Total': '200', 'X-Ratelimit-Remaining': '150'}))
+
+        self.api.make_request('assets/1')
+
+        self.assertEqual(self.api.rate_limiter.capacity, 180)
+        self.assertLessEqual(self.api.rate_limiter.tokens, 130)
+
+    def test_429_is_retried_after_retry_after(self):
+        session = self.respond(FakeResponse(429, headers={'Retry-After': '0'}), FakeResponse(200, {'asset': {'id': 1}}))
+
+        self.assertEqual(self.api.make_request('assets/1'), {'asset': {'id': 1}})
+        self.assertEqual(len(session.urls), 2)
+        self.assertEqual(self.api.rate_limiter.stats['throttled'], 1)
+
+    @mock.patch.dict('freshservice.api.RATE_LIMIT_CONFIG', {'max_retries': 2})
+    def test_429_gives_up_after_max_retries(self):
+        session = self.respond(FakeResponse(429, headers={'Retry-After': '0'}))
+        self.assertIsNone(self.api.make_request('assets/1'))
+        self.assertEqual(len(session.urls), 3)
+
+    def test_404_is_not_requested_again(self):
+        session = self.respond(FakeResponse(404))
+
+        self.assertIsNone(self.api.make_request('assets/5'))
+        # La query no cambia que el activo no exista
+        self.assertIsNone(self.api.make_request('assets/5?include=type_fields'))
+
+        self.assertEqual(len(session.urls), 1)
+        self.assertTrue(self.api.cache.is_missing('assets/5'))
+        self.assertEqual(self.api.cache.negative_stats['stored'], 1)
+
+    def test_cleared_404_is_requested_again(self):
+        session = self.respond(FakeResponse(404), FakeResponse(200, {'asset': {'id': 5}}))
+        self.api.make_request('assets/5')
+
+        self.api.cache.clear_missing('assets/5')
+
+        self.assertEqual(self.api.make_request('assets/5'), {'asset': {'id': 5}})
+        self.assertEqual(len(session.urls), 2)
+
+    def test_errors_and_listings_are_not_negative_cached(self):
+        session = self.respond(FakeResponse(500), FakeResponse(500), FakeResponse(404))
+
+        self.api.make_request('assets/6')
+        self.api.make_request('assets/6')
+        self.api.make_request('assets?page=9')
+        self.api.make_request('assets?page=9')
+
+        self.assertEqual(len(session.urls), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.asset_cache import CACHE_TYPE, WATERMARK_KEY, AssetCache
+from freshservice.cache_manager import CacheManager
+from tests.fake_api import FakeAPI, make_asset
+
+class AssetCacheRevalidationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with mock.patch('freshservice.CACHE_DIR', self.tmp.name):
+            self.cache = CacheManager(backend='json')
+        self.api = FakeAPI([make_asset(display_id) for display_id in (1, 2, 3)], cache=self.cache)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def new_run(self):
+        """AssetCache of a new process sharing the same cache"""
+        asset_cache = AssetCache(self.api)
+        asset_cache.revalidate()
+        return asset_cache
+
+    def fetch(self, asset_cache, display_id):
+        return asset_cache.fetch(display_id, 'asset', f'assets/{display_id}', self.api.make_request)
+
+    def point_requests(self):
+        return [endpoint for endpoint in self.api.requests if endpoint.startswith('assets/')]
+
+    def test_unchanged_assets_are_served_from_the_cache_in_the_next_run(self):
+        first = self.new_run()
+        for display_id in (1, 2):
+            self.fetch(first, display_id)
+        self.api.requests.clear()
+
+        second = self.new_run()
+        self.assertEqual(self.fetch(second, 1)['asset']['display_id'], 1)
+        self.assertEqual(self.point_requests(), [])
+        self.assertEqual(second.stats['hits'], 1)
+
+    def test_changed_assets_are_refetched(self):
+        first = self.new_run()
+        self.fetch(first, 1)
+        self.fetch(first, 2)
+        self.api.assets[2] = make_asset(2, name='Renombrado')
+        self.api.changed = [2]
+        self.api.requests.clear()
+
+        second = self.new_run()
+
+        self.assertEqual(self.fetch(second, 2)['asset']['name'], 'Renombrado')
+        self.fetch(second, 1)
+        self.assertEqual(self.point_requests(), ['assets/2'])
+        self.assertEqual(second.stats['changed'], 1)
+
+    def test_changed_asset_forgets_its_old_404(self):
+        first = self.new_run()
+        self.fetch(first, 4)
+        self.assertTrue(self.cache.is_missing('assets/4'))
+        self.api.assets[4] = make_asset(4)
+        self.api.changed = [4]
+
+        second = self.new_run()
+
+        self.assertEqual(self.fetch(second, 4)['asset']['display_id'], 4)
+
+    def test_without_a_reliable_listing_every_payload_is_dropped(self):
+        first = self.new_run()
+        self.fetch(first, 1)
+        self.api.make_request = lambda endpoint: None if 'updated_at' in endpoint else FakeAPI.make_request(self.api, endpoint)
+        self.api.requests.clear()
+
+        second = self.new_run()
+        self.fetch(second, 1)
+
+        self.assertEqual(self.point_requests(), ['assets/1'])
+        self.assertIsNotNone(self.cache.get(WATERMARK_KEY, cache_type=CACHE_TYPE))
+
+    def test_components_follow_the_asset_version(self):
+        asset_cache = self.new_run()
+        asset = make_asset(1, updated_at='2024-01-01T00:00:00Z')
+        fetch = mock.Mock(return_value={'components': [{'component_type': 'Processor'}]})
+
+        asset_cache.fetch_components(asset, 'assets/1/components', fetch)
+        asset_cache.fetch_components(asset, 'assets/1/components', fetch)
+        asset_cache.fetch_components(dict(asset, updated_at='2024-02-01T00:00:00Z'), 'assets/1/components', fetch)
+
+        self.assertEqual(fetch.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from freshservice.asset_index import AssetIndex
+from tests.fake_api import FakeAPI, make_asset
+
+OLD_WATERMARK = '2024-01-01T00:00:00Z'
+
+class AssetIndexRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeAPI([make_asset(display_id, user_id=10) for display_id in (1, 2, 3)])
+        self.index = AssetIndex(self.api)
+        self.index.refresh()
+        self.index.watermark = OLD_WATERMARK
+
+    def test_full_load(self):
+        self.assertEqual(list(self.index.find(user_id=10)), [1, 2, 3])
+
+    def test_changed_asset_is_reindexed(self):
+        self.api.assets[2] = make_asset(2, user_id=20)
+        self.api.changed = [2]
+
+        self.index.refresh()
+
+        self.assertEqual(list(self.index.find(user_id=10)), [1, 3])
+        self.assertEqual(list(self.index.find(user_id=20)), [2])
+        self.assertGreater(self.index.watermark, OLD_WATERMARK)
+
+    def test_changed_asset_with_an_old_404_is_indexed(self):
+        # El 4 dio 404 hace poco y se creó después
+        self.api.cache.missing.add('assets/4')
+        self.api.assets[4] = make_asset(4, user_id=10)
+        self.api.changed = [4]
+
+        self.index.refresh()
+
+        self.assertEqual(list(self.index.find(user_id=10)), [1, 2, 3, 4])
+
+    def test_only_confirmed_404s_are_removed(self):
+        del self.api.assets[2]
+        self.api.failing = {3}
+        self.api.changed = [2, 3]
+
+        self.index.refresh()
+
+        self.assertEqual(list(self.index.find(user_id=10)), [1, 3])
+        # El 3 falló: la marca no avanza para volver a pedirlo
+        self.assertEqual(self.index.watermark, OLD_WATERMARK)
+
+if __name__ == '__main__':
+    unittest.main()
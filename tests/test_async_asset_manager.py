@@ -0,0 +1,57 @@
+import asyncio
+import unittest
+from freshservice.async_asset_manager import AsyncAssetManager
+
+class SlowAssetManager(AsyncAssetManager):
+    """AsyncAssetManager whose assets take display_id hundredths of a second (no API session)"""
+
+    def __init__(self, max_in_flight=3):
+        self.max_in_flight = max_in_flight
+        self.cancelled = []
+
+    async def _process_asset_safely(self, asset_id, options, prefetched=None):
+        try:
+            await asyncio.sleep(0.01 * asset_id)
+        except asyncio.CancelledError:
+            self.cancelled.append(asset_id)
+            raise
+        return {'asset_id': asset_id}
+
+def other_tasks():
+    return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+class IterAssetsTest(unittest.TestCase):
+    def test_results_keep_input_order(self):
+        async def run():
+            manager = SlowAssetManager()
+            return [asset_id async for asset_id, _ in manager.iter_assets([5, 1, 3, 2, 4], {})]
+        self.assertEqual(asyncio.run(run()), [5, 1, 3, 2, 4])
+
+    def test_closing_early_cancels_and_awaits_the_tasks_in_flight(self):
+        async def run():
+            manager = SlowAssetManager()
+            assets = manager.iter_assets(range(1, 10), {})
+            async for asset_id, _ in assets:
+                if asset_id == 2:
+                    break
+            await assets.aclose()
+            # Ya cancelados y terminados, no solo marcados para cancelar
+            return manager.cancelled, other_tasks()
+        cancelled, remaining = asyncio.run(run())
+        self.assertEqual(sorted(cancelled), [3, 4])
+        self.assertEqual(remaining, [])
+
+    def test_error_in_the_consumer_cancels_the_tasks_in_flight(self):
+        async def run():
+            manager = SlowAssetManager()
+            assets = manager.iter_assets(range(1, 10), {})
+            await assets.__anext__()
+            with self.assertRaises(RuntimeError):
+                await assets.athrow(RuntimeError('boom'))
+            return manager.cancelled, other_tasks()
+        cancelled, remaining = asyncio.run(run())
+        self.assertEqual(sorted(cancelled), [2, 3])
+        self.assertEqual(remaining, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+from freshservice.asset_manager import AssetManager
+from freshservice.interval_set import IntervalSet
+from tests.fake_api import FakeAPI, make_asset
+
+def bulk_manager(api):
+    """AssetManager whose requests go to a FakeAPI (without the cache and session set up by __init__)"""
+    manager = AssetManager.__new__(AssetManager)
+    manager.make_request = api.make_request
+    manager.bulk_stats = {'pages': 0, 'assets': 0}
+    return manager
+
+@mock.patch.dict('freshservice.asset_manager.BULK_CONFIG', {'page_size': 10})
+class BulkListingTest(unittest.TestCase):
+    def setUp(self):
+        # 1-50 sin el 7 (borrado)
+        self.api = FakeAPI([make_asset(display_id) for display_id in range(1, 51) if display_id != 7])
+        self.manager = bulk_manager(self.api)
+
+    def test_listing_is_requested_in_display_id_order(self):
+        self.manager.get_assets_bulk(IntervalSet([(1, 5)]))
+        self.assertIn('order_by=display_id&order_type=asc', self.api.requests[0])
+
+    def test_missing_ids_are_reported_after_a_complete_listing(self):
+        prefetched = self.manager.get_assets_bulk(IntervalSet([(1, 30)]), workers=2)
+
+        self.assertIsNone(prefetched[7]['asset'])
+        self.assertEqual(prefetched[30]['asset']['asset']['display_id'], 30)
+        self.assertEqual(len(prefetched), 30)
+
+    def test_listing_stops_after_the_last_requested_id(self):
+        self.manager.get_assets_bulk(IntervalSet([(1, 15)]))
+        self.assertEqual(self.manager.bulk_stats['pages'], 2)
+
+    def test_failed_page_is_retried(self):
+        self.api.failing_pages = {2: 1}
+
+        prefetched = self.manager.get_assets_bulk(IntervalSet([(1, 30)]), workers=2)
+
+        self.assertEqual(prefetched[15]['asset']['asset']['display_id'], 15)
+        self.assertIsNone(prefetched[7]['asset'])
+
+    def test_failed_page_is_not_read_as_the_end_of_the_listing(self):
+        self.api.failing_pages = {2: 2}
+
+        prefetched = self.manager.get_assets_bulk(IntervalSet([(1, 30)]), workers=2)
+
+        # La página 2 (IDs 12-21) queda para las consultas individuales, no como inexistente
+        for display_id in range(12, 22):
+            self.assertNotIn(display_id, prefetched)
+        self.assertNotIn(7, prefetched)
+        self.assertEqual(prefetched[5]['asset']['asset']['display_id'], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import tempfile
+import time
+import unittest
+from unittest import mock
+from freshservice.cache_manager import CacheManager
+from freshservice.memory_cache import MemoryCache
+
+POLICIES = {'general': {'soft_ttl_hours': 1, 'hard_ttl_hours': 2}}
+
+class MemoryCacheTest(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        memory = MemoryCache(max_entries=2, max_bytes=1000)
+        memory.set('general', 'a', 1, 10)
+        memory.set('general', 'b', 2, 10)
+        memory.get('general', 'a')
+        memory.set('general', 'c', 3, 10)
+
+        self.assertEqual(memory.get('general', 'a'), 1)
+        self.assertIsNone(memory.get('general', 'b'))
+        self.assertEqual(memory.stats['general']['evictions'], 1)
+
+    def test_byte_budget_is_kept(self):
+        memory = MemoryCache(max_entries=100, max_bytes=25)
+        for key in 'abc':
+            memory.set('general', key, key, 10)
+        self.assertEqual(memory.total_bytes, 20)
+        # Una entrada mayor que todo el presupuesto no se guarda en memoria
+        memory.set('general', 'big', 'x', 30)
+        self.assertIsNone(memory.get('general', 'big'))
+
+    def test_expired_entry_is_a_miss(self):
+        memory = MemoryCache(max_entries=10, max_bytes=1000)
+        memory.set('general', 'a', 1, 10, stored_at=time.time() - 100)
+        self.assertIsNone(memory.get('general', 'a', max_age_seconds=50))
+        self.assertEqual(memory.total_bytes, 0)
+
+@mock.patch.dict('freshservice.cache_manager.CACHE_CONFIG', {'policies': POLICIES})
+class CacheManagerPolicyTest(unittest.TestCase):
+    backend = 'json'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with mock.patch('freshservice.CACHE_DIR', self.tmp.name):
+            self.cache = CacheManager(backend=self.backend)
+
+    def tearDown(self):
+        if self.backend == 'sqlite':
+            self.cache.store._connect().close()
+        self.tmp.cleanup()
+
+    def store_aged(self, key, data, age_hours):
+        """Save an entry as if it had been cached age_hours ago (bypassing the memory tier)"""
+        stored_at = time.time() - age_hours * 3600
+        self.cache.store.set('general', key, f'"{data}"', stored_at, stored_at + 2 * 3600)
+
+    def test_fresh_entry(self):
+        self.cache.set('departments/all', ['IT'])
+        self.assertEqual(self.cache.lookup('departments/all'), (['IT'], False))
+        self.assertEqual(self.cache.get('departments/all'), ['IT'])
+
+    def test_entry_past_the_soft_ttl_is_served_stale(self):
+        self.store_aged('key', 'old', 1.5)
+        self.assertEqual(self.cache.lookup('key'), ('old', True))
+        # get() solo devuelve datos dentro del TTL blando
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_entry_past_the_hard_ttl_is_removed(self):
+        self.store_aged('key', 'old', 3)
+        self.assertEqual(self.cache.lookup('key'), (None, False))
+        self.assertIsNone(self.cache.store.get('general', self.cache._sanitize('key')))
+
+    def test_memory_tier_answers_without_the_store(self):
+        self.cache.set('key', 'value')
+        self.cache.store.delete('general', self.cache._sanitize('key'))
+        self.assertEqual(self.cache.get('key'), 'value')
+
+    def test_store_hit_is_promoted_to_memory(self):
+        self.store_aged('key', 'value', 0)
+        self.cache.get('key')
+        self.cache.store.delete('general', self.cache._sanitize('key'))
+        self.assertEqual(self.cache.get('key'), 'value')
+
+    def test_negative_entries(self):
+        self.assertEqual(self.cache.negative_key('assets/5?include=type_fields'), 'assets/5')
+        self.assertIsNone(self.cache.negative_key('assets?page=2'))
+        self.cache.set_missing('assets/5')
+        self.assertTrue(self.cache.is_missing('assets/5'))
+        self.cache.clear_missing('assets/5')
+        self.assertFalse(self.cache.is_missing('assets/5'))
+
+class SQLiteCacheManagerPolicyTest(CacheManagerPolicyTest):
+    backend = 'sqlite'
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+import unittest
+from freshservice.cache_stores import JsonFileStore
+
+class JsonFileStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = self.tmp.name
+        self.store = JsonFileStore(self.cache_dir)
+        # Lo que comparte la raíz de .cache con el almacén JSON
+        for name in ('cache.db', 'inventory.db', 'old_layout.json'):
+            with open(os.path.join(self.cache_dir, name), 'w') as f:
+                f.write('x')
+        os.makedirs(os.path.join(self.cache_dir, 'runs'))
+        with open(os.path.join(self.cache_dir, 'runs', 'run.json'), 'w') as f:
+            f.write('{}')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def set(self, cache_type, key, data='1'):
+        now = time.time()
+        self.store.set(cache_type, key, data, now, now + 60)
+
+    def assert_root_untouched(self):
+        for name in ('cache.db', 'inventory.db', 'old_layout.json', os.path.join('runs', 'run.json')):
+            self.assertTrue(os.path.exists(os.path.join(self.cache_dir, name)), name)
+
+    def test_every_cache_type_gets_its_own_directory(self):
+        self.set('asset_types', 'asset_types_all')
+        self.set('custom', 'key')
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, 'asset_types', 'asset_types_all.json')))
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, 'custom', 'key.json')))
+
+    def test_clearing_a_type_keeps_the_other_types_and_the_root(self):
+        self.set('asset_types', 'asset_types_all')
+        self.set('departments', 'departments_all')
+
+        self.store.clear('asset_types')
+
+        self.assertIsNone(self.store.get('asset_types', 'asset_types_all'))
+        self.assertIsNotNone(self.store.get('departments', 'departments_all'))
+        self.assert_root_untouched()
+
+    def test_clearing_everything_keeps_the_root(self):
+        self.set('general', 'a')
+        self.set('negative', 'assets_5')
+
+        self.store.clear()
+
+        self.assertIsNone(self.store.get('general', 'a'))
+        self.assertIsNone(self.store.get('negative', 'assets_5'))
+        self.assert_root_untouched()
+
+    def test_delete_prefix_without_type_keeps_the_root(self):
+        self.set('assets', 'inventory_1')
+        self.set('general', 'other')
+
+        removed = self.store.delete_prefix('', None)
+
+        self.assertEqual(removed, 2)
+        self.assert_root_untouched()
+
+    def test_stored_at_is_kept(self):
+        self.store.set('general', 'old', '1', 1000.0, 2000.0)
+        self.assertEqual(self.store.get('general', 'old')[1], 1000.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.cache_manager import CacheManager
+from freshservice.cache_warmer import CacheWarmer, ListingError
+from freshservice.name_index import REQUESTERS_CACHE_KEY, NameIndex
+from freshservice.reference_index import REFERENCE_CACHE_KEYS, ReferenceIndex
+from tests.fake_api import FakeAPI
+
+REFERENCES = {
+    'departments': [{'id': 100 + i, 'name': f'Departamento {i}'} for i in range(7)],
+    'locations': [{'id': 200, 'name': 'Sede'}],
+    'asset_types': [],
+    'requesters': [{'id': 400 + i, 'first_name': 'Usuario', 'last_name': str(i)} for i in range(3)],
+}
+
+@mock.patch.dict('freshservice.cache_warmer.WARM_CACHE_CONFIG', {'page_size': 3})
+class CacheWarmerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with mock.patch('freshservice.CACHE_DIR', self.tmp.name):
+            self.cache = CacheManager(backend='json')
+        self.api = FakeAPI(references=REFERENCES, cache=self.cache)
+        self.api.reference_index = ReferenceIndex(self.api)
+        self.api.name_index = NameIndex(self.api)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_warm_caches_every_list_and_loads_the_indexes(self):
+        counts = CacheWarmer(self.api, workers=4).warm(list(REFERENCES))
+
+        self.assertEqual(counts, {'departments': 7, 'locations': 1, 'asset_types': 0, 'requesters': 3})
+        self.assertEqual(len(self.cache.get(REFERENCE_CACHE_KEYS['departments'], cache_type='departments')), 7)
+        self.assertEqual(self.cache.get('requesters/401', cache_type='requesters'),
+                         {'requester': REFERENCES['requesters'][1]})
+        self.assertEqual(len(self.cache.get(REQUESTERS_CACHE_KEY, cache_type='requesters')), 3)
+        # Los índices quedan cargados sin más peticiones
+        requests = len(self.api.requests)
+        self.assertEqual(self.api.reference_index.get_id('departments', 'departamento 6'), 106)
+        self.assertEqual(self.api.name_index.get_requester(402)['last_name'], '2')
+        self.assertEqual(len(self.api.requests), requests)
+
+    def test_listing_stops_at_the_first_short_page(self):
+        records = CacheWarmer(self.api, workers=1).fetch_listing('departments')
+
+        self.assertEqual([record['id'] for record in records], list(range(100, 107)))
+        self.assertEqual(len(self.api.requests), 3)
+
+    def test_failed_page_raises_instead_of_returning_part_of_the_list(self):
+        self.api.failing_pages = {2: 1}
+
+        with self.assertRaises(ListingError):
+            CacheWarmer(self.api, workers=2).warm(['departments'])
+
+        self.assertIsNone(self.cache.get(REFERENCE_CACHE_KEYS['departments'], cache_type='departments'))
+
+if __name__ == '__main__':
+    unittest.main()
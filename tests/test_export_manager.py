@@ -0,0 +1,118 @@
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.export_manager import ExportManager, RowExporter
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+class ExportManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.export_manager = ExportManager()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_row_exporter_is_abstract(self):
+        with self.assertRaises(TypeError):
+            RowExporter(self.path('out.csv'))
+
+    def test_csv_keeps_the_given_columns(self):
+        output_file = self.export_manager.export_data(
+            [{'display_id': 1}, {'display_id': 2, 'user': 'Ana'}], self.path('out.csv'), format=None
+        )
+        with open(output_file, encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows, [['display_id', 'user'], ['1', ''], ['2', 'Ana']])
+
+    def test_error_inside_the_with_block_does_not_finish_the_file(self):
+        with self.assertRaises(RuntimeError):
+            with self.export_manager.open(self.path('out.csv')) as exporter:
+                exporter.write({'display_id': 1})
+                raise RuntimeError('boom')
+        # La cabecera no llegó a escribirse: no queda un CSV que parezca completo
+        self.assertFalse(os.path.exists(self.path('out.csv')))
+
+    def test_error_inside_the_with_block_does_not_save_the_workbook(self):
+        with self.assertRaises(RuntimeError):
+            with self.export_manager.open(self.path('out.xlsx'), ['display_id']) as exporter:
+                exporter.write({'display_id': 1})
+                raise RuntimeError('boom')
+        self.assertFalse(os.path.exists(self.path('out.xlsx')))
+
+    def test_successful_export_leaves_only_the_final_file(self):
+        for name in ('out.csv', 'out.ndjson', 'out.json', 'out.xlsx'):
+            output_file = self.export_manager.export_data([{'display_id': 1}], self.path(name))
+            self.assertEqual(output_file, self.path(name))
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['out.csv', 'out.json', 'out.ndjson', 'out.xlsx'])
+
+    @mock.patch.dict('freshservice.export_manager.EXPORT_CONFIG', {'sample_rows': 1})
+    def test_error_after_the_header_leaves_no_file(self):
+        # Con la cabecera y alguna fila ya escritas tampoco debe quedar nada con el nombre final
+        for name in ('out.csv', 'out.csv.gz', 'out.ndjson', 'out.json'):
+            with self.assertRaises(RuntimeError):
+                with self.export_manager.open(self.path(name)) as exporter:
+                    exporter.write({'display_id': 1})
+                    exporter.write({'display_id': 2})
+                    raise RuntimeError('boom')
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_xlsx_export_does_not_import_pandas(self):
+        code = ("import sys; from freshservice.export_manager import ExportManager; "
+                f"ExportManager().export_data([{{'display_id': 1, 'value': float('nan')}}], {self.path('out.xlsx')!r}); "
+                "print('pandas' in sys.modules)")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.stdout.strip(), 'False')
+
+@unittest.skipIf(pq is None, 'pyarrow is not installed')
+@mock.patch.dict('freshservice.export_manager.EXPORT_CONFIG',
+                 {'sample_rows': 2, 'parquet': {'compression': 'zstd', 'row_group_size': 2}})
+class ParquetWideningTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.tmp.name, 'out.parquet')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def export(self, values):
+        ExportManager().export_data([{'display_id': i, 'value': value} for i, value in enumerate(values)],
+                                    self.output_file)
+        return pq.read_table(self.output_file)
+
+    def test_decimal_in_an_integer_column_widens_it_to_float(self):
+        table = self.export([1, 2, 2.5, 3])
+        self.assertEqual(str(table.schema.field('value').type), 'double')
+        self.assertEqual(table.column('value').to_pylist(), [1.0, 2.0, 2.5, 3.0])
+
+    def test_text_in_a_numeric_column_widens_it_to_string(self):
+        table = self.export([1, 2, 3, 'Unknown', 2.5])
+        self.assertEqual(str(table.schema.field('value').type), 'string')
+        self.assertEqual(table.column('value').to_pylist(), ['1', '2', '3', 'Unknown', '2.5'])
+
+    def test_error_leaves_no_readable_parquet(self):
+        with self.assertRaises(RuntimeError):
+            with ExportManager().open(self.output_file) as exporter:
+                for i in range(5):
+                    exporter.write({'display_id': i})
+                raise RuntimeError('boom')
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_columns_that_fit_keep_their_type(self):
+        table = self.export([1, 2, 3, None, 4])
+        self.assertEqual(str(table.schema.field('value').type), 'int64')
+        self.assertEqual(table.column('value').to_pylist(), [1, 2, 3, None, 4])
+
+if __name__ == '__main__':
+    unittest.main()
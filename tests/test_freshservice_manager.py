@@ -0,0 +1,57 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.asset_manager import AssetManager
+from freshservice.freshservice_manager import FreshServiceManager
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+@unittest.skipIf(openpyxl is None, 'openpyxl is not installed')
+@mock.patch.object(FreshServiceManager, '_setup_logging', lambda self: None)
+class ImportExcelIdsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = FreshServiceManager()
+        # Leer IDs de un fichero no necesita la API
+        self.manager.__dict__['asset_manager'] = AssetManager.__new__(AssetManager)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def import_ids(self, values):
+        excel_file = os.path.join(self.tmp.name, 'ids.xlsx')
+        wb = openpyxl.Workbook()
+        for value in ['Asset ID', *values]:
+            wb.active.append([value])
+        wb.save(excel_file)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.manager.import_excel_ids(excel_file)
+        return os.path.join(self.tmp.name, 'ids_ids.txt'), output.getvalue()
+
+    def test_ids_are_written_in_range_syntax(self):
+        output_file, printed = self.import_ids([1, 2, 3, 4, 5, 6, 7, 20, '30-32'])
+
+        with open(output_file) as f:
+            self.assertEqual(f.read(), '1-7,20,30-32')
+        self.assertIn('Successfully exported 11 IDs', printed)
+        self.assertIn('IDs: 1,2,3,4,5...', printed)
+        self.assertNotIn('Error', printed)
+
+    def test_few_ids_are_shown_without_ellipsis(self):
+        _, printed = self.import_ids([8, 9])
+        self.assertIn('IDs: 8,9\n', printed)
+
+    def test_file_without_ids_writes_nothing(self):
+        output_file, printed = self.import_ids(['n/a'])
+        self.assertIn('No valid IDs found', printed)
+        self.assertFalse(os.path.exists(output_file))
+
+if __name__ == '__main__':
+    unittest.main()
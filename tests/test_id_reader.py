@@ -0,0 +1,106 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.id_reader import read_ids
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+def read_text(content, filename='ids.txt'):
+    return read_ids(io.BytesIO(content.encode('utf-8')), filename)
+
+class ReadTextIdsTest(unittest.TestCase):
+    def test_separators_and_ranges(self):
+        result = read_text('1,2;3\n10-12\r\n\n20')
+        self.assertEqual(result.ids.to_text(), '1-3,10-12,20')
+        self.assertEqual(result.invalid_count, 0)
+
+    @mock.patch('freshservice.id_reader.TEXT_CHUNK_SIZE', 4)
+    def test_ids_cut_by_the_chunk_boundary_are_kept_whole(self):
+        # Con bloques de 4 caracteres, '12345' y '300-310' quedan partidos entre bloques
+        result = read_text('12345,7\n300-310,99999')
+        self.assertEqual(result.ids.to_text(), '7,300-310,12345,99999')
+        self.assertEqual(result.invalid, [])
+
+    @mock.patch('freshservice.id_reader.TEXT_CHUNK_SIZE', 3)
+    def test_chunked_read_matches_a_single_read(self):
+        content = ','.join(str(id_) for id_ in range(1, 400, 3)) + '\n1000-1100\n'
+        with mock.patch('freshservice.id_reader.TEXT_CHUNK_SIZE', 1 << 20):
+            expected = read_text(content).ids
+        self.assertEqual(read_text(content).ids, expected)
+
+    def test_invalid_values_are_counted_and_sampled(self):
+        with mock.patch('freshservice.id_reader.MAX_INVALID_KEPT', 2):
+            result = read_text('1,abc,2,def,ghi,150-143')
+        self.assertEqual(result.ids.to_text(), '1-2')
+        self.assertEqual(result.invalid, ['abc', 'def'])
+        self.assertEqual(result.invalid_count, 4)
+
+    def test_malformed_number_does_not_abort_the_file(self):
+        result = read_text('1\n1.0.0\n10.05\n2')
+        self.assertEqual(result.ids.to_text(), '1-2')
+        self.assertEqual(result.invalid, ['1.0.0', '10.05'])
+
+    @mock.patch('freshservice.id_reader.MERGE_EVERY', 2)
+    def test_small_merge_batches_give_the_same_set(self):
+        result = read_text('50,1,30,2,40-45,3,100')
+        self.assertEqual(result.ids.to_text(), '1-3,30,40-45,50,100')
+
+    def test_caller_stream_is_not_closed(self):
+        stream = io.BytesIO(b'1,2')
+        read_ids(stream, 'upload.txt')
+        self.assertFalse(stream.closed)
+
+    def test_unknown_extension_is_read_as_text(self):
+        self.assertEqual(read_text('5\n6', 'ids.dat').ids.to_text(), '5-6')
+
+class ReadCsvIdsTest(unittest.TestCase):
+    def test_header_is_skipped_without_counting_it_as_invalid(self):
+        result = read_text('asset_id,name\n10,PC-10\n11,PC-11\n15,PC-15\n', 'ids.csv')
+        self.assertEqual(result.ids.to_text(), '10-11,15')
+        self.assertEqual(result.invalid_count, 0)
+
+    def test_file_without_header(self):
+        result = read_text('10;a\n11;b\n', 'ids.csv')
+        self.assertEqual(result.ids.to_text(), '10-11')
+
+    def test_invalid_value_after_the_header_is_reported(self):
+        result = read_text('id\n10\nxx\n12\n', 'ids.csv')
+        self.assertEqual(result.ids.to_text(), '10,12')
+        self.assertEqual(result.invalid, ['xx'])
+
+    def test_tsv_uses_the_first_column(self):
+        result = read_text('id\tname\n7\tPC, 7\n8\tPC-8\n', 'ids.tsv')
+        self.assertEqual(result.ids.to_text(), '7-8')
+
+    @mock.patch('freshservice.id_reader.TEXT_CHUNK_SIZE', 10)
+    def test_row_cut_by_the_sniffer_sample_is_completed(self):
+        # La muestra de 10 caracteres termina en mitad de la fila '12345,PC'
+        result = read_text('id,name\n12345,PC\n20,PC\n', 'ids.csv')
+        self.assertEqual(result.ids.to_text(), '20,12345')
+        self.assertEqual(result.invalid_count, 0)
+
+    def test_utf8_bom_does_not_break_the_first_value(self):
+        result = read_ids(io.BytesIO(b'\xef\xbb\xbf10\n11\n'), 'ids.csv')
+        self.assertEqual(result.ids.to_text(), '10-11')
+
+@unittest.skipIf(openpyxl is None, 'openpyxl is not installed')
+class ReadXlsxIdsTest(unittest.TestCase):
+    def test_first_column_with_header(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ids.xlsx')
+            wb = openpyxl.Workbook()
+            ws = wb.active
+            for row in (['Asset ID', 'Name'], [10, 'PC-10'], [11.0, 'PC-11'], ['20-22', 'PCs'], [None, 'x'], ['n/a', 'y']):
+                ws.append(row)
+            wb.save(path)
+            result = read_ids(path)
+        self.assertEqual(result.ids.to_text(), '10-11,20-22')
+        self.assertEqual(result.invalid, ['n/a'])
+
+if __name__ == '__main__':
+    unittest.main()
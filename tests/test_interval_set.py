@@ -0,0 +1,80 @@
+import unittest
+from freshservice.interval_set import IntervalSet, parse_id_part, parse_ids
+
+class IntervalSetTest(unittest.TestCase):
+    def test_overlapping_and_adjacent_ranges_are_merged(self):
+        ids = IntervalSet([(10, 20), (1, 5), (6, 8), (15, 25)])
+        self.assertEqual(ids.ranges(), [(1, 8), (10, 25)])
+        self.assertEqual(len(ids), 24)
+        self.assertEqual((ids.first, ids.last), (1, 25))
+
+    def test_contains(self):
+        ids = IntervalSet([(1, 5), (10, 20)])
+        self.assertIn(10, ids)
+        self.assertNotIn(7, ids)
+        self.assertNotIn(21, ids)
+        self.assertNotIn('5', ids)
+
+    def test_union(self):
+        ids = IntervalSet([(1, 5), (20, 30)]) | IntervalSet([(6, 10), (25, 40), (50, 50)])
+        self.assertEqual(ids.to_text(), '1-10,20-40,50')
+
+    def test_intersection(self):
+        ids = IntervalSet([(1, 10), (20, 30)]) & IntervalSet([(5, 22), (28, 100)])
+        self.assertEqual(ids.ranges(), [(5, 10), (20, 22), (28, 30)])
+        self.assertEqual(len(ids), 12)
+        self.assertFalse(IntervalSet([(1, 5)]) & IntervalSet([(6, 10)]))
+
+    def test_difference(self):
+        ids = IntervalSet([(1, 100)]) - IntervalSet([(1, 1), (10, 19), (50, 50), (100, 120)])
+        self.assertEqual(ids.to_text(), '2-9,20-49,51-99')
+        self.assertEqual(len(ids), 8 + 30 + 49)
+
+    def test_difference_across_several_ranges(self):
+        # Un rango a restar que cubre el final de uno y el principio del siguiente
+        ids = IntervalSet([(1, 10), (20, 30), (40, 50)]) - IntervalSet([(8, 22), (45, 60)])
+        self.assertEqual(ids.to_text(), '1-7,23-30,40-44')
+        self.assertEqual(IntervalSet([(1, 10)]) - IntervalSet([(1, 10)]), IntervalSet())
+
+    def test_results_match_python_sets(self):
+        a = IntervalSet([(1, 30), (35, 35), (50, 80), (90, 95)])
+        b = IntervalSet([(5, 10), (28, 52), (79, 92), (99, 99)])
+        self.assertEqual(set(a | b), set(a) | set(b))
+        self.assertEqual(set(a & b), set(a) & set(b))
+        self.assertEqual(set(a - b), set(a) - set(b))
+        self.assertEqual(len(a - b), len(set(a) - set(b)))
+
+class ParseIdsTest(unittest.TestCase):
+    def test_ids_and_ranges(self):
+        ids, invalid = parse_ids('143-150, 155;160\n161')
+        self.assertEqual(ids.to_text(), '143-150,155,160-161')
+        self.assertEqual(invalid, [])
+
+    def test_invalid_parts_are_reported(self):
+        ids, invalid = parse_ids('1,abc,3-x,5')
+        self.assertEqual(ids.to_text(), '1,5')
+        self.assertEqual(invalid, ['abc', '3-x'])
+
+    def test_reversed_range_is_reported_as_invalid(self):
+        ids, invalid = parse_ids('150-143,155')
+        self.assertEqual(ids.to_text(), '155')
+        self.assertEqual(invalid, ['150-143'])
+        self.assertIsNone(parse_id_part('150-143'))
+
+    def test_excel_float_ids(self):
+        self.assertEqual(parse_id_part('155.0'), (155, 155))
+        self.assertEqual(parse_ids('155.0,156')[0].to_text(), '155-156')
+
+    def test_malformed_numbers_are_reported_as_invalid(self):
+        ids, invalid = parse_ids('1.0.0,10.05,²,nan,7')
+        self.assertEqual(ids.to_text(), '7')
+        self.assertEqual(invalid, ['1.0.0', '10.05', '²', 'nan'])
+
+    def test_empty_input(self):
+        for text in ('', None, ' , ;'):
+            ids, invalid = parse_ids(text)
+            self.assertFalse(ids)
+            self.assertEqual(invalid, [])
+
+if __name__ == '__main__':
+    unittest.main()
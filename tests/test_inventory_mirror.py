@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.cache_warmer import ListingError
+from freshservice.inventory_mirror import InventoryMirror
+from tests.fake_api import FakeAPI, make_asset
+
+OLD_WATERMARK = '2024-01-01T00:00:00Z'
+
+class InventoryMirrorSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.api = FakeAPI([make_asset(display_id) for display_id in (1, 2, 3)])
+        self.mirror = InventoryMirror(self.api, os.path.join(self.tmp.name, 'inventory.db'))
+        self.mirror.sync(full=True, workers=2)
+        with self.mirror._connect() as conn:
+            self.mirror._set_state(conn, 'assets_watermark', OLD_WATERMARK)
+
+    def tearDown(self):
+        self.mirror._connect().close()
+        self.tmp.cleanup()
+
+    def age_reconciliation(self):
+        with self.mirror._connect() as conn:
+            self.mirror._set_state(conn, 'reconciled_at', '0')
+
+    def mirrored_ids(self):
+        return [asset['display_id'] for asset in self.mirror.iter_assets()]
+
+    def test_incremental_sync_deletes_only_confirmed_404s(self):
+        del self.api.assets[2]
+        self.api.failing = {3}
+        self.api.changed = [2, 3]
+
+        stats = self.mirror.sync(workers=2)
+
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(stats['failed'], 1)
+        # 2 dio 404 y se borra; 3 falló y se conserva
+        self.assertEqual(self.mirrored_ids(), [1, 3])
+        self.assertEqual(self.mirror.last_sync, OLD_WATERMARK)
+
+    def test_watermark_advances_once_every_refetch_succeeds(self):
+        self.api.failing = {3}
+        self.api.changed = [3]
+        self.mirror.sync(workers=2)
+        self.assertEqual(self.mirror.last_sync, OLD_WATERMARK)
+
+        self.api.failing = set()
+        stats = self.mirror.sync(workers=2)
+        self.assertEqual(stats['failed'], 0)
+        self.assertGreater(self.mirror.last_sync, OLD_WATERMARK)
+
+    def test_failed_component_fetch_keeps_the_watermark(self):
+        self.api.changed = [1]
+        original = self.api.make_request
+        self.api.make_request = lambda endpoint: None if endpoint == 'assets/1/components' else original(endpoint)
+
+        stats = self.mirror.sync(workers=2)
+
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(self.mirror.last_sync, OLD_WATERMARK)
+
+    def test_changed_asset_with_an_old_404_is_refetched(self):
+        # El 4 dio 404 en una ejecución anterior (p. ej. un hueco de -i 1-20000) y se creó después
+        self.api.cache.missing.add('assets/4')
+        self.api.assets[4] = make_asset(4)
+        self.api.changed = [4]
+
+        stats = self.mirror.sync(workers=2)
+
+        self.assertEqual(stats['deleted'], 0)
+        self.assertEqual(self.mirrored_ids(), [1, 2, 3, 4])
+        self.assertGreater(self.mirror.last_sync, OLD_WATERMARK)
+
+    @mock.patch.dict('freshservice.inventory_mirror.MIRROR_CONFIG', {'reconcile_hours': 24})
+    def test_reconciliation_removes_assets_deleted_in_freshservice(self):
+        # Los borrados no aparecen en el listado de cambios
+        del self.api.assets[2]
+        self.age_reconciliation()
+
+        stats = self.mirror.sync(workers=2)
+
+        self.assertTrue(stats['reconciled'])
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(self.mirrored_ids(), [1, 3])
+
+    @mock.patch.dict('freshservice.inventory_mirror.MIRROR_CONFIG', {'reconcile_hours': 24})
+    def test_reconciliation_keeps_assets_that_still_exist(self):
+        # Falta en el listado (p. ej. las páginas se desplazaron) pero la consulta individual lo encuentra
+        self.age_reconciliation()
+        original = self.api.make_request
+        self.api.make_request = lambda endpoint: (
+            {'assets': [make_asset(1), make_asset(3)]} if endpoint.startswith('assets?per_page') else original(endpoint)
+        )
+
+        stats = self.mirror.sync(workers=2)
+
+        self.assertEqual(stats['deleted'], 0)
+        self.assertEqual(self.mirrored_ids(), [1, 2, 3])
+
+    @mock.patch.dict('freshservice.inventory_mirror.MIRROR_CONFIG', {'reconcile_hours': 24})
+    def test_reconciliation_runs_once_per_period(self):
+        self.age_reconciliation()
+        self.assertTrue(self.mirror.sync(workers=2)['reconciled'])
+        del self.api.assets[2]
+
+        stats = self.mirror.sync(workers=2)
+
+        self.assertFalse(stats['reconciled'])
+        self.assertEqual(self.mirrored_ids(), [1, 2, 3])
+
+    def test_failed_full_listing_leaves_the_mirror_unchanged(self):
+        self.api.assets = {}
+        self.api.listing_fails = True
+
+        with self.assertRaises(ListingError):
+            self.mirror.sync(full=True, workers=2)
+
+        self.assertEqual(self.mirrored_ids(), [1, 2, 3])
+        self.assertEqual(self.mirror.last_sync, OLD_WATERMARK)
+
+    def test_full_sync_replaces_removed_assets(self):
+        del self.api.assets[2]
+
+        stats = self.mirror.sync(full=True, workers=2)
+
+        self.assertEqual(stats['assets'], 2)
+        self.assertEqual(self.mirrored_ids(), [1, 3])
+        rows = self.mirror._connect().execute("SELECT display_id FROM components ORDER BY display_id").fetchall()
+        self.assertEqual(rows, [(1,), (3,)])
+
+if __name__ == '__main__':
+    unittest.main()
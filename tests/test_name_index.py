@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.cache_manager import CacheManager
+from freshservice.name_index import REQUESTERS_CACHE_KEY, NameIndex
+from freshservice.reference_index import ReferenceIndex
+from tests.fake_api import FakeAPI
+
+REFERENCES = {
+    'departments': [{'id': 1, 'name': 'Administración'}, {'id': 2, 'name': 'Ventas'},
+                    {'id': 3, 'name': 'Ventas Norte'}, {'id': 4, 'name': 'Recursos Humanos'}],
+    'requesters': [{'id': 10, 'first_name': 'Ana', 'last_name': 'García'},
+                   {'id': 11, 'first_name': 'Luis', 'last_name': 'Pérez'}],
+}
+
+class NameIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with mock.patch('freshservice.CACHE_DIR', self.tmp.name):
+            self.cache = CacheManager(backend='json')
+        self.api = FakeAPI(references=REFERENCES, cache=self.cache)
+        self.api.mirror = None
+        self.api.reference_index = ReferenceIndex(self.api)
+        self.index = NameIndex(self.api)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_case_and_accents_are_ignored(self):
+        self.assertEqual(self.index.resolve('departments', '  ADMINISTRACION '), 1)
+
+    def test_unambiguous_typo_is_resolved(self):
+        self.assertEqual(self.index.resolve('departments', 'recursos humaños'), 4)
+
+    def test_ambiguous_or_unknown_names_are_not_resolved(self):
+        self.assertIsNone(self.index.resolve('departments', 'vent'))
+        self.assertIsNone(self.index.resolve('departments', 'xyz'))
+
+    def test_suggestions_and_completion(self):
+        self.assertEqual([name for name, _, _ in self.index.search('departments', 'ventas', limit=2)],
+                         ['Ventas', 'Ventas Norte'])
+        # Autocompleta también por el principio de cualquier palabra
+        self.assertEqual(self.index.complete('departments', 'nor'), ['Ventas Norte'])
+
+    def test_reloaded_reference_list_is_picked_up(self):
+        self.index.resolve('departments', 'ventas')
+        self.api.reference_index.load('departments', [{'id': 9, 'name': 'Logística'}])
+        self.assertEqual(self.index.resolve('departments', 'logistica'), 9)
+        self.assertIsNone(self.index.resolve('departments', 'ventas'))
+
+    def test_requesters_are_resolved_by_full_name(self):
+        with mock.patch.dict('freshservice.name_index.NAME_INDEX_CONFIG', {'requesters': 'on'}):
+            self.assertEqual(self.index.resolve('requesters', 'ana garcia'), 10)
+            self.assertEqual(self.index.get_requester(11)['last_name'], 'Pérez')
+
+    @mock.patch.dict('freshservice.name_index.NAME_INDEX_CONFIG', {'requesters': 'auto'})
+    def test_requester_list_is_used_only_once_available(self):
+        # En frío no compensa descargar la lista entera
+        self.assertFalse(self.index.use_requesters())
+        self.assertEqual([endpoint for endpoint in self.api.requests if endpoint.startswith('requesters')], [])
+
+        self.cache.set(REQUESTERS_CACHE_KEY, REFERENCES['requesters'], cache_type='requesters')
+        self.assertTrue(self.index.use_requesters())
+
+    def test_requester_mode_can_be_forced(self):
+        self.cache.set(REQUESTERS_CACHE_KEY, REFERENCES['requesters'], cache_type='requesters')
+        with mock.patch.dict('freshservice.name_index.NAME_INDEX_CONFIG', {'requesters': 'off'}):
+            self.assertFalse(self.index.use_requesters())
+        self.cache.clear_cache('requesters')
+        with mock.patch.dict('freshservice.name_index.NAME_INDEX_CONFIG', {'requesters': 'on'}):
+            self.assertTrue(self.index.use_requesters())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+from freshservice.rate_limiter import RateLimiter
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        # 60 peticiones por minuto: una ficha por segundo
+        self.limiter = RateLimiter(60)
+
+    def test_requests_within_the_budget_do_not_wait(self):
+        waits = [self.limiter.reserve() for _ in range(60)]
+        self.assertEqual(max(waits), 0)
+        self.assertAlmostEqual(self.limiter.reserve(), 1.0, places=1)
+
+    def test_total_header_sets_the_budget_with_the_safety_margin(self):
+        self.limiter.update_from_headers({'X-Ratelimit-Total': '200', 'X-Ratelimit-Remaining': '200'})
+        self.assertEqual(self.limiter.capacity, 180)
+        self.assertAlmostEqual(self.limiter.refill_rate, 3.0)
+
+    def test_remaining_header_caps_the_tokens(self):
+        self.limiter.update_from_headers({'X-Ratelimit-Total': '100', 'X-Ratelimit-Remaining': '15'})
+        # Se reserva el 10% del presupuesto: quedan 15 - 10 fichas utilizables
+        self.assertAlmostEqual(self.limiter.tokens, 5, places=1)
+
+    def test_exhausted_remaining_makes_the_next_request_wait(self):
+        self.limiter.update_from_headers({'X-Ratelimit-Total': '60', 'X-Ratelimit-Remaining': '0'})
+        self.assertGreater(self.limiter.reserve(), 1.0)
+
+    def test_missing_or_invalid_headers_are_ignored(self):
+        for headers in ({}, {'X-Ratelimit-Total': 'abc'}, {'X-Ratelimit-Remaining': ''}):
+            self.limiter.update_from_headers(headers)
+        self.assertEqual(self.limiter.capacity, 60)
+        self.assertEqual(self.limiter.reserve(), 0)
+
+    def test_retry_after_pauses_every_request(self):
+        wait = self.limiter.penalize({'Retry-After': '5'})
+        self.assertEqual(wait, 5)
+        self.assertAlmostEqual(self.limiter.reserve(), 5, places=1)
+        self.assertEqual(self.limiter.stats['throttled'], 1)
+
+    @mock.patch('freshservice.rate_limiter.RATE_LIMIT_DELAY', 7)
+    def test_429_without_retry_after_uses_the_default_delay(self):
+        self.assertEqual(self.limiter.penalize({}), 7)
+
+if __name__ == '__main__':
+    unittest.main()
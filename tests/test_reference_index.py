@@ -0,0 +1,76 @@
+import tempfile
+import time
+import unittest
+from unittest import mock
+from freshservice.cache_manager import CacheManager
+from freshservice.reference_index import REFERENCE_CACHE_KEYS, ReferenceIndex
+from tests.fake_api import FakeAPI
+
+DEPARTMENTS = [{'id': 100 + i, 'name': name} for i, name in enumerate(['IT', 'Ventas', 'Administración', 'RRHH', 'Compras'])]
+
+@mock.patch.dict('freshservice.cache_warmer.WARM_CACHE_CONFIG', {'page_size': 2, 'workers': 2})
+class ReferenceIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with mock.patch('freshservice.CACHE_DIR', self.tmp.name):
+            self.cache = CacheManager(backend='json')
+        self.api = FakeAPI(references={'departments': DEPARTMENTS}, cache=self.cache)
+        self.index = ReferenceIndex(self.api)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def department_requests(self):
+        return [endpoint for endpoint in self.api.requests if endpoint.startswith('departments')]
+
+    def test_cold_load_fetches_every_page_and_caches_the_list(self):
+        self.assertEqual(self.index.get_id('departments', 'administración'), 102)
+        self.assertEqual(self.index.get_name('departments', 101), 'Ventas')
+
+        self.assertEqual(len(self.department_requests()), 3)
+        self.assertEqual(len(self.cache.get(REFERENCE_CACHE_KEYS['departments'], cache_type='departments')), 5)
+
+    def test_cached_list_is_loaded_without_requests(self):
+        self.cache.set(REFERENCE_CACHE_KEYS['departments'], DEPARTMENTS[:1], cache_type='departments')
+
+        self.assertEqual(self.index.get_names('departments'), {100: 'IT'})
+        self.assertEqual(self.department_requests(), [])
+
+    @mock.patch.dict('freshservice.cache_manager.CACHE_CONFIG',
+                     {'policies': {'departments': {'soft_ttl_hours': 1, 'hard_ttl_hours': 24}}})
+    def test_stale_cached_list_is_served_and_refetched_in_the_background(self):
+        stored_at = time.time() - 2 * 3600
+        self.cache.store.set('departments', self.cache._sanitize(REFERENCE_CACHE_KEYS['departments']),
+                             '[{"id": 1, "name": "Antiguo"}]', stored_at, stored_at + 24 * 3600)
+
+        self.index.refresh('departments')
+
+        self.assertEqual(self.api.background, ['reference_index/departments/fetch'])
+        # FakeAPI ejecuta la tarea al momento: ya está la lista nueva
+        self.assertEqual(self.index.get_id('departments', 'IT'), 100)
+
+    def test_expired_index_is_reloaded_in_the_background(self):
+        self.index.ensure_loaded('departments')
+        self.index.loaded_at['departments'] -= self.index.ttl + 1
+
+        self.index.ensure_loaded('departments')
+
+        self.assertEqual(self.api.background, ['reference_index/departments'])
+
+    def test_failed_listing_keeps_the_current_list_and_waits_before_retrying(self):
+        self.index.ensure_loaded('departments')
+        self.cache.clear_cache('departments')
+        self.api.failing_pages = {2: 1}
+        requests_before = len(self.department_requests())
+
+        self.index.refresh('departments')
+        self.index.loaded_at['departments'] -= self.index.ttl + 1
+        self.index.ensure_loaded('departments')
+
+        self.assertEqual(len(self.index.records['departments']), 5)
+        # Una sola tanda de peticiones (página 1 y luego 2-3): el reintento espera retry_seconds
+        self.assertEqual(len(self.department_requests()) - requests_before, 3)
+        self.assertEqual(self.api.background, [])
+
+if __name__ == '__main__':
+    unittest.main()
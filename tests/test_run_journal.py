@@ -0,0 +1,112 @@
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from freshservice.asset_manager import AssetManager
+from freshservice.freshservice_manager import FreshServiceManager
+from freshservice.run_journal import RunJournal
+
+class Interrupted(Exception):
+    pass
+
+@mock.patch.object(FreshServiceManager, '_setup_logging', lambda self: None)
+@mock.patch.object(FreshServiceManager, '_report_stats', lambda self: None)
+class RunJournalResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.tmp.name, 'out.csv')
+        # Un solo dict compartido por freshservice_manager y run_journal
+        patcher = mock.patch.dict('freshservice.config.RUN_JOURNAL_CONFIG',
+                                  {'min_assets': 1, 'fsync_every': 1, 'dir': os.path.join(self.tmp.name, 'runs')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.processed = []
+        self.interrupt_after = None
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def manager(self):
+        manager = FreshServiceManager()
+        manager.__dict__['asset_manager'] = AssetManager.__new__(AssetManager)
+        manager._iter_asset_data = self.iter_asset_data
+        return manager
+
+    def iter_asset_data(self, asset_ids, options):
+        """Stand-in for the API: even IDs are found, odd IDs don't exist"""
+        for asset_id in asset_ids:
+            if self.interrupt_after is not None and len(self.processed) >= self.interrupt_after:
+                raise self.interruption
+            self.processed.append(asset_id)
+            yield asset_id, {'display_id': asset_id, 'name': f'PC-{asset_id}'} if asset_id % 2 == 0 else None
+
+    def run_interrupted(self, interruption, after=4):
+        self.interrupt_after, self.interruption = after, interruption
+        options = {'ids': '1-10', 'exclude': None, 'output': self.output_file}
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            try:
+                self.manager().run(options)
+            except Interrupted:
+                pass
+        run_ids = [name[:-len('.json')] for name in os.listdir(os.path.join(self.tmp.name, 'runs'))
+                   if name.endswith('.json')]
+        self.assertEqual(len(run_ids), 1)
+        return run_ids[0], printed.getvalue()
+
+    def resume(self, run_id):
+        self.interrupt_after = None
+        self.processed = []
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            self.manager().resume(run_id)
+        return printed.getvalue()
+
+    def exported_ids(self):
+        with open(self.output_file, encoding='utf-8-sig', newline='') as f:
+            return [int(row['display_id']) for row in csv.DictReader(f)]
+
+    def test_interrupted_run_is_resumed_without_refetching_finished_assets(self):
+        run_id, printed = self.run_interrupted(KeyboardInterrupt())
+
+        self.assertIn(f'--resume {run_id}', printed)
+        # El export a medias no queda con el nombre final
+        self.assertFalse(os.path.exists(self.output_file))
+        journal = RunJournal.open(run_id)
+        self.assertEqual(journal.completed_ids(), {1, 2, 3, 4})
+        self.assertEqual(journal.meta['output_file'], self.output_file)
+
+        printed = self.resume(run_id)
+
+        self.assertIn('4 of 10 assets already finished', printed)
+        self.assertEqual(self.processed, [5, 6, 7, 8, 9, 10])
+        self.assertEqual(self.exported_ids(), [2, 4, 6, 8, 10])
+        # Terminada la ejecución, el registro se borra
+        self.assertIsNone(RunJournal.open(run_id))
+
+    def test_run_stopped_by_an_error_can_be_resumed(self):
+        run_id, printed = self.run_interrupted(Interrupted('API down'), after=7)
+
+        self.assertIn(f'--resume {run_id}', printed)
+        self.resume(run_id)
+
+        self.assertEqual(self.processed, [8, 9, 10])
+        self.assertEqual(self.exported_ids(), [2, 4, 6, 8, 10])
+
+    def test_truncated_last_record_is_processed_again(self):
+        run_id, _ = self.run_interrupted(KeyboardInterrupt())
+        journal = RunJournal.open(run_id)
+        with open(journal.results_path, 'a', encoding='utf-8') as f:
+            f.write('{"id": 5, "res')
+
+        self.resume(run_id)
+
+        self.assertEqual(self.processed, [5, 6, 7, 8, 9, 10])
+        self.assertEqual(self.exported_ids(), [2, 4, 6, 8, 10])
+
+    def test_unknown_run_id(self):
+        self.assertIn("No unfinished run with ID 'nope'", self.resume('nope'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,22 +2,41 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, SelectField, SelectMultipleField, SubmitField, BooleanField, FileField
 from wtforms.validators import DataRequired, Optional, ValidationError
 import os
+from freshservice import CACHE_DIR
+from freshservice.id_reader import ID_FILE_EXTENSIONS
+from freshservice.interval_set import parse_ids
 
-def validate_txt_file(form, field):
+# Listas de IDs subidas demasiado grandes para la cookie de sesión
+UPLOAD_DIR = os.path.join(CACHE_DIR, 'uploads')
+
+def validate_ids_file(form, field):
     if field.data:
-        filename = field.data.filename
-        if not filename.endswith('.txt'):
-            raise ValidationError('Solo se permiten archivos .txt')
+        filename = field.data.filename.lower()
+        if not filename.endswith(ID_FILE_EXTENSIONS):
+            raise ValidationError(f"Solo se permiten archivos {', '.join(ID_FILE_EXTENSIONS)}")
+
+def is_uploaded_ids_file(value):
+    """True if value is a stored upload (only files inside UPLOAD_DIR are accepted as IDs)"""
+    path = os.path.realpath(value or '')
+    return os.path.dirname(path) == os.path.realpath(UPLOAD_DIR) and os.path.isfile(path)
+
+def validate_id_ranges(form, field):
+    if field.data and not is_uploaded_ids_file(field.data):
+        ids, invalid = parse_ids(field.data)
+        if invalid:
+            raise ValidationError(f"IDs o rangos no válidos: {', '.join(invalid[:5])}")
+        if not ids:
+            raise ValidationError('No se encontraron IDs válidos')
 
 class FileUploadForm(FlaskForm):
-    file = FileField('Archivo de IDs', validators=[DataRequired(), validate_txt_file],
-                    description='Seleccione un archivo .txt con IDs (uno por línea)')
+    file = FileField('Archivo de IDs', validators=[DataRequired(), validate_ids_file],
+                    description='Archivo .txt con IDs separados por comas o líneas, o un .csv/.tsv/.xlsx con los IDs en la primera columna')
     submit = SubmitField('Cargar IDs')
 
 class AssetForm(FlaskForm):
-    ids = StringField('IDs de Activos', validators=[DataRequired()],
+    ids = StringField('IDs de Activos', validators=[DataRequired(), validate_id_ranges],
                      description='Ejemplo: 143-150,155,160')
-    exclude = StringField('IDs a Excluir',
+    exclude = StringField('IDs a Excluir', validators=[Optional(), validate_id_ranges],
                         description='Ejemplo: 145,147')
     components = SelectMultipleField('Componentes',
                                    choices=[
@@ -54,6 +73,7 @@ class SearchForm(FlaskForm):
                                 ('list_locations', 'Listar Ubicaciones')
                             ])
     search_value = StringField('Término de Búsqueda')  # Removido el validator ya que no siempre se necesita
+    include_sublocations = BooleanField('Incluir sububicaciones', default=False)
     filename = StringField('Nombre del archivo', validators=[Optional()],
                          description='Nombre para guardar el archivo (opcional)')
     submit = SubmitField('Buscar')
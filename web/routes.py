@@ -4,20 +4,37 @@ from pathlib import Path
 import tempfile
 import logging
 import shutil
+import threading
+import time
 from venv import logger
 from werkzeug.utils import secure_filename
 from flask import render_template, request, send_file, flash, jsonify, redirect, url_for, session
 from web import app
-from web.forms import AssetForm, SearchForm, FileUploadForm
+from web.forms import AssetForm, SearchForm, FileUploadForm, UPLOAD_DIR
 
 # Agregar el directorio raíz al path de manera más robusta
 ROOT_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 from freshservice import FreshServiceManager
+from freshservice.id_reader import read_ids
+from freshservice.config import ASSET_INDEX_CONFIG, CONCURRENCY_CONFIG, WARM_CACHE_CONFIG
 
 manager = FreshServiceManager()
 
+# Las cookies de sesión admiten unos 4 KB
+UPLOAD_SESSION_MAX_CHARS = 3000
+
+def _warm_up():
+    if WARM_CACHE_CONFIG['on_web_startup']:
+        manager.warm_cache()
+    # Con el índice cargado las búsquedas por criterio se resuelven en memoria
+    if ASSET_INDEX_CONFIG['mode'] != 'off':
+        manager.load_asset_index()
+
+# Precargar la caché en segundo plano para que la primera búsqueda no pague los fallos en frío
+threading.Thread(target=_warm_up, name='cache-warmup', daemon=True).start()
+
 @app.route('/', methods=['GET'])
 def index():
     return render_template('index.html')
@@ -55,7 +72,8 @@ def search_id():
                 'include_serial_number': 'serial_number' in asset_form.include_info.data,
                 'include_description': 'description' in asset_form.include_info.data,
                 'verbose': True,
-                'all_data': asset_form.all_data.data
+                'all_data': asset_form.all_data.data,
+                'workers': CONCURRENCY_CONFIG['web_workers']
             }
             
             try:
@@ -141,7 +159,7 @@ def search_id():
                         options['output'] = output_file
                         
                         # Exportar datos y asegurarse de que el archivo se escriba completamente
-                        manager.export_to_excel(results, output_file)
+                        manager.export_results(results, output_file)
                         
                         # Verificar que el archivo existe y tiene tamaño
                         if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
@@ -239,6 +257,11 @@ def search_criteria():
                 results, message = manager.search_by_user(search_value)
                 if not results:
                     flash(message, 'warning')
+            elif search_type == 'location' and search_value:
+                results, message = manager.search_by_location(search_value,
+                                                              include_sublocations=search_form.include_sublocations.data)
+                if not results:
+                    flash(message, 'warning')
             elif search_type == 'department' and search_value:
                 results, message = manager.search_by_department(search_value)
                 if download and results:
@@ -277,6 +300,15 @@ def search_criteria():
     
     return render_template('search_criteria.html', search_form=search_form)
 
+@app.route('/autocomplete', methods=['GET'])
+def autocomplete():
+    """Suggest department, location or user names for the search form"""
+    text = request.args.get('q', '')
+    # Al escribir se completa por prefijo; si no hay ninguno se ofrecen los nombres más parecidos
+    matches = manager.suggest_names(request.args.get('type', ''), text, prefix=True) or \
+        manager.suggest_names(request.args.get('type', ''), text) or []
+    return jsonify([name for name, _ in matches])
+
 @app.route('/upload', methods=['GET', 'POST'])
 def upload():
     form = FileUploadForm()
@@ -285,21 +317,17 @@ def upload():
         try:
             file = form.file.data
             if file and file.filename:
-                # Leer el contenido del archivo
-                content = file.read().decode('utf-8')
-                
-                # Procesar el contenido para extraer IDs
-                ids = []
-                for line in content.splitlines():
-                    line = line.strip()
-                    if line:
-                        # Dividir por comas y agregar cada ID
-                        ids.extend([id.strip() for id in line.split(',') if id.strip()])
+                # Leer los IDs por bloques, sin cargar el archivo entero en memoria
+                result = read_ids(file.stream, file.filename)
+                ids = result.ids
                 
                 if ids:
-                    # Guardar los IDs en la sesión
-                    session['uploaded_ids'] = ','.join(ids)
+                    # Guardar los IDs en la sesión como rangos; si no caben en la cookie, en un archivo
+                    session['uploaded_ids'] = _store_uploaded_ids(ids)
                     flash(f'Se han cargado {len(ids)} IDs exitosamente', 'success')
+                    if result.invalid_count:
+                        flash(f'Se ignoraron {result.invalid_count} valores no válidos '
+                              f"(p. ej. {', '.join(result.invalid[:3])})", 'warning')
                     return redirect(url_for('search'))
                 else:
                     flash('No se encontraron IDs válidos en el archivo', 'warning')
@@ -309,4 +337,23 @@ def upload():
             flash(f'Error al procesar el archivo: {str(e)}', 'error')
             logger.error(f"Error processing file: {e}")
     
-    return render_template('upload.html', form=form)
\ No newline at end of file
+    return render_template('upload.html', form=form)
+
+def _store_uploaded_ids(ids):
+    """Get the value for the IDs field: the ranges text, or the path of a file holding it"""
+    text = ids.to_text()
+    if len(text) <= UPLOAD_SESSION_MAX_CHARS:
+        return text
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    # Las subidas de días anteriores ya no se usan
+    for name in os.listdir(UPLOAD_DIR):
+        old_path = os.path.join(UPLOAD_DIR, name)
+        try:
+            if time.time() - os.path.getmtime(old_path) > 86400:
+                os.remove(old_path)
+        except OSError:
+            pass
+    fd, path = tempfile.mkstemp(suffix='.txt', dir=UPLOAD_DIR)
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    return path